@@ -0,0 +1,159 @@
+"""
+Benchmark the vectorized campaign clash engine against the original
+per-group loop on a synthetic allowance history.
+
+    python benchmarks/bench_campaign_clashes.py --rows 1000000
+
+Both implementations run on the same frame; the script fails if any
+category differs.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from clash_engine import detect_clashes_by_category  # noqa: E402
+
+CLASH_CATEGORIES = {
+    "AQC clashes": ("aqc_attendance_am", "aqc_attendance_silent_hours_am"),
+    "WAC clashes": ("wac_attendance_am", "wac_attendance_silent_hours_am"),
+    "Khall clashes": ("khall_attendance_am", "khall_attendance_silent_hours_am"),
+    "Airpt clashes": ("airpt_attendance_am", "airpt_attendance_silent_hours_am", "airpt-attendance-am"),
+}
+
+CAMPAIGNS = [
+    "aqc_attendance_am", "aqc_attendance_silent_hours_am",
+    "wac_attendance_am", "wac_attendance_silent_hours_am",
+    "khall_attendance_am", "khall_attendance_silent_hours_am",
+    "airpt_attendance_am", "airpt-attendance-am", "airpt_attendance_silent_hours_am",
+    "itee_attendance_am", "nexus_Attendance_Silent-Hours_AM",
+    "sen_attendance_pm", "tsa_attendance_pm", "oc_attendance_silent_hour_11pm_7am",
+]
+
+
+def synthetic_history(rows, people, days, seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2025-06-01')
+    day_offsets = rng.integers(0, days, rows)
+    return pd.DataFrame({
+        'id': np.arange(rows),
+        'gms_id': rng.integers(100000, 100000 + people, rows),
+        'name': 'Volunteer',
+        'registration_location_id': pd.Categorical(rng.choice(CAMPAIGNS, rows)),
+        'date_created': (start + pd.to_timedelta(day_offsets, unit='D')).date,
+        'amount': rng.choice([10.0, 20.0, 30.0], rows),
+    })
+
+
+def legacy_detect_clashes_by_category(df, clash_categories):
+    # Helper to normalize campaign names
+    def normalize_campaign_name(c):
+        return c.lower().replace('_', ' ').replace('-', ' ')
+
+    df = df.copy()
+    df['normalized_loc'] = df['registration_location_id'].str.lower().str.replace('[-_]', ' ', regex=True)
+
+    clashes_by_category = {}
+
+    # Track all known campaigns to exclude for "Other clashes"
+    known_campaigns_set = set()
+    for campaigns_to_check in clash_categories.values():
+        known_campaigns_set.update(normalize_campaign_name(c) for c in campaigns_to_check)
+
+    # Group once
+    grouped = df.groupby(['gms_id', 'date_created'])
+
+    # To track which groups were already classified under any category
+    classified_groups = set()
+
+    # First pass: check for specific clash categories
+    for label, campaigns_to_check in clash_categories.items():
+        clashing = []
+        campaigns_to_check_norm = set(normalize_campaign_name(c) for c in campaigns_to_check)
+
+        for (gms_id, date_created), group in grouped:
+            group_key = (gms_id, date_created)
+
+            campaigns_in_group = set(group['normalized_loc'])
+
+            present_silent = {camp for camp in campaigns_in_group if camp.endswith(" silent hours am")}
+            present_am = {camp for camp in campaigns_in_group if camp.endswith(" am") and not camp.endswith(" silent hours am")}
+
+            if present_silent and present_am:
+                all_present = present_silent.union(present_am)
+
+                # Check if all present campaigns are in this category
+                if all(camp in campaigns_to_check_norm for camp in all_present):
+                    clash_rows = group[group['normalized_loc'].isin(all_present)]
+                    clashing.append(clash_rows)
+                    classified_groups.add(group_key)
+
+        if clashing:
+            clashes_by_category[label] = pd.concat(clashing).drop_duplicates()
+        else:
+            clashes_by_category[label] = pd.DataFrame(columns=df.columns)
+
+    # Second pass: "Other clashes"
+    clashing_other = []
+    for (gms_id, date_created), group in grouped:
+        group_key = (gms_id, date_created)
+        if group_key in classified_groups:
+            continue  # already assigned to a known category
+
+        campaigns_in_group = set(group['normalized_loc'])
+        present_silent = {camp for camp in campaigns_in_group if camp.endswith(" silent hours am")}
+        present_am = {camp for camp in campaigns_in_group if camp.endswith(" am") and not camp.endswith(" silent hours am")}
+
+        if present_silent and present_am:
+            all_present = present_silent.union(present_am)
+            clash_rows = group[group['normalized_loc'].isin(all_present)]
+            clashing_other.append(clash_rows)
+
+    if clashing_other:
+        clashes_by_category["Other clashes"] = pd.concat(clashing_other).drop_duplicates()
+    else:
+        clashes_by_category["Other clashes"] = pd.DataFrame(columns=df.columns)
+
+    return clashes_by_category
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def assert_same(expected, actual):
+    assert list(expected) == list(actual), (list(expected), list(actual))
+    for label in expected:
+        pd.testing.assert_frame_equal(expected[label], actual[label], check_dtype=False, check_categorical=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--people', type=int, default=20_000)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    df = synthetic_history(args.rows, args.people, args.days, args.seed)
+    print(f"{len(df):,} rows, {df.groupby(['gms_id', 'date_created']).ngroups:,} (gms_id, date) groups")
+
+    fast, fast_time = timed(detect_clashes_by_category, df, CLASH_CATEGORIES)
+    print(f"vectorized: {fast_time:.2f}s")
+    slow, slow_time = timed(legacy_detect_clashes_by_category, df, CLASH_CATEGORIES)
+    print(f"legacy:     {slow_time:.2f}s")
+
+    assert_same(slow, fast)
+    for label, clashes in fast.items():
+        print(f"  {label}: {len(clashes):,} rows")
+    print(f"parity OK, {slow_time / fast_time:.1f}x faster")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Measure what the GMS ID and name filters cost to ship: every distinct value
+as layout options (the old dropdowns) against typeahead responses from the
+prefix index.
+
+    python benchmarks/bench_dropdown_payload.py --people 50000
+
+Checks each typeahead answer against a plain scan of the roster.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from plotly.utils import PlotlyJSONEncoder
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from typeahead import TYPEAHEAD_LIMIT, normalize, people_index, search_options  # noqa: E402
+
+GIVEN = ['Alice', 'Wei Ming', 'Siti', 'Rajesh', 'Mei Ling', 'Ahmad', 'Priya', 'Jun Jie', 'Nur', 'Daniel']
+FAMILY = ['Tan', 'Lim', 'Lee', 'Ng', 'Wong', 'Abdullah', 'Kumar', 'Goh', 'Chua', 'Teo']
+SEARCHES = {'gms_id': ['1', '12', '1234', '99999'], 'name': ['t', 'tan', 'wei', 'siti ab', 'zz']}
+
+
+def synthetic_roster(people, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'gms_id': np.arange(100000, 100000 + people),
+        'name': [f"{GIVEN[g]} {FAMILY[f]} {i}" for i, (g, f) in
+                 enumerate(zip(rng.integers(0, len(GIVEN), people), rng.integers(0, len(FAMILY), people)))],
+    })
+
+
+def payload_bytes(options):
+    return len(json.dumps(options, cls=PlotlyJSONEncoder).encode('utf-8'))
+
+
+def scan(values, text, words):
+    """Reference answer: every value whose label, or any word of it, starts with text."""
+    prefix = normalize(text)
+    found = []
+    for value in values:
+        label = normalize(value)
+        starts = [label] + [label[i + 1:] for i, ch in enumerate(label) if ch == ' '] if words else [label]
+        if any(start.startswith(prefix) for start in starts):
+            found.append(value)
+    return set(found)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--people', type=int, default=50_000)
+    args = parser.parse_args()
+
+    roster = synthetic_roster(args.people)
+    start = time.perf_counter()
+    index = people_index(roster)
+    print(f"Index build for {args.people} people: {time.perf_counter() - start:.3f}s")
+
+    for column, searches in SEARCHES.items():
+        full = [{'label': str(v), 'value': v} for v in sorted(roster[column].unique())]
+        print(f"\n{column}: all options in the layout {payload_bytes(full) / 1024:,.1f} KiB")
+        for text in searches:
+            start = time.perf_counter()
+            options = search_options(index[column], text, selected=[])
+            elapsed = time.perf_counter() - start
+
+            expected = scan(roster[column].tolist(), text, words=column == 'name')
+            found = {option['value'] for option in options}
+            assert found <= expected and len(found) == min(len(expected), TYPEAHEAD_LIMIT), text
+            print(f"  search {text!r:<10} {len(options):3d} of {len(expected):6d} matches, "
+                  f"{payload_bytes(options) / 1024:6.1f} KiB, {elapsed * 1000:6.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
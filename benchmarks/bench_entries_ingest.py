@@ -0,0 +1,87 @@
+"""
+Benchmark reading the encrypted entries workbook: the original full-sheet
+pd.read_excel against the streaming column reader in loadentries.
+
+    python benchmarks/bench_entries_ingest.py --rows 50000
+
+The workbook is synthetic, shaped like the real one (the six columns the
+dashboard uses plus unused ones), and encrypted with the same password.
+The script fails if the prepared frames differ.
+"""
+import argparse
+import datetime as dt
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import openpyxl
+import pandas as pd
+from msoffcrypto.format.ooxml import OOXMLFile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import loadentries  # noqa: E402
+
+VENUES = ['AQC Hall', 'WCA-1', 'KHALL', 'SEN 2', None]
+CATEGORIES = ['Volunteer', 'Staff', None, 'Media']
+
+
+def synthetic_workbook(rows, extra_columns, seed=0):
+    rng = np.random.default_rng(seed)
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(loadentries.SHEET_NAME)
+    ws.append(loadentries.ENTRIES_COLUMNS + [f'Extra {i}' for i in range(extra_columns)])
+    start = dt.datetime(2025, 7, 1, 8)
+    for i in range(rows):
+        when = start + dt.timedelta(minutes=int(rng.integers(0, 60 * 24 * 60)))
+        person = i % 5000
+        ws.append([
+            # Some rows were typed in as text, as in the real sheet
+            when if i % 7 else when.strftime('%d/%m/%Y %H:%M'),
+            f'Person {person} Tan', VENUES[i % len(VENUES)], CATEGORIES[i % len(CATEGORIES)],
+            f'Given{person}', 'Tan' if i % 11 else None,
+        ] + [float(rng.random()) if j % 2 else f'text {i}' for j in range(extra_columns)])
+
+    raw = io.BytesIO()
+    wb.save(raw)
+    raw.seek(0)
+    encrypted = io.BytesIO()
+    OOXMLFile(raw).encrypt(loadentries.ENTRIES_PASSWORD, encrypted)
+    return encrypted.getvalue()
+
+
+def legacy_read_entries_workbook(content):
+    decrypted = loadentries.decrypt_entries_workbook(content)
+    return pd.read_excel(decrypted, sheet_name=loadentries.SHEET_NAME)
+
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {elapsed:8.3f}s")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--extra-columns', type=int, default=10)
+    args = parser.parse_args()
+
+    content, _ = timed("generate workbook", synthetic_workbook, args.rows, args.extra_columns)
+    print(f"{len(content) / 1e6:.1f} MB encrypted, {args.rows} rows")
+
+    legacy, legacy_time = timed("read_excel (old)", legacy_read_entries_workbook, content)
+    streamed, streamed_time = timed("streaming reader (new)", loadentries.read_entries_workbook, content)
+
+    legacy = loadentries.prepare_entries(legacy[loadentries.ENTRIES_COLUMNS])
+    streamed = loadentries.prepare_entries(streamed)
+    pd.testing.assert_frame_equal(legacy, streamed)
+    print(f"Frames match; speedup {legacy_time / streamed_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
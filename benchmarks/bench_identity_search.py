@@ -0,0 +1,76 @@
+"""
+Compare the Volunteer Finder filters: scanning every person with
+str.contains on each request (the old callback) against the prebuilt
+identity table and its trigram indexes.
+
+    python benchmarks/bench_identity_search.py --people 50000
+
+Fails if the two give different people for any search.
+"""
+import argparse
+import os
+import sys
+import time
+import urllib.parse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from dashPeople import build_identity_index  # noqa: E402
+
+ROLES = ['Driver', 'Marshal', 'Usher', 'Medic', 'Logistics Lead', 'Transport Coordinator', None]
+SEARCHES = [('gms_id', '12'), ('gms_id', '12345'), ('badge_id', 'b0012'), ('gms_role_name', 'lead'),
+            ('gms_role_name', 'zz'), ('gms_role_name', 'none')]
+
+
+def synthetic_people(people, shifts_each, seed=0):
+    rng = np.random.default_rng(seed)
+    person = np.repeat(np.arange(people), shifts_each)
+    return pd.DataFrame({
+        'name': [f'PERSON {p}' for p in person],
+        'gms_id': 100000 + person,
+        'badge_id': [f'B{p:06d}' for p in person],
+        'gms_role_name': np.array(ROLES, dtype=object)[person % len(ROLES)],
+        'payout_date': np.where(rng.random(len(person)) < 0.9, '2025-07-01', None),
+    })
+
+
+def legacy_search(df, column, text):
+    """The old callback: dedupe, scan the column and build each row's link."""
+    people = df.drop_duplicates(subset='name')[['name', 'gms_id', 'badge_id', 'gms_role_name']].copy()
+    people = people[people[column].astype(str).str.contains(text, case=False, na=False)]
+    return [
+        {"link": f"[{row['name'].title()}](/app3/person/{urllib.parse.quote(str(row['name']))})", "gms_id": row['gms_id']}
+        for _, row in people.iterrows()
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--people', type=int, default=50_000)
+    parser.add_argument('--shifts-each', type=int, default=4)
+    args = parser.parse_args()
+
+    df = synthetic_people(args.people, args.shifts_each)
+    start = time.perf_counter()
+    identity = build_identity_index(df)
+    print(f"Identity index for {args.people} people ({len(df)} rows): {time.perf_counter() - start:.3f}s")
+
+    for column, text in SEARCHES:
+        start = time.perf_counter()
+        expected = legacy_search(df, column, text)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = identity['table'][identity['index'][column].mask(text)]
+        indexed_time = time.perf_counter() - start
+
+        assert found[['link', 'gms_id']].to_dict('records') == expected, (column, text)
+        print(f"  {column:<14} {text!r:<8} {len(found):6d} people, scan {legacy_time * 1000:8.1f} ms, "
+              f"index {indexed_time * 1000:6.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Measure what a large DataTable costs to ship: the whole frame as records
+(native paging) against one page from table_paging, with and without a
+filter and sort.
+
+    python benchmarks/bench_table_paging.py --rows 300000
+
+Checks each page against the same rows filtered and sorted with plain pandas.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from plotly.utils import PlotlyJSONEncoder
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from table_paging import table_page  # noqa: E402
+
+PAGE_SIZE = 20
+LOCATIONS = ['AQC_Gate1', 'AQC_Gate2', 'WAC_Main', 'KHALL_A', 'SEN_2']
+VIEWS = [
+    ('first page', [], ''),
+    ('sorted by Name', [{'column_id': 'Name', 'direction': 'asc'}], ''),
+    ('filtered and sorted', [{'column_id': 'Time', 'direction': 'desc'}], '{Location} icontains "aqc" && {Name} icontains "tan"'),
+]
+
+
+def synthetic_entries(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    people = rng.integers(0, 20000, rows)
+    return pd.DataFrame({
+        'Time': pd.Timestamp('2025-07-01') + pd.to_timedelta(rng.integers(0, 60 * 24 * 60, rows), unit='min'),
+        'Name': [f'PERSON {p} {"TAN" if p % 3 else "LIM"}' for p in people],
+        'BN ID': [f'BN{p:05d}' for p in people],
+        'Location': np.array(LOCATIONS)[rng.integers(0, len(LOCATIONS), rows)],
+    })
+
+
+def payload_bytes(records):
+    return len(json.dumps(records, cls=PlotlyJSONEncoder).encode('utf-8'))
+
+
+def reference(df, sort_by, filter_query):
+    """The same view with plain pandas, for the views above."""
+    if filter_query:
+        df = df[df['Location'].str.lower().str.contains('aqc') & df['Name'].str.lower().str.contains('tan')]
+    if sort_by:
+        df = df.sort_values(sort_by[0]['column_id'], ascending=sort_by[0]['direction'] == 'asc', kind='stable')
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=300_000)
+    args = parser.parse_args()
+
+    df = synthetic_entries(args.rows)
+    start = time.perf_counter()
+    records = df.to_dict('records')
+    elapsed = time.perf_counter() - start
+    print(f"All {args.rows} rows as records: {payload_bytes(records) / 1e6:,.1f} MB, {elapsed:.3f}s to build")
+
+    for label, sort_by, filter_query in VIEWS:
+        timings = []
+        for page_current in (0, 1, 2):
+            start = time.perf_counter()
+            page, page_count = table_page(df, page_current, PAGE_SIZE, sort_by, filter_query, view_key='bench')
+            records = page.to_dict('records')
+            timings.append(time.perf_counter() - start)
+
+            expected = reference(df, sort_by, filter_query)
+            start_row = page_current * PAGE_SIZE
+            pd.testing.assert_frame_equal(page, expected.iloc[start_row:start_row + PAGE_SIZE])
+        print(f"  {label:<22} {page_count:6d} pages, {payload_bytes(records) / 1024:5.1f} KiB a page, "
+              f"first page {timings[0] * 1000:7.1f} ms, next pages {max(timings[1:]) * 1000:5.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 from dash import Dash, dcc, html, Input, Output, dash_table, State
+import numpy as np
 import pandas as pd
 from dash.dash_table import FormatTemplate
 from dash.dash_table.Format import Format, Scheme
@@ -9,8 +10,9 @@ from dash import callback
 from urllib.parse import unquote
 import dash_bootstrap_components as dbc
 from dash_iconify import DashIconify
-from dashPeople import get_data, get_data_raw, df1
+from dashPeople import get_data, get_data_raw, load_people_data, get_identity_index, get_version, IDENTITY_COLUMNS
 from graphs_people import DisbursementDashboardGraphs
+from table_paging import current_page, table_page
 
 graphs_module = DisbursementDashboardGraphs(get_data, get_data_raw)
 
@@ -28,41 +30,43 @@ def register_callbacks(dash_app):
 
     @app.callback(
         Output('identity-table', 'data'),
+        Output('identity-table', 'page_count'),
+        Output('identity-table', 'page_current'),
         [
             Input('identity-filter-btn', 'n_clicks'),
             Input('name-filter-bottom', 'value'),
             Input('gms-id-input', 'value'),
             Input('badge-id-input', 'value'),
-            Input('role-input', 'value')
+            Input('role-input', 'value'),
+            Input('identity-table', 'page_current'),
+            Input('identity-table', 'page_size'),
+            Input('identity-table', 'sort_by'),
+            Input('identity-table', 'filter_query')
         ]
     )
-    def update_identity_table(n_clicks, selected_names, gms_id, badge_id, role):
-        local_df = df1.copy()
-        local_df['name'] = local_df['name'].str.strip().str.upper()
-
-        people = local_df.drop_duplicates(subset='name')[['name', 'gms_id', 'badge_id', 'gms_role_name']].copy()
+    def update_identity_table(n_clicks, selected_names, gms_id, badge_id, role, page_current, page_size, sort_by, filter_query):
+        version = get_version()
+        identity = get_identity_index()
+        people = identity['table']
 
+        keep = np.ones(len(people), dtype=bool)
         if selected_names:
-            people = people[people['name'].isin(selected_names)]
-
-        if gms_id:
-            people = people[people['gms_id'].astype(str).str.contains(gms_id.strip(), case=False, na=False)]
-
-        if badge_id:
-            people = people[people['badge_id'].astype(str).str.contains(badge_id.strip(), case=False, na=False)]
-
-        if role:
-            people = people[people['gms_role_name'].astype(str).str.contains(role.strip(), case=False, na=False)]
-
-        return [
-            {
-                "link": f"[{row['name'].title()}](/app3/person/{urllib.parse.quote(str(row['name']))})",
-                "gms_id": row['gms_id'] if pd.notna(row['gms_id']) else "—",
-                "badge_id": row['badge_id'] if pd.notna(row['badge_id']) else "—",
-                "gms_role_name": row['gms_role_name'] if pd.notna(row['gms_role_name']) else "—"
-            }
-            for _, row in people.iterrows()
-        ]
+            keep &= people['name'].isin(selected_names).to_numpy()
+
+        for column, text in (('gms_id', gms_id), ('badge_id', badge_id), ('gms_role_name', role)):
+            if text:
+                keep &= identity['index'][column].mask(text.strip())
+
+        if not keep.all():
+            people = people[keep]
+
+        # Only the visible page goes to the browser; blanks show as a dash
+        page_current = current_page('identity-table', page_current)
+        view_key = ('identity-table', version, tuple(selected_names or ()), gms_id, badge_id, role)
+        page, page_count = table_page(people, page_current, page_size, sort_by, filter_query, view_key)
+        page = page[IDENTITY_COLUMNS]
+        page = page.astype(object).where(page.notna(), "—")
+        return page.to_dict('records'), page_count, page_current
 
 
 
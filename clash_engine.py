@@ -0,0 +1,310 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from typeahead import people_index, search_options
+
+# Shared by the campaign and shift clash dashboards (history and venue manager versions)
+
+# Date ranges whose people a ClashStore keeps, newest last, so typing in the
+# GMS id and name filters does not gather the range's people on every keystroke
+PEOPLE_RANGE_CACHE_SIZE = 8
+
+# Filtered selections a ClashStore keeps, newest last, so the summary, the
+# high-risk panel and each page of the category table share one selection
+# instead of slicing every category again.
+SELECTION_CACHE_SIZE = 8
+
+GROUP_KEYS = ['gms_id', 'date_created']
+
+SILENT_AM_SUFFIX = " silent hours am"
+AM_SUFFIX = " am"
+
+
+def normalize_campaign_name(c):
+    return c.lower().replace('_', ' ').replace('-', ' ')
+
+
+def normalize_locations(series, replacement=' '):
+    """
+    Normalize registration_location_id once per distinct campaign: lowercase,
+    with dashes and underscores replaced by replacement.
+
+    Returns (codes, normalized) where normalized[codes[i]] is the normalized
+    name of row i and codes is -1 for missing locations.
+    """
+    codes, uniques = pd.factorize(series)
+    normalized = pd.Index(uniques, dtype=object).str.lower().str.replace('[-_]', replacement, regex=True)
+    # Different spellings of a campaign collapse to one code
+    merged, normalized = pd.factorize(normalized)
+    codes = np.where(codes >= 0, merged[np.maximum(codes, 0)], -1)
+    return codes, pd.Index(normalized, dtype=object)
+
+
+def _per_row(flags, codes):
+    # Trailing False so that code -1 (missing location) maps to False
+    return np.append(np.asarray(flags, dtype=bool), False)[codes]
+
+
+def _ordered_rows(candidates, group_ids, mask):
+    """Selected rows ordered group by group, the way a groupby loop emits them."""
+    if not mask.any():
+        return None
+    order = np.argsort(group_ids[mask], kind='stable')
+    return candidates[mask].iloc[order].drop_duplicates()
+
+
+def detect_clashes_by_category(df, clash_categories):
+    """
+    Find people who claimed both an AM and a silent-hours-AM campaign on the
+    same day.
+
+    A clashing (gms_id, date_created) group goes to every category whose
+    campaigns cover all of its AM and silent-hours-AM campaigns; groups that
+    fit no category are reported under "Other clashes". Each category maps to
+    the clashing rows, with a normalized_loc column added.
+    """
+    df = df.copy(deep=False)
+    codes, normalized = normalize_locations(df['registration_location_id'])
+    df['normalized_loc'] = normalized.take(codes, allow_fill=True, fill_value=np.nan)
+
+    # Classify each distinct campaign once, then broadcast to rows
+    silent_u = np.asarray(normalized.str.endswith(SILENT_AM_SUFFIX), dtype=bool)
+    am_u = np.asarray(normalized.str.endswith(AM_SUFFIX), dtype=bool) & ~silent_u
+    is_silent = _per_row(silent_u, codes)
+    is_am = _per_row(am_u, codes)
+
+    # Only AM and silent-hours-AM rows can take part in a clash
+    candidate_mask = (is_silent | is_am) & df[GROUP_KEYS].notna().all(axis=1).to_numpy()
+    candidates = df[candidate_mask]
+    codes = codes[candidate_mask]
+    is_silent = is_silent[candidate_mask]
+
+    clashes_by_category = {}
+    empty = pd.DataFrame(columns=df.columns)
+    if candidates.empty:
+        for label in clash_categories:
+            clashes_by_category[label] = empty
+        clashes_by_category["Other clashes"] = empty
+        return clashes_by_category
+
+    group_ids = candidates.groupby(GROUP_KEYS, sort=True).ngroup().to_numpy()
+    n_groups = group_ids.max() + 1
+    silent_count = np.bincount(group_ids, weights=is_silent, minlength=n_groups)
+    am_count = np.bincount(group_ids, weights=~is_silent, minlength=n_groups)
+    clash_groups = (silent_count > 0) & (am_count > 0)
+
+    classified = np.zeros(n_groups, dtype=bool)
+    for label, campaigns_to_check in clash_categories.items():
+        campaigns_to_check_norm = set(normalize_campaign_name(c) for c in campaigns_to_check)
+        in_category = _per_row(normalized.isin(campaigns_to_check_norm), codes)
+        # A group fits when none of its clashing campaigns fall outside the category
+        outside = np.bincount(group_ids[~in_category], minlength=n_groups)
+        matched = clash_groups & (outside == 0)
+        classified |= matched
+        rows = _ordered_rows(candidates, group_ids, matched[group_ids])
+        clashes_by_category[label] = rows if rows is not None else empty
+
+    rows = _ordered_rows(candidates, group_ids, (clash_groups & ~classified)[group_ids])
+    clashes_by_category["Other clashes"] = rows if rows is not None else empty
+
+    return clashes_by_category
+
+
+def detect_clashes_by_keyword(df, category_keywords):
+    """
+    Find people with two or more distinct campaigns of the same shift on the
+    same day.
+
+    Categories are checked in order and a campaign that clashed under an
+    earlier category is not counted again under a later one. Each category
+    maps to the clashing rows, with a registration_location_id_norm column
+    added.
+    """
+    df = df.copy(deep=False)
+    # Normalize registration_location_id: lowercase and remove dashes/underscores
+    codes, normalized = normalize_locations(df['registration_location_id'], '')
+    df['registration_location_id_norm'] = normalized.take(codes, allow_fill=True, fill_value=np.nan)
+
+    candidate_mask = (codes >= 0) & df[GROUP_KEYS].notna().all(axis=1).to_numpy()
+    candidates = df[candidate_mask]
+    codes = codes[candidate_mask]
+
+    clashes_by_category = {}
+    empty = pd.DataFrame(columns=df.columns)
+    if candidates.empty:
+        for label in category_keywords:
+            clashes_by_category[label] = empty
+        return clashes_by_category
+
+    # Group once and keep each distinct (group, campaign) pair for counting
+    group_ids = candidates.groupby(GROUP_KEYS, sort=True).ngroup().to_numpy()
+    n_groups = group_ids.max() + 1
+    n_campaigns = len(normalized)
+    pairs = np.unique(group_ids.astype(np.int64) * n_campaigns + codes)
+    pair_groups, pair_codes = np.divmod(pairs, n_campaigns)
+
+    used_campaigns = np.zeros(n_campaigns, dtype=bool)
+    for label, keyword in category_keywords.items():
+        # Match campaigns for this category, excluding ones already matched to earlier categories
+        matched = np.asarray(normalized.str.contains(keyword), dtype=bool) & ~used_campaigns
+        campaign_counts = np.bincount(pair_groups[matched[pair_codes]], minlength=n_groups)
+        mask = (campaign_counts >= 2)[group_ids] & matched[codes]
+        rows = _ordered_rows(candidates, group_ids, mask)
+        if rows is None:
+            clashes_by_category[label] = empty
+            continue
+        clashes_by_category[label] = rows
+        used_campaigns[np.unique(codes[mask])] = True
+
+    return clashes_by_category
+
+
+class ClashStore:
+    """
+    Clash rows per category kept sorted by date_created, so a date range is
+    a contiguous slice found by binary search instead of a mask over every
+    row. Slices come back in the engine's row order (grouped by person and
+    day), which the category tables rely on.
+    """
+
+    def __init__(self, clashes_by_category):
+        self.frames = clashes_by_category
+        self._people_index = None
+        self._people_in_range = OrderedDict()
+        self._selections = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._by_date = {}
+        for label, df in clashes_by_category.items():
+            days = pd.to_datetime(df['date_created']).to_numpy(dtype='datetime64[D]')
+            # Stable, so rows of one day keep their order; missing dates sort last
+            order = np.argsort(days, kind='stable')
+            self._by_date[label] = (df.iloc[order], days[order], order)
+
+    def between(self, label, start, end):
+        """Clashes of one category dated start to end, both inclusive."""
+        df, days, order = self._by_date[label]
+        lo = np.searchsorted(days, np.datetime64(start, 'D'), side='left')
+        hi = np.searchsorted(days, np.datetime64(end, 'D'), side='right')
+        if hi <= lo:
+            return df.iloc[:0]
+        return df.iloc[lo:hi].iloc[np.argsort(order[lo:hi], kind='stable')]
+
+    def select(self, start, end, gms_ids=None, names=None, locations=None):
+        """Each category's clashes in the date range, narrowed by the dashboard filters."""
+        key = (start, end, tuple(gms_ids or ()), tuple(names or ()), tuple(locations or ()))
+        with self._cache_lock:
+            if key in self._selections:
+                self._selections.move_to_end(key)
+                return self._selections[key]
+
+        selected = {}
+        for label in self.frames:
+            df = self.between(label, start, end)
+            if gms_ids:
+                df = df[df['gms_id'].isin(gms_ids)]
+            if names:
+                df = df[df['name'].isin(names)]
+            if locations:
+                df = df[df['registration_location_id'].isin(locations)]
+            selected[label] = df
+        with self._cache_lock:
+            self._selections[key] = selected
+            while len(self._selections) > SELECTION_CACHE_SIZE:
+                self._selections.popitem(last=False)
+        return selected
+
+    def people_index(self):
+        """Typeahead indexes over everyone with a clash, built on first use."""
+        with self._cache_lock:
+            if self._people_index is None:
+                self._people_index = people_index(pd.concat(
+                    [df[['gms_id', 'name']] for df in self.frames.values()], ignore_index=True))
+            return self._people_index
+
+    def people_in_range(self, column, start, end):
+        """The distinct values of column among clashes dated start to end, both inclusive."""
+        key = (column, start, end)
+        with self._cache_lock:
+            if key in self._people_in_range:
+                self._people_in_range.move_to_end(key)
+                return self._people_in_range[key]
+
+        values = set()
+        for label in self.frames:
+            values.update(self.between(label, start, end)[column].dropna().tolist())
+        values = frozenset(values)
+        with self._cache_lock:
+            self._people_in_range[key] = values
+            while len(self._people_in_range) > PEOPLE_RANGE_CACHE_SIZE:
+                self._people_in_range.popitem(last=False)
+        return values
+
+    def search_people(self, column, search_value, selected, start_date, end_date):
+        """Dropdown options matching search_value among the people with a clash in the date range."""
+        allowed = frozenset()
+        if start_date and end_date:
+            allowed = self.people_in_range(column, pd.to_datetime(start_date).date(), pd.to_datetime(end_date).date())
+        return search_options(self.people_index()[column], search_value, selected, allowed)
+
+
+# High-risk panel: people with clashes in at least this many categories,
+# most categories first, showing at most HIGH_RISK_TOP_N of them. Set the
+# environment variables of the same names to change them.
+HIGH_RISK_MIN_CATEGORIES = int(os.environ.get('HIGH_RISK_MIN_CATEGORIES', 1))
+HIGH_RISK_TOP_N = int(os.environ.get('HIGH_RISK_TOP_N', 500))
+
+
+def _joined_names(rows):
+    """', '-joined sorted distinct names per gms_id; only people with several names need a join."""
+    distinct = rows[['gms_id', 'name']].dropna().drop_duplicates().sort_values(['gms_id', 'name'])
+    several = distinct['gms_id'].duplicated(keep=False)
+    names = distinct[~several].set_index('gms_id')['name']
+    if several.any():
+        names = pd.concat([names, distinct[several].groupby('gms_id')['name'].agg(', '.join)])
+    return names
+
+
+def score_high_risk(clashes_by_category, min_categories=HIGH_RISK_MIN_CATEGORIES, top_n=HIGH_RISK_TOP_N):
+    """
+    One row per gms_id over the given clashes, ranked by the number of clash
+    categories, then clashes (distinct category and day pairs), then days
+    with a clash. Only people in at least min_categories categories are kept.
+
+    Returns (top, total): the first top_n rows (all of them if top_n is None)
+    and how many people qualified.
+    """
+    columns = ['gms_id', 'name', 'clash_categories', 'num_categories',
+               'clash_count', 'clash_days', 'first_date', 'last_date']
+    labels = sorted(label for label, df in clashes_by_category.items() if len(df))
+    if not labels:
+        return pd.DataFrame(columns=columns), 0
+
+    rows = pd.concat([clashes_by_category[label][['gms_id', 'name', 'date_created']].assign(category=code)
+                      for code, label in enumerate(labels)], ignore_index=True)
+    rows['day'] = pd.to_datetime(rows['date_created'])
+    by_person = rows.groupby('gms_id')
+
+    # A person's categories as a bit set, so naming them is one lookup per distinct set
+    person_categories = rows[['gms_id', 'category']].drop_duplicates()
+    category_bits = np.left_shift(1, person_categories['category'].astype('int64'))
+    category_sets = category_bits.groupby(person_categories['gms_id']).sum()
+    set_names = {bits: ', '.join(label for code, label in enumerate(labels) if bits >> code & 1)
+                 for bits in category_sets.unique()}
+
+    scores = pd.DataFrame({
+        'name': _joined_names(rows),
+        'clash_categories': category_sets.map(set_names),
+        'num_categories': person_categories.groupby('gms_id').size(),
+        'clash_count': rows.drop_duplicates(['gms_id', 'category', 'day']).groupby('gms_id').size(),
+        'clash_days': by_person['day'].nunique(),
+        'first_date': by_person['day'].min().dt.date,
+        'last_date': by_person['day'].max().dt.date,
+    })
+    scores['name'] = scores['name'].fillna('')
+    scores = scores[scores['num_categories'] >= min_categories]
+    scores = scores.rename_axis('gms_id').reset_index()
+    scores = scores.sort_values(['num_categories', 'clash_count', 'clash_days', 'gms_id'],
+                                ascending=[False, False, False, True], ignore_index=True)[columns]
+    return (scores if top_n is None else scores.head(top_n)), len(scores)
@@ -1,94 +1,186 @@
-from dash import Dash, dcc, html, Input, Output
+from dash import Dash, dcc, html, Input, Output, State
 import pandas as pd
-import sqlite3
 import plotly.express as px
-from loadcsv import load_csv_data
+from loadcsv import derived, load_completed_payouts, COMPLETED_PAYOUTS
+from sqlitestore import SqliteStore
+from typeahead import people_index, search_options
 
-def create_dash_disbursement_trend(server):
-    df = load_csv_data()
-    df = df[df['approval_stage'] == 'completed']
-    df['payout_date'] = pd.to_datetime(df['payout_date'])
+# Daily, weekly (Monday-Sunday) and monthly buckets, named like the radio values
+TREND_FREQS = ('D', 'W', 'M')
+
+# Disbursement totals per bucket, overall and per (gms_id, name). A bucket is
+# labelled by its last day, the same label pd.Grouper gives it.
+TREND_SCHEMA = """
+CREATE TABLE trend_total (
+    freq TEXT NOT NULL,
+    bucket DATE NOT NULL,
+    bucket_start DATE NOT NULL,
+    amount REAL NOT NULL,
+    PRIMARY KEY (freq, bucket)
+) WITHOUT ROWID;
+CREATE TABLE trend_person (
+    freq TEXT NOT NULL,
+    bucket DATE NOT NULL,
+    bucket_start DATE NOT NULL,
+    gms_id INTEGER,
+    name TEXT,
+    amount REAL NOT NULL
+);
+CREATE INDEX trend_person_gms ON trend_person (freq, gms_id, bucket);
+CREATE INDEX trend_person_name ON trend_person (freq, name, bucket);
+"""
+
+trend_store = SqliteStore('wallet_trend.db', TREND_SCHEMA, schema_version=2)
+
+
+def bucket_bounds(days, freq):
+    """First and last day of the freq bucket each day falls in."""
+    days = pd.DatetimeIndex(days)
+    if freq == 'W':
+        end = days + pd.to_timedelta(6 - days.weekday, unit='D')
+        return end - pd.Timedelta(days=6), end
+    if freq == 'M':
+        months = days.to_period('M')
+        return months.start_time, months.end_time.normalize()
+    return days, days
+
+
+def bucket_calendar(first, last, freq):
+    """Every bucket label from first to last, so empty buckets plot as zero like pd.Grouper."""
+    if freq == 'M':
+        return pd.period_range(first, last, freq='M').to_timestamp(how='end').normalize()
+    return pd.date_range(first, last, freq='7D' if freq == 'W' else 'D')
+
+
+def build_trend_db(df):
+    df = df[df['payout_date'].notna()]
+    days = df['payout_date'].dt.normalize()
 
-    conn = sqlite3.connect('wallet_trend.db')
-    df.to_sql('wallet_raw', conn, if_exists='replace', index=False)
-    conn.close()
-    print("Trend database created successfully.")
+    totals, people = [], []
+    for freq in TREND_FREQS:
+        start, end = bucket_bounds(days, freq)
+        keyed = pd.DataFrame({
+            'freq': freq, 'bucket': end.date, 'bucket_start': start.date,
+            'gms_id': df['gms_id'].to_numpy(), 'name': df['name'].to_numpy(),
+            'amount': df['amount'].to_numpy(),
+        })
+        totals.append(keyed.groupby(['freq', 'bucket', 'bucket_start'])['amount'].sum().reset_index())
+        people.append(keyed.groupby(['freq', 'bucket', 'bucket_start', 'gms_id', 'name'], dropna=False)['amount']
+                           .sum().reset_index())
 
+    if trend_store.replace_tables({'trend_total': pd.concat(totals, ignore_index=True),
+                                   'trend_person': pd.concat(people, ignore_index=True)}):
+        print("Trend rollups created successfully.")
+    return True
+
+
+def build_people_index(df):
+    return people_index(df)
+
+
+def warm_up():
+    """Build the rollups and search index ahead of the first request."""
+    derived('wallet_trend', build_trend_db, COMPLETED_PAYOUTS)
+    derived('trend_people_index', build_people_index, COMPLETED_PAYOUTS)
+
+
+def create_dash_disbursement_trend(server):
     app = Dash(__name__, server=server, url_base_pathname='/appDisbursementTrend/')
 
-    app.layout = html.Div([
-        # Header
-        html.Div([
-            html.H1("Disbursement Trend Over Time",
-                    style={'margin': '0', 'fontSize': '24px', 'fontWeight': '600', 'color': '#1f2937'})
-        ], style={'padding': '20px 40px', 'backgroundColor': '#ffffff', 'borderBottom': '1px solid #e5e7eb'}),
+    def serve_layout():
+        df = load_completed_payouts()
+        return html.Div([
+            # Header
+            html.Div([
+                html.H1("Disbursement Trend Over Time",
+                        style={'margin': '0', 'fontSize': '24px', 'fontWeight': '600', 'color': '#1f2937'})
+            ], style={'padding': '20px 40px', 'backgroundColor': '#ffffff', 'borderBottom': '1px solid #e5e7eb'}),
 
-        # Main content container
-        html.Div([
-            # Top controls section
+            # Main content container
             html.Div([
-                # Left: GMS ID & Name filters
+                # Top controls section
                 html.Div([
-                    dcc.Dropdown(
-                        id='gmsid-filter',
-                        options=[{'label': str(g), 'value': g} for g in sorted(df['gms_id'].unique())],
-                        placeholder="Select GMS ID(s)", multi=True,
-                        style={'width': '300px', 'fontSize': '14px'}
-                    ),
-                    dcc.Dropdown(
-                        id='name-filter',
-                        options=[{'label': str(n), 'value': n} for n in sorted(df['name'].unique())],
-                        placeholder="Select Name(s)", multi=True,
-                        style={'width': '300px', 'fontSize': '14px', 'marginTop': '10px'}
-                    )
-                ], style={'flex': '1'}),
-
-                # Right: Date picker and grouping radio
-                html.Div([
-                    dcc.DatePickerRange(
-                        id='date-range',
-                        min_date_allowed=df['payout_date'].min().date(),
-                        max_date_allowed=df['payout_date'].max().date(),
-                        start_date=df['payout_date'].min().date(),
-                        end_date=df['payout_date'].max().date(),
-                        display_format='DD/MM/YYYY', clearable=True, with_portal=True
-                    ),
-                    dcc.RadioItems(
-                        id='time-grouping',
-                        options=[
-                            {'label': 'Daily', 'value': 'D'},
-                            {'label': 'Weekly', 'value': 'W'},
-                            {'label': 'Monthly', 'value': 'M'}
-                        ],
-                        value='W',
-                        labelStyle={'display': 'inline-block', 'marginRight': '15px', 'fontSize': '14px', 'color': '#6b7280'},
-                        style={'marginTop': '10px'}
-                    )
-                ], style={'display': 'flex', 'flexDirection': 'column', 'alignItems': 'flex-end'})
-            ], style={'display': 'flex', 'justifyContent': 'space-between', 'alignItems': 'flex-start',
-                      'padding': '0 20px', 'marginBottom': '20px'}),
-
-            # Line chart section in colored box
-            html.Div([
+                    # Left: GMS ID & Name filters
+                    html.Div([
+                        dcc.Dropdown(
+                            id='gmsid-filter',
+                            options=[],
+                            placeholder="Type to search GMS ID(s)", multi=True,
+                            style={'width': '300px', 'fontSize': '14px'}
+                        ),
+                        dcc.Dropdown(
+                            id='name-filter',
+                            options=[],
+                            placeholder="Type to search Name(s)", multi=True,
+                            style={'width': '300px', 'fontSize': '14px', 'marginTop': '10px'}
+                        )
+                    ], style={'flex': '1'}),
+
+                    # Right: Date picker and grouping radio
+                    html.Div([
+                        dcc.DatePickerRange(
+                            id='date-range',
+                            min_date_allowed=df['payout_date'].min().date(),
+                            max_date_allowed=df['payout_date'].max().date(),
+                            start_date=df['payout_date'].min().date(),
+                            end_date=df['payout_date'].max().date(),
+                            display_format='DD/MM/YYYY', clearable=True, with_portal=True
+                        ),
+                        dcc.RadioItems(
+                            id='time-grouping',
+                            options=[
+                                {'label': 'Daily', 'value': 'D'},
+                                {'label': 'Weekly', 'value': 'W'},
+                                {'label': 'Monthly', 'value': 'M'}
+                            ],
+                            value='W',
+                            labelStyle={'display': 'inline-block', 'marginRight': '15px', 'fontSize': '14px', 'color': '#6b7280'},
+                            style={'marginTop': '10px'}
+                        )
+                    ], style={'display': 'flex', 'flexDirection': 'column', 'alignItems': 'flex-end'})
+                ], style={'display': 'flex', 'justifyContent': 'space-between', 'alignItems': 'flex-start',
+                          'padding': '0 20px', 'marginBottom': '20px'}),
+
+                # Line chart section in colored box
                 html.Div([
-                    html.H2("Total Disbursed Amount Over Time",
-                            style={'textAlign': 'center', 'fontSize': '18px', 'fontWeight': '600',
-                                'color': '#1f2937', 'marginBottom': '20px'}),
-                    dcc.Graph(id='line-chart', config={'displayModeBar': False}, style={'height': '300px'})
-                ], style={
-                    'backgroundColor': '#E6E8EC',
-                    'padding': '20px',
-                    'borderRadius': '12px',
-                    'boxShadow': '0 2px 8px rgba(0, 0, 0, 0.05)'
-                })
-            ], style={'padding': '0 20px', 'marginBottom': '40px'}),
+                    html.Div([
+                        html.H2("Total Disbursed Amount Over Time",
+                                style={'textAlign': 'center', 'fontSize': '18px', 'fontWeight': '600',
+                                    'color': '#1f2937', 'marginBottom': '20px'}),
+                        dcc.Graph(id='line-chart', config={'displayModeBar': False}, style={'height': '300px'})
+                    ], style={
+                        'backgroundColor': '#E6E8EC',
+                        'padding': '20px',
+                        'borderRadius': '12px',
+                        'boxShadow': '0 2px 8px rgba(0, 0, 0, 0.05)'
+                    })
+                ], style={'padding': '0 20px', 'marginBottom': '40px'}),
 
 
-        ], style={'padding': '30px 20px', 'backgroundColor': '#ffffff',
-                  'minHeight': 'calc(100vh - 80px)'}),
+            ], style={'padding': '30px 20px', 'backgroundColor': '#ffffff',
+                      'minHeight': 'calc(100vh - 80px)'}),
+
+        ], style={'backgroundColor': '#f9fafb', 'minHeight': '100vh',
+                  'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif'})
+
+    app.layout = serve_layout
+
+    # The roster is too long to send as options; matches are looked up as the user types
+    @app.callback(
+        Output('gmsid-filter', 'options'),
+        Input('gmsid-filter', 'search_value'),
+        State('gmsid-filter', 'value')
+    )
+    def search_gms_ids(search_value, selected):
+        return search_options(derived('trend_people_index', build_people_index, COMPLETED_PAYOUTS)['gms_id'], search_value, selected)
 
-    ], style={'backgroundColor': '#f9fafb', 'minHeight': '100vh',
-              'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif'})
+    @app.callback(
+        Output('name-filter', 'options'),
+        Input('name-filter', 'search_value'),
+        State('name-filter', 'value')
+    )
+    def search_names(search_value, selected):
+        return search_options(derived('trend_people_index', build_people_index, COMPLETED_PAYOUTS)['name'], search_value, selected)
 
     @app.callback(
         Output('line-chart', 'figure'),
@@ -99,30 +191,62 @@ def create_dash_disbursement_trend(server):
         Input('time-grouping', 'value')
     )
     def update_line_chart(gms_ids, names, start_date, end_date, grouping):
-        query = "SELECT * FROM wallet_raw WHERE 1=1"
-        params = []
+        freq = grouping if grouping in TREND_FREQS else 'W'
+        start = pd.Timestamp(start_date).normalize() if start_date else None
+        end = pd.Timestamp(end_date).normalize() if end_date else None
 
+        table = 'trend_person' if gms_ids or names else 'trend_total'
+        filters = ""
+        filter_params = []
         if gms_ids:
-            qmarks = ','.join('?' for _ in gms_ids)
-            query += f" AND gms_id IN ({qmarks})"
-            params += gms_ids
+            filters += f" AND gms_id IN ({','.join('?' for _ in gms_ids)})"
+            filter_params += gms_ids
         if names:
-            qmarks = ','.join('?' for _ in names)
-            query += f" AND name IN ({qmarks})"
-            params += names
-        if start_date:
-            query += " AND payout_date >= ?"; params.append(start_date)
-        if end_date:
-            query += " AND payout_date <= ?"; params.append(end_date)
-
-        conn = sqlite3.connect('wallet_trend.db')
-        temp_df = pd.read_sql(query, conn, params=params, parse_dates=['payout_date'])
-        conn.close()
-
-        if temp_df.empty:
+            filters += f" AND name IN ({','.join('?' for _ in names)})"
+            filter_params += names
+
+        derived('wallet_trend', build_trend_db, COMPLETED_PAYOUTS)  # rebuilds the rollups if the data changed
+
+        # Buckets that lie wholly inside the date range come straight from the rollup
+        query = f"SELECT bucket, SUM(amount) AS amount FROM {table} WHERE freq = ?{filters}"
+        params = [freq] + filter_params
+        if start is not None:
+            query += " AND bucket_start >= ?"; params.append(start.date())
+        if end is not None:
+            query += " AND bucket <= ?"; params.append(end.date())
+        parts = [trend_store.read_sql(query + " GROUP BY bucket", params)]
+
+        # Buckets cut by the range are summed from the days inside it
+        edges, edge_params = [], []
+        if start is not None:
+            first_start, first_end = bucket_bounds([start], freq)
+            if first_start[0] != start:
+                edges.append("bucket <= ?"); edge_params.append(first_end[0].date())
+        if end is not None:
+            last_start, last_end = bucket_bounds([end], freq)
+            if last_end[0] != end:
+                edges.append("bucket >= ?"); edge_params.append(last_start[0].date())
+        if edges:
+            query = f"SELECT bucket, SUM(amount) AS amount FROM {table} WHERE freq = 'D'{filters}"
+            params = list(filter_params)
+            if start is not None:
+                query += " AND bucket >= ?"; params.append(start.date())
+            if end is not None:
+                query += " AND bucket <= ?"; params.append(end.date())
+            query += f" AND ({' OR '.join(edges)})"
+            days = trend_store.read_sql(query + " GROUP BY bucket", params + edge_params)
+            days['bucket'] = bucket_bounds(pd.to_datetime(days['bucket']), freq)[1]
+            parts.append(days)
+
+        totals = pd.concat(parts, ignore_index=True)
+        if totals.empty:
             return px.line(title="No data available")
 
-        grouped = temp_df.groupby(pd.Grouper(key='payout_date', freq=grouping))['amount'].sum().reset_index()
+        totals['bucket'] = pd.to_datetime(totals['bucket'])
+        totals = totals.groupby('bucket')['amount'].sum()
+        calendar = bucket_calendar(totals.index.min(), totals.index.max(), freq)
+        grouped = totals.reindex(calendar, fill_value=0).rename_axis('payout_date').reset_index()
+
         fig = px.line(grouped, x='payout_date', y='amount',
                       title=f"Total Disbursed Amount Over Time ({grouping})",
                       labels={'payout_date': 'Date', 'amount': 'Total Disbursed'})
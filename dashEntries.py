@@ -6,47 +6,61 @@ from io import StringIO, BytesIO
 from datetime import datetime, date
 import dash_bootstrap_components as dbc
 from dash_iconify import DashIconify
-import msoffcrypto
-import io
+from loadentries import load_entries_data, derived, get_version
+from table_paging import paging_props, current_page, table_page
+
+ENTRY_DIMENSIONS = ['date', 'Where', 'Category']
+
+# Columns of the entries detail table, by their name in the entries frame
+ENTRIES_TABLE_COLUMNS = {'When': 'Time', 'full_name': 'Name', 'Who': 'BN ID', 'Where': 'Location', 'Category': 'Category'}
+
+
+def build_entries_aggregates(df):
+    """
+    Small tables the main dashboard filters instead of the full entries frame:
+    counts       - entries per (date, Where, Category)
+    people       - each distinct full name seen per (date, Where, Category), as a code
+    venues       - distinct people (by Who) per (date, VenuePrefix)
+    venue_groups - distinct people (by Who) per (date, Category, VenuePrefix)
+    Rows without a date are kept in counts and people so unfiltered totals match.
+    """
+    keyed = df[ENTRY_DIMENSIONS + ['VenuePrefix']].assign(
+        person=pd.factorize(df['full_name'])[0],
+        who=pd.factorize(df['Who'].astype(str))[0],
+    )
+    counts = keyed.groupby(ENTRY_DIMENSIONS, dropna=False).size().reset_index(name='count')
+    # Missing names get code -1 and aren't counted, like nunique()
+    people = keyed.loc[keyed['person'] >= 0, ENTRY_DIMENSIONS + ['person']].drop_duplicates()
+    venues = keyed.groupby(['date', 'VenuePrefix'])['who'].nunique().reset_index(name='count')
+    venue_groups = keyed.groupby(['date', 'Category', 'VenuePrefix'])['who'].nunique().reset_index(name='people')
+    return {'counts': counts, 'people': people, 'venues': venues, 'venue_groups': venue_groups}
+
+
+def build_entries_table_rows(df):
+    """The detail table's rows, most recent first, with the date kept for the date filter."""
+    rows = df.sort_values('When', ascending=False)[['date'] + list(ENTRIES_TABLE_COLUMNS)]
+    return rows.rename(columns=ENTRIES_TABLE_COLUMNS)
+
+
+def _filter_mask(table, start_date, end_date, selected_locations, selected_categories):
+    keep = pd.Series(True, index=table.index)
+    if start_date and end_date:
+        keep &= (table['date'] >= pd.to_datetime(start_date).date()) & \
+                (table['date'] <= pd.to_datetime(end_date).date())
+    if selected_locations:
+        keep &= table['Where'].isin(selected_locations)
+    if selected_categories:
+        keep &= table['Category'].isin(selected_categories)
+    return keep
 
 
 def create_dash_entries(server):
-    # Load the Excel file
+    def get_aggregates():
+        return derived('entries_aggregates', build_entries_aggregates)
 
-    url = "https://wacsg2025-my.sharepoint.com/:x:/p/pek_yi_liang/EdM0Y1fy_6lNkJR7fAAdx5gBNxzzLUAt3eVIz3bqxqVrpg?e=hrReix&download=1"
-    password = "wacsg2025"
-    response = requests.get(url)
-    response.raise_for_status()
-    encrypted = io.BytesIO(response.content)
-    office_file = msoffcrypto.OfficeFile(encrypted)
-    office_file.load_key(password=password)
-    decrypted = io.BytesIO()
-    office_file.decrypt(decrypted)
-    df = pd.read_excel(decrypted, sheet_name="Sheet1") 
+    # Build the aggregates now so the first request doesn't pay for it
+    get_aggregates()
 
-    #url = "https://wacsg2025-my.sharepoint.com/:x:/p/pek_yi_liang/ETfDtmYnqRFGkY-oPqXrhVkBmoggzHvcVXE9YTNfGkUbWQ?download=1"
-    #response = requests.get(url)
-    #response.raise_for_status()
-    #df = pd.read_excel(BytesIO(response.content))
-    
-    # Convert When column to datetime with explicit format handling
-    df['When'] = pd.to_datetime(df['When'], format='mixed', errors='coerce')
-    df['date'] = df['When'].dt.date
-    
-    # Extract first and last names from the Who column
-    # Assuming the Who column contains names that can be split
-    df['Who'] = df['Who'].astype(str).str.split()
-    df['first_name'] = df['Given Name']
-    df['last_name'] = df['Family Name']
-    df['full_name'] = df['first_name'] + ' ' + df['last_name']
-    df['full_name'] = df['full_name'].str.strip().str.upper()
-    df['Where'] = df['Where'].fillna("Unknown")
-    df['Category'] = df['Category'].fillna("Unknown")
-    
-    # Get date range for filters
-    min_date = df['date'].min()
-    max_date = df['date'].max()
-    
     app = Dash(__name__, server=server, routes_pathname_prefix='/appEntries/', external_stylesheets=[dbc.themes.BOOTSTRAP])
     app.title = "SEA AGE Attendance Dashboard"
 
@@ -69,265 +83,308 @@ def create_dash_entries(server):
         'minHeight': '100vh'
     }
     
-    app.layout = html.Div([
-        dbc.Container([
-            # Header
-            dbc.Row([
-                dbc.Col([
-                    html.H2("SEA AGE Attendance Dashboard", 
-                           className="text-center mb-4", 
-                           style={
-                            'color': 'Black', 'textAlign': 'center',
-                            'fontSize': '2.5rem', 'fontWeight': 'bold',
-                            'marginBottom': '30px', 'fontFamily': 'Arial, sans-serif'
-                })
-                ])
-            ], className="mb-0"),  # Remove bottom margin
+    def serve_layout():
+        df = load_entries_data()
+
+        # Get date range for filters; entries whose time couldn't be parsed have no date
+        days = get_aggregates()['counts']['date'].dropna()
+        min_date = days.min()
+        max_date = days.max()
+
+        return html.Div([
+            dbc.Container([
+                # Header
+                dbc.Row([
+                    dbc.Col([
+                        html.H2("SEA AGE Attendance Dashboard", 
+                               className="text-center mb-4", 
+                               style={
+                                'color': 'Black', 'textAlign': 'center',
+                                'fontSize': '2.5rem', 'fontWeight': 'bold',
+                                'marginBottom': '30px', 'fontFamily': 'Arial, sans-serif'
+                    })
+                    ])
+                ], className="mb-0"),  # Remove bottom margin
             
-            # Summary Statistics - with no top margin
-            dbc.Row(id='summary-stats', className="mb-4 mt-0"),
+                # Summary Statistics - with no top margin
+                dbc.Row(id='summary-stats', className="mb-4 mt-0"),
             
-            # Main Filters - Collapsible
+                # Main Filters - Collapsible
             
-            # Charts Row - No top margin
-            dbc.Row([
-                dbc.Col([
-                    dbc.Card([
-                                    html.Div([
-                html.Div([
-                    html.H5("Daily Entries (By Entries)"),
-                    html.Button([
-                        DashIconify(icon="carbon:filter", width=20, style={'marginRight': '8px'}),
-                        "Graph Filters"
-                    ],
-                    id='collapse-button',
-                    n_clicks=0,
-                    style={
-                        'border': '1px solid #3498db',
-                        'borderRadius': '8px',
-                        'padding': '8px 16px',
-                        'backgroundColor': '#3498db',
-                        'color': 'white',
-                        'cursor': 'pointer',
-                        'fontSize': '14px',
-                        'fontWeight': '500',
+                # Charts Row - No top margin
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Card([
+                                        html.Div([
+                    html.Div([
+                        html.H5("Daily Entries (By Entries)"),
+                        html.Button([
+                            DashIconify(icon="carbon:filter", width=20, style={'marginRight': '8px'}),
+                            "Graph Filters"
+                        ],
+                        id='collapse-button',
+                        n_clicks=0,
+                        style={
+                            'border': '1px solid #3498db',
+                            'borderRadius': '8px',
+                            'padding': '8px 16px',
+                            'backgroundColor': '#3498db',
+                            'color': 'white',
+                            'cursor': 'pointer',
+                            'fontSize': '14px',
+                            'fontWeight': '500',
+                            'display': 'flex',
+                            'alignItems': 'center'
+                        })
+                    ], style={
                         'display': 'flex',
-                        'alignItems': 'center'
-                    })
-                ], style={
-                    'display': 'flex',
-                    'alignItems': 'center',
-                    'justifyContent': 'space-between',
-                    'marginBottom': '10px',  # Reduced margin
-                    'padding': '15px',
-                    'backgroundColor': 'rgba(248, 249, 250, 1)',  # Semi-transparent
-                    'borderRadius': '8px'
-                }),
+                        'alignItems': 'center',
+                        'justifyContent': 'space-between',
+                        'marginBottom': '10px',  # Reduced margin
+                        'padding': '15px',
+                        'backgroundColor': 'rgba(248, 249, 250, 1)',  # Semi-transparent
+                        'borderRadius': '8px'
+                    }),
                 
-                dbc.Collapse([
-                    dbc.Card([
-                        dbc.CardBody([
-                            dbc.Row([
-                                dbc.Col([
-                                    html.Label("Date Range", className="fw-bold mb-2"),
-                                    dcc.DatePickerRange(
-                                        id='date-range-picker',
-                                        start_date=min_date,
-                                        end_date=max_date,
-                                        display_format='DD/MM/YYYY',
-                                        style={'width': '100%'}
-                                    )
-                                ], width=4),
+                    dbc.Collapse([
+                        dbc.Card([
+                            dbc.CardBody([
+                                dbc.Row([
+                                    dbc.Col([
+                                        html.Label("Date Range", className="fw-bold mb-2"),
+                                        dcc.DatePickerRange(
+                                            id='date-range-picker',
+                                            start_date=min_date,
+                                            end_date=max_date,
+                                            display_format='DD/MM/YYYY',
+                                            style={'width': '100%'}
+                                        )
+                                    ], width=4),
                                 
-                                dbc.Col([
-                                    html.Label("Location", className="fw-bold mb-2"),
-                                    dcc.Dropdown(
-                                        id='location-dropdown',
-                                        options=[{'label': loc, 'value': loc} for loc in sorted(df['Where'].unique())],
-                                        value=df['Where'].unique().tolist(),
-                                        multi=True,
-                                        placeholder="Select locations...",
-                                        className="mb-0"
-                                    )
-                                ], width=4),
+                                    dbc.Col([
+                                        html.Label("Location", className="fw-bold mb-2"),
+                                        dcc.Dropdown(
+                                            id='location-dropdown',
+                                            options=[{'label': loc, 'value': loc} for loc in sorted(df['Where'].unique())],
+                                            value=df['Where'].unique().tolist(),
+                                            multi=True,
+                                            placeholder="Select locations...",
+                                            className="mb-0"
+                                        )
+                                    ], width=4),
                                 
-                                dbc.Col([
-                                    html.Label("Category", className="fw-bold mb-2"),
-                                    dcc.Dropdown(
-                                        id='category-dropdown',
-                                        options=[{'label': cat, 'value': cat} for cat in sorted(df['Category'].unique())],
-                                        value=df['Category'].unique().tolist(),
-                                        multi=True,
-                                        placeholder="Select categories...",
-                                        className="mb-0"
-                                    )
-                                ], width=4)
+                                    dbc.Col([
+                                        html.Label("Category", className="fw-bold mb-2"),
+                                        dcc.Dropdown(
+                                            id='category-dropdown',
+                                            options=[{'label': cat, 'value': cat} for cat in sorted(df['Category'].unique())],
+                                            value=df['Category'].unique().tolist(),
+                                            multi=True,
+                                            placeholder="Select categories...",
+                                            className="mb-0"
+                                        )
+                                    ], width=4)
+                                ])
+                            ])
+                        ], style={'backgroundColor': 'rgba(248, 250, 252, 0.95)', 'border': '1px solid #e2e8f0'})
+                    ], id="collapse", is_open=False)
+                ], className="mb-3"),  # Reduced bottom margin
+                            dbc.CardBody([
+                                dcc.Graph(id='attendance-chart')
                             ])
-                        ])
-                    ], style={'backgroundColor': 'rgba(248, 250, 252, 0.95)', 'border': '1px solid #e2e8f0'})
-                ], id="collapse", is_open=False)
-            ], className="mb-3"),  # Reduced bottom margin
-                        dbc.CardBody([
-                            dcc.Graph(id='attendance-chart')
-                        ])
-                    ], style={'border': '1px solid #e2e8f0', 'backgroundColor': 'rgba(255, 255, 255, 0.98)'})
-                ], width=12)
-            ], className="mb-4 mt-0"),  # No top margin, consistent bottom margin
+                        ], style={'border': '1px solid #e2e8f0', 'backgroundColor': 'rgba(255, 255, 255, 0.98)'})
+                    ], width=12)
+                ], className="mb-4 mt-0"),  # No top margin, consistent bottom margin
             
-            # Location Breakdown - No gaps
-            dbc.Row([
-                dbc.Col([
-                    dbc.Card([
-                        dbc.CardHeader([
-                            html.Div([
-                                html.H5("Daily Attendance by Location (By Attendance)", style={'margin': '0', 'color': '#1f2937'}),
-                            ], style={
-                                'display': 'flex',
-                                'alignItems': 'center',
-                                'justifyContent': 'space-between',
-                                'padding': '15px',
-                                'backgroundColor': 'rgba(248, 249, 250, 0.9)',
-                                'borderRadius': '8px'
-                            })
-                        ]),
-                        dbc.CardBody([
-                            dbc.Row([
-                                dbc.Col([
-                                    html.Label("Select Date", className="fw-bold mb-2"),
-                                    dcc.Dropdown(
-                                        id='date-selector',
-                                        placeholder="Select a date...",
-                                        className="mb-3"
-                                    )
-                                ], width=4)
+                # Location Breakdown - No gaps
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardHeader([
+                                html.Div([
+                                    html.H5("Daily Attendance by Location (By Attendance)", style={'margin': '0', 'color': '#1f2937'}),
+                                ], style={
+                                    'display': 'flex',
+                                    'alignItems': 'center',
+                                    'justifyContent': 'space-between',
+                                    'padding': '15px',
+                                    'backgroundColor': 'rgba(248, 249, 250, 0.9)',
+                                    'borderRadius': '8px'
+                                })
                             ]),
-                            dcc.Graph(id='location-breakdown-chart'),
-                            html.Div(id='location-summary-table')
-                        ])
-                    ], style={'border': '1px solid #e2e8f0', 'backgroundColor': 'rgba(255, 255, 255, 0.98)'})
-                ], width=12)
-            ], className="mb-4 mt-0"),  # No top margin
+                            dbc.CardBody([
+                                dbc.Row([
+                                    dbc.Col([
+                                        html.Label("Select Date", className="fw-bold mb-2"),
+                                        dcc.Dropdown(
+                                            id='date-selector',
+                                            placeholder="Select a date...",
+                                            className="mb-3"
+                                        )
+                                    ], width=4)
+                                ]),
+                                dcc.Graph(id='location-breakdown-chart'),
+                                html.Div(id='location-summary-table')
+                            ])
+                        ], style={'border': '1px solid #e2e8f0', 'backgroundColor': 'rgba(255, 255, 255, 0.98)'})
+                    ], width=12)
+                ], className="mb-4 mt-0"),  # No top margin
             
 
-            # Entrance Breakdown Section
-            dbc.Row([
-                dbc.Col([
-                    dbc.Card([
-                        dbc.CardHeader([
-                            html.Div([
-                                html.H5("Attendance Breakdown by Date and Venue (By Attendance)", style={'margin': '0', 'color': '#1f2937'}),
-                            ], style={
-                                'display': 'flex',
-                                'alignItems': 'center',
-                                'justifyContent': 'space-between',
-                                'padding': '15px',
-                                'backgroundColor': 'rgba(248, 249, 250, 0.9)',
-                                'borderRadius': '8px'
-                            })
-                        ]),
-                        dbc.CardBody([
-                            dbc.Row([
-                                dbc.Col([
-                                    html.Label("Select Date", className="fw-bold mb-2"),
-                                    dcc.Dropdown(
-                                        id='entrance-date-dropdown',
-                                        options=[{'label': str(d), 'value': str(d)} for d in sorted(df['date'].unique(), reverse=True)],
-                                        placeholder="Select a date...",
-                                        className="mb-3"
-                                    )
-                                ], width=6),
-                                dbc.Col([
-                                    html.Label("Select Venue", className="fw-bold mb-2"),
-                                    dcc.Dropdown(
-                                        id='entrance-venue-dropdown',
-                                        options=[{'label': v, 'value': v} for v in sorted(df['Where'].str.split('_').str[0].unique())],
-                                        placeholder="Select a venue...",
-                                        className="mb-3"
-                                    )
-                                ], width=6)
+                # Entrance Breakdown Section
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardHeader([
+                                html.Div([
+                                    html.H5("Attendance Breakdown by Date and Venue (By Attendance)", style={'margin': '0', 'color': '#1f2937'}),
+                                ], style={
+                                    'display': 'flex',
+                                    'alignItems': 'center',
+                                    'justifyContent': 'space-between',
+                                    'padding': '15px',
+                                    'backgroundColor': 'rgba(248, 249, 250, 0.9)',
+                                    'borderRadius': '8px'
+                                })
                             ]),
-                            dcc.Graph(id='entrance-breakdown-chart'),
-                            html.Div(id='entrance-summary-table')
-                        ])
-                    ], style={'border': '1px solid #e2e8f0', 'backgroundColor': 'rgba(255, 255, 255, 0.98)'})
-                ], width=12)
-            ], className="mb-4 mt-0"),
+                            dbc.CardBody([
+                                dbc.Row([
+                                    dbc.Col([
+                                        html.Label("Select Date", className="fw-bold mb-2"),
+                                        dcc.Dropdown(
+                                            id='entrance-date-dropdown',
+                                            options=[{'label': str(d), 'value': str(d)} for d in sorted(days.unique(), reverse=True)],
+                                            placeholder="Select a date...",
+                                            className="mb-3"
+                                        )
+                                    ], width=6),
+                                    dbc.Col([
+                                        html.Label("Select Venue", className="fw-bold mb-2"),
+                                        dcc.Dropdown(
+                                            id='entrance-venue-dropdown',
+                                            options=[{'label': v, 'value': v} for v in sorted(df['VenuePrefix'].unique())],
+                                            placeholder="Select a venue...",
+                                            className="mb-3"
+                                        )
+                                    ], width=6)
+                                ]),
+                                dcc.Graph(id='entrance-breakdown-chart'),
+                                html.Div(id='entrance-summary-table')
+                            ])
+                        ], style={'border': '1px solid #e2e8f0', 'backgroundColor': 'rgba(255, 255, 255, 0.98)'})
+                    ], width=12)
+                ], className="mb-4 mt-0"),
 
-            # Entries Table Section - Simplified, no gaps
-            dbc.Row([
-                dbc.Col([
-                    dbc.Card([
-                        dbc.CardHeader([
-                            html.Div([
-                                html.H5("All Entries", style={'margin': '0', 'color': '#1f2937'}),
-                                html.Button([
-                                    DashIconify(icon="carbon:filter", width=20, style={'marginRight': '8px'}),
-                                    "Table Filters"
-                                ],
-                                id='table-collapse-button',
-                                n_clicks=0,
-                                style={
-                                    'border': '1px solid #3498db',
-                                    'borderRadius': '8px',
-                                    'padding': '8px 16px',
-                                    'backgroundColor': '#3498db',
-                                    'color': 'white',
-                                    'cursor': 'pointer',
-                                    'fontSize': '14px',
-                                    'fontWeight': '500',
+                # Entries Table Section - Simplified, no gaps
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardHeader([
+                                html.Div([
+                                    html.H5("All Entries", style={'margin': '0', 'color': '#1f2937'}),
+                                    html.Button([
+                                        DashIconify(icon="carbon:filter", width=20, style={'marginRight': '8px'}),
+                                        "Table Filters"
+                                    ],
+                                    id='table-collapse-button',
+                                    n_clicks=0,
+                                    style={
+                                        'border': '1px solid #3498db',
+                                        'borderRadius': '8px',
+                                        'padding': '8px 16px',
+                                        'backgroundColor': '#3498db',
+                                        'color': 'white',
+                                        'cursor': 'pointer',
+                                        'fontSize': '14px',
+                                        'fontWeight': '500',
+                                        'display': 'flex',
+                                        'alignItems': 'center'
+                                    })
+                                ], style={
                                     'display': 'flex',
-                                    'alignItems': 'center'
+                                    'alignItems': 'center',
+                                    'justifyContent': 'space-between',
+                                    'padding': '15px',
+                                    'backgroundColor': 'rgba(248, 249, 250, 1)',
+                                    'borderRadius': '8px'
                                 })
-                            ], style={
-                                'display': 'flex',
-                                'alignItems': 'center',
-                                'justifyContent': 'space-between',
-                                'padding': '15px',
-                                'backgroundColor': 'rgba(248, 249, 250, 1)',
-                                'borderRadius': '8px'
-                            })
-                        ]),
-                        dbc.CardBody([
-                            # Collapsible Table Filters
-                            dbc.Collapse([
-                                dbc.Card([
-                                    dbc.CardBody([
-                                        dbc.Row([
-                                            dbc.Col([
-                                                html.Label("Filter by Date", className="fw-bold mb-2"),
-                                                dcc.DatePickerSingle(
-                                                    id='table-date-filter',
-                                                    date=max_date,
-                                                    display_format='DD/MM/YYYY',
-                                                    placeholder="Select date..."
-                                                )
-                                            ], width=6),
-                                            dbc.Col([
-                                                html.Label("Filter by Name", className="fw-bold mb-2"),
-                                                dcc.Input(
-                                                    id='table-name-filter',
-                                                    type='text',
-                                                    placeholder="Enter name to search...",
-                                                    className="form-control"
-                                                )
-                                            ], width=6)
+                            ]),
+                            dbc.CardBody([
+                                # Collapsible Table Filters
+                                dbc.Collapse([
+                                    dbc.Card([
+                                        dbc.CardBody([
+                                            dbc.Row([
+                                                dbc.Col([
+                                                    html.Label("Filter by Date", className="fw-bold mb-2"),
+                                                    dcc.DatePickerSingle(
+                                                        id='table-date-filter',
+                                                        date=max_date,
+                                                        display_format='DD/MM/YYYY',
+                                                        placeholder="Select date..."
+                                                    )
+                                                ], width=6),
+                                                dbc.Col([
+                                                    html.Label("Filter by Name", className="fw-bold mb-2"),
+                                                    dcc.Input(
+                                                        id='table-name-filter',
+                                                        type='text',
+                                                        placeholder="Enter name to search...",
+                                                        className="form-control"
+                                                    )
+                                                ], width=6)
+                                            ])
                                         ])
-                                    ])
-                                ], style={'backgroundColor': 'rgba(248, 250, 252, 0.95)', 'border': '1px solid #e2e8f0'})
-                            ], id="table-collapse", is_open=False, className="mb-3"),
+                                    ], style={'backgroundColor': 'rgba(248, 250, 252, 0.95)', 'border': '1px solid #e2e8f0'})
+                                ], id="table-collapse", is_open=False, className="mb-3"),
                             
-                            # Entry count info
-                            html.Div(id='table-info', className="mb-3"),
+                                # Entry count info
+                                html.Div(id='table-info', className="mb-3"),
                             
-                            # Data table
-                            html.Div(id='data-table')
-                        ])
-                    ], style={'border': '1px solid #e2e8f0', 'backgroundColor': 'rgba(255, 255, 255, 0.98)'})
-                ], width=12)
-            ], className="mt-0")  # No top margin for seamless connection
+                                # Data table
+                                html.Div(id='data-table'),
+                                html.Div(
+                                    dash_table.DataTable(
+                                        id='entries-table',
+                                        columns=[{"name": col, "id": col} for col in ENTRIES_TABLE_COLUMNS.values()],
+                                        data=[],
+                                        style_table={'overflowX': 'auto'},
+                                        style_cell={
+                                            'textAlign': 'left',
+                                            'padding': '12px',
+                                            'fontFamily': 'system-ui, -apple-system, sans-serif',
+                                            'fontSize': '14px'
+                                        },
+                                        style_header={
+                                            'backgroundColor': '#f8fafc',
+                                            'fontWeight': 'bold',
+                                            'border': '1px solid #e2e8f0',
+                                            'color': '#1f2937'
+                                        },
+                                        style_data={
+                                            'backgroundColor': 'white',
+                                            'border': '1px solid #f3f4f6'
+                                        },
+                                        style_data_conditional=[
+                                            {
+                                                'if': {'row_index': 'odd'},
+                                                'backgroundColor': '#f9fafb'
+                                            }
+                                        ],
+                                        **paging_props(20)
+                                    ),
+                                    id='entries-table-container',
+                                    style={'display': 'none'}
+                                )
+                            ])
+                        ], style={'border': '1px solid #e2e8f0', 'backgroundColor': 'rgba(255, 255, 255, 0.98)'})
+                    ], width=12)
+                ], className="mt-0")  # No top margin for seamless connection
             
-        ], style=content_wrapper_style, fluid=True)
-    ], style=background_style)
+            ], style=content_wrapper_style, fluid=True)
+        ], style=background_style)
+
+    app.layout = serve_layout
     
     # Rest of your callbacks remain the same...
     # Callback for main filters collapse
@@ -365,23 +422,14 @@ def create_dash_entries(server):
          Input('date-selector', 'value')]
     )
     def update_main_dashboard(start_date, end_date, selected_locations, selected_categories, selected_date):
-        # Filter data
-        filtered_df = df.copy()
-        
-        if start_date and end_date:
-            filtered_df = filtered_df[
-                (filtered_df['date'] >= pd.to_datetime(start_date).date()) &
-                (filtered_df['date'] <= pd.to_datetime(end_date).date())
-            ]
-        
-        if selected_locations:
-            filtered_df = filtered_df[filtered_df['Where'].isin(selected_locations)]
-            
-        if selected_categories:
-            filtered_df = filtered_df[filtered_df['Category'].isin(selected_categories)]
+        aggregates = get_aggregates()
+        counts = aggregates['counts']
+        counts = counts[_filter_mask(counts, start_date, end_date, selected_locations, selected_categories)]
+        people = aggregates['people']
+        people = people[_filter_mask(people, start_date, end_date, selected_locations, selected_categories)]
         
         # Create daily attendance chart with better styling
-        daily_counts = filtered_df.groupby('date').size().reset_index(name='count')
+        daily_counts = counts.groupby('date')['count'].sum().reset_index()
         daily_counts['date_str'] = daily_counts['date'].astype(str)
         
         fig = px.bar(
@@ -413,9 +461,10 @@ def create_dash_entries(server):
         fig.update_xaxes(tickangle=45)
         
         # Summary statistics with better design
-        total_entries = len(filtered_df)
-        unique_people = filtered_df['full_name'].nunique()
-        date_range_days = (filtered_df['date'].max() - filtered_df['date'].min()).days + 1 if not filtered_df.empty else 0
+        total_entries = int(counts['count'].sum())
+        unique_people = people['person'].nunique()
+        dates = counts['date'].dropna()
+        date_range_days = (dates.max() - dates.min()).days + 1 if not dates.empty else 0
         
         summary_stats = [
             dbc.Col([
@@ -457,7 +506,7 @@ def create_dash_entries(server):
         ]
         
         # Date options for location breakdown
-        available_dates = sorted(filtered_df['date'].unique(), reverse=True)
+        available_dates = sorted(dates.unique(), reverse=True)
         date_options = [{'label': str(date), 'value': str(date)} for date in available_dates]
         
         # Location breakdown chart
@@ -468,20 +517,13 @@ def create_dash_entries(server):
         summary_table = html.Div("No data for this date.", style={"textAlign": "center", "padding": "10px"})
         if selected_date:
             selected_date_obj = pd.to_datetime(selected_date).date()
-            date_filtered_df = df[df['date'] == selected_date_obj].copy()
+            all_counts = aggregates['counts']
             
-            if not date_filtered_df.empty:
-
-                #date_filtered_df = filtered_df[filtered_df['date'] == selected_date_obj].copy()
-                date_filtered_df['Who'] = date_filtered_df['Who'].astype(str)
-                date_filtered_df['VenuePrefix'] = date_filtered_df['Where'].str.split('_').str[0]
-
-                location_counts = (
-                    date_filtered_df
-                    .groupby('VenuePrefix')['Who']
-                    .nunique()
-                    .reset_index(name='count')
-                )
+            if (all_counts['date'] == selected_date_obj).any():
+                venues = aggregates['venues']
+                location_counts = venues.loc[venues['date'] == selected_date_obj, ['VenuePrefix', 'count']]
+                venue_groups = aggregates['venue_groups']
+                venue_groups = venue_groups[venue_groups['date'] == selected_date_obj]
 
                 # Build bar chart
                 location_fig = px.bar(
@@ -492,11 +534,11 @@ def create_dash_entries(server):
                     labels={'VenuePrefix': 'Venue', 'count': 'Number of People'}
                 )
                 pivot_df = pd.pivot_table(
-                    date_filtered_df,
+                    venue_groups,
                     index='Category',
                     columns='VenuePrefix',
-                    values='Who',
-                    aggfunc='nunique',
+                    values='people',
+                    aggfunc='sum',
                     fill_value=0
                 ).reset_index()
 
@@ -562,13 +604,22 @@ def create_dash_entries(server):
     
     @app.callback(
         [Output('data-table', 'children'),
-         Output('table-info', 'children')],
+         Output('table-info', 'children'),
+         Output('entries-table-container', 'style'),
+         Output('entries-table', 'data'),
+         Output('entries-table', 'page_count'),
+         Output('entries-table', 'page_current')],
         [Input('table-date-filter', 'date'),
-         Input('table-name-filter', 'value')]
+         Input('table-name-filter', 'value'),
+         Input('entries-table', 'page_current'),
+         Input('entries-table', 'page_size'),
+         Input('entries-table', 'sort_by'),
+         Input('entries-table', 'filter_query')]
     )
-    def update_entries_table(table_date, table_name):
-        # Filter data for table
-        table_df = df.copy()
+    def update_entries_table(table_date, table_name, page_current, page_size, sort_by, filter_query):
+        # Rows already renamed and sorted by most recent first
+        version = get_version()
+        table_df = derived('entries_table_rows', build_entries_table_rows)
         
         # Single date filter
         if table_date:
@@ -576,25 +627,11 @@ def create_dash_entries(server):
         
         # Name filter
         if table_name:
-            table_df = table_df[table_df['full_name'].str.contains(table_name, case=False, na=False) |
-                               table_df['Who'].str.contains(table_name, case=False, na=False)]
-        
-        # Sort by most recent first
-        table_df = table_df.sort_values('When', ascending=False)
-        
-        # Prepare table data
-        table_data = table_df[['When', 'full_name', 'Who', 'Where', 'Category']].copy()
-        table_data['When'] = table_data['When'].dt.strftime('%d/%m/%Y %H:%M')
-        table_data = table_data.rename(columns={
-            'When': 'Time',
-            'full_name': 'Name',
-            'Who' : 'BN ID',
-            'Where': 'Location',
-            'Category': 'Category'
-        })
+            table_df = table_df[table_df['Name'].str.contains(table_name, case=False, na=False) |
+                               table_df['BN ID'].str.contains(table_name, case=False, na=False)]
         
         # Create info message
-        total_filtered = len(table_data)
+        total_filtered = len(table_df)
         if table_date:
             date_str = pd.to_datetime(table_date).strftime('%d/%m/%Y')
             info_message = dbc.Alert(
@@ -609,42 +646,17 @@ def create_dash_entries(server):
                 className="py-2 mb-0"
             )
         
-        # Create data table
-        if not table_data.empty:
-            data_table = dash_table.DataTable(
-                data=table_data.to_dict('records'),
-                columns=[{"name": col, "id": col} for col in table_data.columns],
-                style_table={'overflowX': 'auto'},
-                style_cell={
-                    'textAlign': 'left',
-                    'padding': '12px',
-                    'fontFamily': 'system-ui, -apple-system, sans-serif',
-                    'fontSize': '14px'
-                },
-                style_header={
-                    'backgroundColor': '#f8fafc',
-                    'fontWeight': 'bold',
-                    'border': '1px solid #e2e8f0',
-                    'color': '#1f2937'
-                },
-                style_data={
-                    'backgroundColor': 'white',
-                    'border': '1px solid #f3f4f6'
-                },
-                style_data_conditional=[
-                    {
-                        'if': {'row_index': 'odd'},
-                        'backgroundColor': '#f9fafb'
-                    }
-                ],
-                page_size=20,
-                sort_action="native",
-                filter_action="native"
-            )
-        else:
-            data_table = dbc.Alert("No entries found with current filters.", color="warning")
+        if table_df.empty:
+            no_entries = dbc.Alert("No entries found with current filters.", color="warning")
+            return no_entries, info_message, {'display': 'none'}, [], 1, 0
+        
+        # Only the visible page is formatted and sent to the browser
+        page_current = current_page('entries-table', page_current)
+        view_key = ('entries-table', version, table_date, table_name)
+        page, page_count = table_page(table_df, page_current, page_size, sort_by, filter_query, view_key)
+        page = page.drop(columns='date').assign(Time=page['Time'].dt.strftime('%d/%m/%Y %H:%M'))
         
-        return data_table, info_message
+        return None, info_message, {}, page.to_dict('records'), page_count, page_current
     
     @app.callback(
         [Output('entrance-breakdown-chart', 'figure'),
@@ -656,9 +668,9 @@ def create_dash_entries(server):
         if not selected_date or not selected_venue:
             return px.bar(title="Please select both date and venue"), html.Div("No data to show.")
 
+        df = load_entries_data()
         selected_date_obj = pd.to_datetime(selected_date).date()
         filtered_df = df[df['date'] == selected_date_obj].copy()
-        filtered_df['VenuePrefix'] = filtered_df['Where'].str.split('_').str[0]
         venue_df = filtered_df[filtered_df['VenuePrefix'] == selected_venue].copy()
         venue_df['Who'] = venue_df['Who'].astype(str)
 
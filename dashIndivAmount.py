@@ -1,285 +1,321 @@
-import sqlite3
 import plotly.express as px
 import pandas as pd
-from dash import Dash, dcc, html, Input, Output, dash_table
+from dash import Dash, dcc, html, Input, Output, State, dash_table
 # import requests
 # from io import StringIO
 from datetime import datetime, date, timedelta
-from loadcsv import load_csv_data
-
-def create_dash_individual_amount(server):
-    # url = "https://wacsg2025-my.sharepoint.com/:x:/p/trisha_teo/EfFwqNRlqjdKgUnvBWe53SEBKKJA9yK7RomjADmwfuT6iQ?download=1"
-    # response = requests.get(url)
-    # response.raise_for_status()
-    # csv_data = response.content.decode('utf-8')
-    # df = pd.read_csv(StringIO(csv_data))
-
-    df = load_csv_data()
-
+from loadcsv import derived
+from sqlitestore import SqliteStore
+from typeahead import PrefixIndex, search_options
+
+# Persistent per-person daily totals. The primary key doubles as the
+# (gms_id, date_created) index the callback filters on; bump the version
+# whenever the schema changes so old files are rebuilt.
+WALLET_SCHEMA = """
+CREATE TABLE wallet_data (
+    gms_id INTEGER NOT NULL,
+    date_created DATE NOT NULL,
+    amount REAL,
+    name TEXT,
+    PRIMARY KEY (gms_id, date_created)
+) WITHOUT ROWID;
+CREATE INDEX wallet_data_date ON wallet_data (date_created);
+"""
+
+wallet_store = SqliteStore('wallet_data.db', WALLET_SCHEMA, schema_version=2)
+
+
+def build_wallet_data(df):
     df = df[df['approval_stage'] == 'completed']
-    df['date_created'] = pd.to_datetime(df['date_created']).dt.date
+    df = df.assign(date_created=df['date_created'].dt.date)
 
     # Aggregate names for display later
     agg_df = df.groupby(['gms_id', 'date_created']) \
                .agg({'amount': 'sum', 'name': lambda x: ', '.join(sorted(set(x)))}) \
                .reset_index()
 
-    # Store aggregated data into SQLite
-    conn = sqlite3.connect('wallet_data.db')
-    agg_df.to_sql('wallet_data', conn, if_exists='replace', index=False)
-    conn.close()
+    # Write only the rows that changed since the last version
+    wallet_store.sync_table('wallet_data', agg_df, ['gms_id', 'date_created'])
+    return agg_df
+
+
+def build_gms_index(agg_df):
+    return PrefixIndex(agg_df['gms_id'])
+
+
+def warm_up():
+    """Build the table and GMS id index ahead of the first request."""
+    derived('wallet_data', build_wallet_data)
+    derived('wallet_gms_index', build_gms_index, ('wallet_data', build_wallet_data))
+
+
+def create_dash_individual_amount(server):
+    # url = "https://wacsg2025-my.sharepoint.com/:x:/p/trisha_teo/EfFwqNRlqjdKgUnvBWe53SEBKKJA9yK7RomjADmwfuT6iQ?download=1"
+    # response = requests.get(url)
+    # response.raise_for_status()
+    # csv_data = response.content.decode('utf-8')
+    # df = pd.read_csv(StringIO(csv_data))
 
     app = Dash(__name__, server=server, url_base_pathname='/appMaxAmount/')
 
-    today = date.today()
-    start_of_week = today - timedelta(days=today.weekday())  # Monday
-    end_of_week = start_of_week + timedelta(days=6)
-
-    app.layout = html.Div([
-        # Header
-        html.Div([
-            html.H1("Individual Disbursement Dashboard", 
-                    style={
-                        'margin': '0',
-                        'fontSize': '24px',
-                        'fontWeight': '600',
-                        'color': '#1f2937'
-                    })
-        ], style={
-            'padding': '20px 40px',
-            'backgroundColor': '#ffffff',
-            'borderBottom': '1px solid #e5e7eb'
-        }),
+    def serve_layout():
+        agg_df = derived('wallet_data', build_wallet_data)
+        today = date.today()
+        start_of_week = today - timedelta(days=today.weekday())  # Monday
+        end_of_week = start_of_week + timedelta(days=6)
+        return html.Div([
+            # Header
+            html.Div([
+                html.H1("Individual Disbursement Dashboard", 
+                        style={
+                            'margin': '0',
+                            'fontSize': '24px',
+                            'fontWeight': '600',
+                            'color': '#1f2937'
+                        })
+            ], style={
+                'padding': '20px 40px',
+                'backgroundColor': '#ffffff',
+                'borderBottom': '1px solid #e5e7eb'
+            }),
         
-        # Main content container
-        html.Div([
-            # Top controls section
+            # Main content container
             html.Div([
-                # Left side - GMS ID dropdown and checkbox
+                # Top controls section
                 html.Div([
-                    dcc.Dropdown(
-                        id='gmsid-filter',
-                        options=[
-                            {'label': str(gms_id), 'value': gms_id}
-                            for gms_id in sorted(df['gms_id'].unique())
-                        ],
-                        placeholder="Select GMS ID(s)",
-                        multi=True,
-                        style={
-                            'width': '300px',
-                            'fontSize': '14px'
-                        }
-                    ),
-                    # Checkbox filter moved here
+                    # Left side - GMS ID dropdown and checkbox
                     html.Div([
-                        dcc.Checklist(
-                            id='amount-check',
-                            options=[{'label': 'Show only entries with total amount > 60', 'value': 'over60'}],
-                            value=[],
+                        dcc.Dropdown(
+                            id='gmsid-filter',
+                            options=[],
+                            placeholder="Type to search GMS ID(s)",
+                            multi=True,
                             style={
-                                'marginTop': '10px',
-                                'fontSize': '14px',
-                                'color': '#374151'
+                                'width': '300px',
+                                'fontSize': '14px'
                             }
-                        )
-                    ])
-                ], style={'flex': '1'}),
+                        ),
+                        # Checkbox filter moved here
+                        html.Div([
+                            dcc.Checklist(
+                                id='amount-check',
+                                options=[{'label': 'Show only entries with total amount > 60', 'value': 'over60'}],
+                                value=[],
+                                style={
+                                    'marginTop': '10px',
+                                    'fontSize': '14px',
+                                    'color': '#374151'
+                                }
+                            )
+                        ])
+                    ], style={'flex': '1'}),
                 
-                # Right side - Date controls
-                html.Div([
-                    # Date mode radio buttons
-                    dcc.RadioItems(
-                        id='date-mode',
-                        options=[
-                            {'label': 'Single Date', 'value': 'single'},
-                            {'label': 'Date Range', 'value': 'range'}
-                        ],
-                        value='range',
-                        labelStyle={
-                            'display': 'inline-block', 
-                            'marginRight': '15px',
-                            'fontSize': '14px',
-                            'color': '#6b7280'
-                        },
-                        style={'marginBottom': '10px'}
-                    ),
-                    
-                    # Date pickers container
+                    # Right side - Date controls
                     html.Div([
-                        # Single date picker
+                        # Date mode radio buttons
+                        dcc.RadioItems(
+                            id='date-mode',
+                            options=[
+                                {'label': 'Single Date', 'value': 'single'},
+                                {'label': 'Date Range', 'value': 'range'}
+                            ],
+                            value='range',
+                            labelStyle={
+                                'display': 'inline-block', 
+                                'marginRight': '15px',
+                                'fontSize': '14px',
+                                'color': '#6b7280'
+                            },
+                            style={'marginBottom': '10px'}
+                        ),
+                    
+                        # Date pickers container
                         html.Div([
-                            dcc.DatePickerSingle(
-                                id='date-single',
-                                min_date_allowed=agg_df['date_created'].min(),
-                                max_date_allowed=agg_df['date_created'].max(),
-                                date=today,
-                                display_format='DD/MM/YYYY', 
-                                clearable=True,
-                                with_portal=True
-                            )
-                        ], id='date-single-container', style={'display': 'none'}),
+                            # Single date picker
+                            html.Div([
+                                dcc.DatePickerSingle(
+                                    id='date-single',
+                                    min_date_allowed=agg_df['date_created'].min(),
+                                    max_date_allowed=agg_df['date_created'].max(),
+                                    date=today,
+                                    display_format='DD/MM/YYYY', 
+                                    clearable=True,
+                                    with_portal=True
+                                )
+                            ], id='date-single-container', style={'display': 'none'}),
                         
                         
-                        # Date range picker
-                        html.Div([
-                            dcc.DatePickerRange(
-                                id='date-range',
-                                min_date_allowed=agg_df['date_created'].min(),
-                                max_date_allowed=agg_df['date_created'].max(),
-                                start_date=start_of_week,
-                                end_date=end_of_week,
-                                display_format='DD/MM/YYYY',  # matches the screenshot
-                                clearable=True,
-                                with_portal=True
-                            )
-
-                        ], id='date-range-container', style={'display': 'block'})
-                    ])
+                            # Date range picker
+                            html.Div([
+                                dcc.DatePickerRange(
+                                    id='date-range',
+                                    min_date_allowed=agg_df['date_created'].min(),
+                                    max_date_allowed=agg_df['date_created'].max(),
+                                    start_date=start_of_week,
+                                    end_date=end_of_week,
+                                    display_format='DD/MM/YYYY',  # matches the screenshot
+                                    clearable=True,
+                                    with_portal=True
+                                )
+
+                            ], id='date-range-container', style={'display': 'block'})
+                        ])
+                    ], style={
+                        'display': 'flex',
+                        'flexDirection': 'column',
+                        'alignItems': 'flex-end'
+                    })
                 ], style={
                     'display': 'flex',
-                    'flexDirection': 'column',
-                    'alignItems': 'flex-end'
-                })
-            ], style={
-                'display': 'flex',
-                'justifyContent': 'space-between',
-                'alignItems': 'flex-start',
-                'marginBottom': '20px',
-                'padding': '0 20px'
-            }),
+                    'justifyContent': 'space-between',
+                    'alignItems': 'flex-start',
+                    'marginBottom': '20px',
+                    'padding': '0 20px'
+                }),
             
-            # Table section
-            html.Div([
-                html.H2("Amount earned by each individual for each day", 
-                    style={
-                        'textAlign': 'center',
-                        'fontSize': '18px',
-                        'fontWeight': '600',
-                        'color': '#1f2937',
-                        'marginBottom': '20px'
-                    }),
+                # Table section
+                html.Div([
+                    html.H2("Amount earned by each individual for each day", 
+                        style={
+                            'textAlign': 'center',
+                            'fontSize': '18px',
+                            'fontWeight': '600',
+                            'color': '#1f2937',
+                            'marginBottom': '20px'
+                        }),
                 
-                dash_table.DataTable(
-                    id='result-table',
-                    columns=[
-                        {'name': 'GMS ID', 'id': 'gms_id'},
-                        {'name': 'Names', 'id': 'name'},
-                        {'name': 'Date Created', 'id': 'date_created'},
-                        {'name': 'Total Amount', 'id': 'amount'},
-                    ],
-                    page_size=20,
-                    style_table={
-                        'overflowX': 'auto',
-                        'border': '1px solid #e5e7eb',
-                        'borderRadius': '8px'
-                    },
-                    sort_action='native',
-                    style_header={
-                        'backgroundColor': "#c4b8fa",
-                        'fontWeight': '600',
-                        'fontSize': '14px',
-                        'color': '#374151',
-                        'border': '1px solid #e5e7eb',
-                        'textAlign': 'left'
-                    },
-                    style_cell={
-                        'textAlign': 'left',
-                        'padding': '12px',
-                        'fontSize': '14px',
-                        'color': '#374151',
-                        'border': '1px solid #e5e7eb'
-                    },
-                    style_data={
-                        'backgroundColor': '#F1F1F1FF',
-                        'border': '1px solid #e5e7eb'
-                    },
-                    style_data_conditional=[
-                        {
-                            'if': {'filter_query': '{amount} > 60', 'column_id': 'amount'},
-                            'backgroundColor': "#F1F1F1FF",
+                    dash_table.DataTable(
+                        id='result-table',
+                        columns=[
+                            {'name': 'GMS ID', 'id': 'gms_id'},
+                            {'name': 'Names', 'id': 'name'},
+                            {'name': 'Date Created', 'id': 'date_created'},
+                            {'name': 'Total Amount', 'id': 'amount'},
+                        ],
+                        page_size=20,
+                        style_table={
+                            'overflowX': 'auto',
+                            'border': '1px solid #e5e7eb',
+                            'borderRadius': '8px'
+                        },
+                        sort_action='native',
+                        style_header={
+                            'backgroundColor': "#c4b8fa",
+                            'fontWeight': '600',
+                            'fontSize': '14px',
                             'color': '#374151',
-                            'fontWeight': '600'
+                            'border': '1px solid #e5e7eb',
+                            'textAlign': 'left'
                         },
-                        {
-                            'if': {'row_index': 'odd'},
-                            'backgroundColor': '#ddd6fe'
-                        }
-                    ],
-                )
-            ], style={
-                'padding': '0 20px',
-                'marginBottom': '40px'
-            }),
+                        style_cell={
+                            'textAlign': 'left',
+                            'padding': '12px',
+                            'fontSize': '14px',
+                            'color': '#374151',
+                            'border': '1px solid #e5e7eb'
+                        },
+                        style_data={
+                            'backgroundColor': '#F1F1F1FF',
+                            'border': '1px solid #e5e7eb'
+                        },
+                        style_data_conditional=[
+                            {
+                                'if': {'filter_query': '{amount} > 60', 'column_id': 'amount'},
+                                'backgroundColor': "#F1F1F1FF",
+                                'color': '#374151',
+                                'fontWeight': '600'
+                            },
+                            {
+                                'if': {'row_index': 'odd'},
+                                'backgroundColor': '#ddd6fe'
+                            }
+                        ],
+                    )
+                ], style={
+                    'padding': '0 20px',
+                    'marginBottom': '40px'
+                }),
             
-            # Bar chart container 
-            html.Div([
-                html.H2("Total Amount Earned per individual for Selected Period", 
-                    style={
-                        'textAlign': 'center',
-                        'fontSize': '18px',
-                        'fontWeight': '600',
-                        'color': '#1f2937',
-                        'marginBottom': '20px'
-                    }),
+                # Bar chart container 
+                html.Div([
+                    html.H2("Total Amount Earned per individual for Selected Period", 
+                        style={
+                            'textAlign': 'center',
+                            'fontSize': '18px',
+                            'fontWeight': '600',
+                            'color': '#1f2937',
+                            'marginBottom': '20px'
+                        }),
                 
-                dcc.Graph(
-                    id='amount-bar-chart',
-                    config={
-                        'displayModeBar': False,
-                        'plotlyServerURL': "https://chart-studio.plotly.com"
-                    },
-                    style={'height': '300px'},
-                    figure={
-                        'data': [],
-                        'layout': {
-                            'plot_bgcolor': 'rgba(0,0,0,0)',
-                            'paper_bgcolor': 'rgba(0,0,0,0)',
-                            'colorway': ['#5A6ACF']
+                    dcc.Graph(
+                        id='amount-bar-chart',
+                        config={
+                            'displayModeBar': False,
+                            'plotlyServerURL': "https://chart-studio.plotly.com"
+                        },
+                        style={'height': '300px'},
+                        figure={
+                            'data': [],
+                            'layout': {
+                                'plot_bgcolor': 'rgba(0,0,0,0)',
+                                'paper_bgcolor': 'rgba(0,0,0,0)',
+                                'colorway': ['#5A6ACF']
+                            }
                         }
-                    }
-                )
-            ], id='bar-chart-container', 
-            style={
-                'display': 'none',
-                'padding': '0 20px',
-                'marginBottom': '40px'  
-            }),
+                    )
+                ], id='bar-chart-container', 
+                style={
+                    'display': 'none',
+                    'padding': '0 20px',
+                    'marginBottom': '40px'  
+                }),
             
-            # Line chart section
-            html.Div([
-                html.H2("Total Amount Earned per individual for Selected Period", 
-                    style={
-                        'textAlign': 'center',
-                        'fontSize': '18px',
-                        'fontWeight': '600',
-                        'color': '#1f2937',
-                        'marginBottom': '20px'
-                    }),
+                # Line chart section
+                html.Div([
+                    html.H2("Total Amount Earned per individual for Selected Period", 
+                        style={
+                            'textAlign': 'center',
+                            'fontSize': '18px',
+                            'fontWeight': '600',
+                            'color': '#1f2937',
+                            'marginBottom': '20px'
+                        }),
                 
-                html.Div(dcc.Graph(
-                    id='amount-line-chart',
-                    config={'displayModeBar': False},
-                    style={'height': '300px'}
-                ), id='line-chart-container', style={'display': 'none'})
+                    html.Div(dcc.Graph(
+                        id='amount-line-chart',
+                        config={'displayModeBar': False},
+                        style={'height': '300px'}
+                    ), id='line-chart-container', style={'display': 'none'})
+                ], style={
+                    'padding': '0 20px',
+                    'marginBottom': '40px'
+                })
+            
             ], style={
-                'padding': '0 20px',
-                'marginBottom': '40px'
+                'padding': '30px 20px',
+                'backgroundColor': '#ffffff',
+                'minHeight': 'calc(100vh - 80px)'
             })
-            
+        
         ], style={
-            'padding': '30px 20px',
-            'backgroundColor': '#ffffff',
-            'minHeight': 'calc(100vh - 80px)'
+            'backgroundImage': 'url("https://images.unsplash.com/photo-1454117096348-e4abbeba002c?q=80&w=2070&auto=format&fit=crop&ixlib=rb-4.1.0&ixid=M3wxMjA3fDB8MHxwaG90by1wYWdlfHx8fGVufDB8fHx8fA%3D%3D")',
+            'backgroundSize': 'cover',
+            'backgroundRepeat': 'no-repeat',
+            'backgroundAttachment': 'fixed', 
+            'backgroundPosition': 'center',
+            'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif'
         })
-        
-    ], style={
-        'backgroundImage': 'url("https://images.unsplash.com/photo-1454117096348-e4abbeba002c?q=80&w=2070&auto=format&fit=crop&ixlib=rb-4.1.0&ixid=M3wxMjA3fDB8MHxwaG90by1wYWdlfHx8fGVufDB8fHx8fA%3D%3D")',
-        'backgroundSize': 'cover',
-        'backgroundRepeat': 'no-repeat',
-        'backgroundAttachment': 'fixed', 
-        'backgroundPosition': 'center',
-        'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif'
-    })
+
+    app.layout = serve_layout
+
+    # Matches are looked up as the user types rather than shipping every id with the page
+    @app.callback(
+        Output('gmsid-filter', 'options'),
+        Input('gmsid-filter', 'search_value'),
+        State('gmsid-filter', 'value')
+    )
+    def search_gms_ids(search_value, selected):
+        return search_options(derived('wallet_gms_index', build_gms_index, ('wallet_data', build_wallet_data)), search_value, selected)
 
     @app.callback(
         Output('date-single-container', 'style'),
@@ -326,9 +362,8 @@ def create_dash_individual_amount(server):
                 query += " AND date_created <= ?"
                 params.append(end_date)
 
-        conn = sqlite3.connect('wallet_data.db')
-        filtered = pd.read_sql(query, conn, params=params)
-        conn.close()
+        derived('wallet_data', build_wallet_data)  # rebuilds the table if the data changed
+        filtered = wallet_store.read_sql(query, params)
 
         if filtered.empty:
             return [], {'display': 'none'}, {}, {'display': 'none'}, {}
@@ -1,9 +1,80 @@
+import numpy as np
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
 from dash import Dash, dcc, html, Input, Output, dash_table
 import requests
 from io import StringIO
-from loadcsv import load_csv_data
+from loadcsv import derived, COMPLETED_PAYOUTS
+
+location_keywords = [
+    'AQC', 'WCA', 'KHALL', 'SEN', 'TSA', 'AIRPT',
+    'ITEE', 'NEXUS', 'OTH', 'CONGR', 'OC', 'HOTEL1', 'HOTEL2', 'HOTEL3'
+]
+
+def extract_location(campaign_name):
+    campaign_parts = str(campaign_name).replace('-', '_').split('_')
+    for keyword in location_keywords:
+        if keyword.lower() in [part.lower() for part in campaign_parts]:
+            return keyword
+    return campaign_name  # Use campaign name itself if no keyword matched
+
+def resolve_locations(campaigns):
+    """
+    extract_location for every row, computed once per distinct campaign and
+    mapped back through the campaign codes. Returns (locations, legend) where
+    legend maps each location to the sorted campaigns that resolve to it.
+    """
+    codes, uniques = pd.factorize(campaigns)
+    unique_locations = pd.Categorical([extract_location(c) for c in uniques])
+    locations = pd.Categorical.from_codes(
+        np.where(codes >= 0, unique_locations.codes[codes], -1),
+        categories=unique_locations.categories,
+    )
+
+    legend_mapping = {}
+    for loc, camp in zip(unique_locations, uniques):
+        legend_mapping.setdefault(loc, []).append(camp)
+    legend_mapping = {k: sorted(v) for k, v in legend_mapping.items()}
+    return locations, legend_mapping
+
+def prepare_heatmap(df):
+    locations, legend_mapping = resolve_locations(df['registration_location_id'])
+    df['location'] = pd.Series(locations, index=df.index)
+    return df, legend_mapping
+
+def build_heatmap_grid(df):
+    """
+    Completed payouts binned into a campaign x day grid of amounts and row
+    counts, with each campaign's location, so the heatmap callback only
+    slices and sums a small array instead of grouping the rows.
+    """
+    days = df['payout_date'].dt.normalize()
+    campaign_codes, campaigns = pd.factorize(df['registration_location_id'], sort=True)
+    location_codes, locations = pd.factorize(pd.Index([extract_location(c) for c in campaigns]), sort=True)
+
+    has_cell = (campaign_codes >= 0) & days.notna().to_numpy()
+    cell_days = days[has_cell]
+    if len(cell_days):
+        all_days = pd.date_range(cell_days.min(), cell_days.max(), freq='D')
+    else:
+        all_days = pd.DatetimeIndex([])
+    cells = campaign_codes[has_cell] * len(all_days) + all_days.get_indexer(cell_days)
+    shape = (len(campaigns), len(all_days))
+    amounts = df['amount'].fillna(0).to_numpy(dtype=float)[has_cell]
+
+    return {
+        'days': all_days,
+        'campaigns': pd.Index(campaigns),
+        'locations': pd.Index(locations),
+        'location_codes': location_codes,
+        'amounts': np.bincount(cells, weights=amounts, minlength=shape[0] * shape[1]).reshape(shape),
+        'counts': np.bincount(cells, minlength=shape[0] * shape[1]).reshape(shape),
+    }
+
+def warm_up():
+    """Build the grid ahead of the first request."""
+    derived('heatmap_grid', build_heatmap_grid, COMPLETED_PAYOUTS)
 
 def create_dash_heatmap(server):
     # url = "https://wacsg2025-my.sharepoint.com/:x:/p/trisha_teo/EfFwqNRlqjdKgUnvBWe53SEBKKJA9yK7RomjADmwfuT6iQ?download=1"
@@ -12,231 +83,209 @@ def create_dash_heatmap(server):
     # csv_data = response.content.decode('utf-8')
     # df = pd.read_csv(StringIO(csv_data))
 
-    df = load_csv_data()
-
-    df = df[df['approval_stage'] == 'completed']
-    df['payout_date'] = pd.to_datetime(df['payout_date'])
+    def get_df():
+        return derived('heatmap', prepare_heatmap, COMPLETED_PAYOUTS)[0]
 
-    location_keywords = [
-        'AQC', 'WCA', 'KHALL', 'SEN', 'TSA', 'AIRPT',
-        'ITEE', 'NEXUS', 'OTH', 'CONGR', 'OC', 'HOTEL1', 'HOTEL2', 'HOTEL3'
-    ]
+    app = Dash(__name__, server=server, routes_pathname_prefix='/appLocationHeatmap/')
+    app.title = "GovWallet Disbursement Heatmap"
 
-    def extract_location(campaign_name):
-        campaign_parts = str(campaign_name).replace('-', '_').split('_')
-        for keyword in location_keywords:
-            if keyword.lower() in [part.lower() for part in campaign_parts]:
-                return keyword
-        return campaign_name  # Use campaign name itself if no keyword matched
+    def serve_layout():
+        df, legend_mapping = derived('heatmap', prepare_heatmap, COMPLETED_PAYOUTS)
+        min_date = df['payout_date'].min().date()
+        max_date = df['payout_date'].max().date()
 
-    df['location'] = df['registration_location_id'].apply(extract_location)
+        return html.Div([
+            # Header
+            html.Div([
+                html.H1("Disbursement Heatmap by Location and Date", 
+                        style={
+                            'margin': '0',
+                            'fontSize': '24px',
+                            'fontWeight': '600',
+                            'color': '#1f2937'
+                        })
+            ], style={
+                'padding': '20px 40px',
+                'backgroundColor': '#ffffff',
+                'borderBottom': '1px solid #e5e7eb'
+            }),
 
-    # Prepare legend dictionary
-    legend_mapping = {}
-    for _, row in df.iterrows():
-        loc = row['location']
-        camp = row['registration_location_id']
-        legend_mapping.setdefault(loc, set()).add(camp)
+            # Filters section
+            html.Div([
+                html.Div([
+                    dcc.Dropdown(
+                        id='campaign-filter',
+                        options=[{'label': camp, 'value': camp} for camp in sorted(df['registration_location_id'].dropna().unique())],
+                        multi=True,
+                        placeholder='Filter by Campaign',
+                        style={'width': '280px', 'marginBottom': '10px', 'fontSize': '14px'}
+                    ),
+                    dcc.Dropdown(
+                        id='location-filter',
+                        options=[{'label': loc, 'value': loc} for loc in sorted(df['location'].dropna().unique())],
+                        multi=True,
+                        placeholder='Filter by Location',
+                        style={'width': '280px', 'fontSize': '14px'}
+                    )
+                ], style={'flex': '1'}),
 
-    # Convert sets to sorted lists for display
-    legend_mapping = {k: sorted(list(v)) for k, v in legend_mapping.items()}
+                html.Div([
+                    dcc.DatePickerRange(
+                        id='date-range-picker',
+                        min_date_allowed=min_date,
+                        max_date_allowed=max_date,
+                        start_date=min_date,
+                        end_date=max_date,
+                        display_format='YYYY-MM-DD',
+                        with_portal=True,
+                        clearable=True
+                    )
+                ], style={'flex': '1', 'display': 'flex', 'justifyContent': 'flex-end'})
 
-    app = Dash(__name__, server=server, routes_pathname_prefix='/appLocationHeatmap/')
-    app.title = "GovWallet Disbursement Heatmap"
+            ], style={
+                'display': 'flex',
+                'justifyContent': 'space-between',
+                'alignItems': 'flex-start',
+                'margin': '20px 40px'
+            }),
 
-    min_date = df['payout_date'].min().date()
-    max_date = df['payout_date'].max().date()
+            # Heatmap section
+            html.Div([
+                dcc.Graph(id='heatmap-graph')
+            ], style={'margin': '0 40px'}),
 
-    app.layout = html.Div([
-        # Header
-        html.Div([
-            html.H1("Disbursement Heatmap by Location and Date", 
+            # Summary Table Section
+            html.Div([
+            html.H3("Select Location for Summary Table:", 
+                    style={'marginTop': '30px', 'fontWeight': '600', 'color': '#1f2937'}),
+
+            dcc.Dropdown(
+                id='table-location-dropdown',
+                options=[{'label': loc, 'value': loc} for loc in sorted(df['location'].dropna().unique())],
+                placeholder='Select a location',
+                clearable=True,
+                searchable=True,
+                style={'width': '300px', 'marginBottom': '20px'}
+            ),
+
+            html.H2("Amount distributed per campaign at selected location", 
                     style={
-                        'margin': '0',
-                        'fontSize': '24px',
+                        'textAlign': 'center',
+                        'fontSize': '18px',
                         'fontWeight': '600',
-                        'color': '#1f2937'
-                    })
+                        'color': '#1f2937',
+                        'marginBottom': '20px'
+                    }),
+
+            dash_table.DataTable(
+                id='summary-table',
+                columns=[
+                    {'name': 'Campaign', 'id': 'campaign'},
+                    {'name': 'Total Amount (SGD)', 'id': 'amount', 'type': 'numeric', 'format': {'specifier': ',.2f'}},
+                    {'name': 'Unique ID Count', 'id': 'unique_ids', 'type': 'numeric'},
+                ],
+                data=[],
+                page_size=10,
+                sort_action='native',
+                style_table={
+                    'overflowX': 'auto',
+                    'border': '1px solid #e5e7eb',
+                    'borderRadius': '8px'
+                },
+                style_header={
+                    'backgroundColor': "#c4b8fa",
+                    'fontWeight': '600',
+                    'fontSize': '14px',
+                    'color': '#374151',
+                    'border': '1px solid #e5e7eb',
+                    'textAlign': 'left'
+                },
+                style_cell={
+                    'textAlign': 'left',
+                    'padding': '12px',
+                    'fontSize': '14px',
+                    'color': '#374151',
+                    'border': '1px solid #e5e7eb'
+                },
+                style_data={
+                    'backgroundColor': '#F1F1F1FF',
+                    'border': '1px solid #e5e7eb'
+                },
+                style_data_conditional=[
+                    {
+                        'if': {'filter_query': '{amount} > 1000', 'column_id': 'amount'},
+                        'backgroundColor': "#F1F1F1FF",
+                        'color': '#374151',
+                        'fontWeight': '600'
+                    },
+                    {
+                        'if': {'row_index': 'odd'},
+                        'backgroundColor': '#ddd6fe'
+                    }
+                ],
+            )
         ], style={
-            'padding': '20px 40px',
-            'backgroundColor': '#ffffff',
-            'borderBottom': '1px solid #e5e7eb'
+            'padding': '0 20px',
+            'marginBottom': '40px'
         }),
 
-        # Filters section
-        html.Div([
-            html.Div([
-                dcc.Dropdown(
-                    id='campaign-filter',
-                    options=[{'label': camp, 'value': camp} for camp in sorted(df['registration_location_id'].dropna().unique())],
-                    multi=True,
-                    placeholder='Filter by Campaign',
-                    style={'width': '280px', 'marginBottom': '10px', 'fontSize': '14px'}
-                ),
-                dcc.Dropdown(
-                    id='location-filter',
-                    options=[{'label': loc, 'value': loc} for loc in sorted(df['location'].dropna().unique())],
-                    multi=True,
-                    placeholder='Filter by Location',
-                    style={'width': '280px', 'fontSize': '14px'}
-                )
-            ], style={'flex': '1'}),
 
+            # Campaigns by Location section
             html.Div([
-                dcc.DatePickerRange(
-                    id='date-range-picker',
-                    min_date_allowed=min_date,
-                    max_date_allowed=max_date,
-                    start_date=min_date,
-                    end_date=max_date,
-                    display_format='YYYY-MM-DD',
-                    with_portal=True,
-                    clearable=True
-                )
-            ], style={'flex': '1', 'display': 'flex', 'justifyContent': 'flex-end'})
-
-        ], style={
-            'display': 'flex',
-            'justifyContent': 'space-between',
-            'alignItems': 'flex-start',
-            'margin': '20px 40px'
-        }),
-
-        # Heatmap section
-        html.Div([
-            dcc.Graph(id='heatmap-graph')
-        ], style={'margin': '0 40px'}),
-
-        # Summary Table Section
-        html.Div([
-        html.H3("Select Location for Summary Table:", 
-                style={'marginTop': '30px', 'fontWeight': '600', 'color': '#1f2937'}),
-
-        dcc.Dropdown(
-            id='table-location-dropdown',
-            options=[{'label': loc, 'value': loc} for loc in sorted(df['location'].dropna().unique())],
-            placeholder='Select a location',
-            clearable=True,
-            searchable=True,
-            style={'width': '300px', 'marginBottom': '20px'}
-        ),
-
-        html.H2("Amount distributed per campaign at selected location", 
-                style={
+                html.H2("📌 Key: Campaigns by Location", style={
                     'textAlign': 'center',
                     'fontSize': '18px',
                     'fontWeight': '600',
-                    'color': '#1f2937',
-                    'marginBottom': '20px'
+                    'marginBottom': '10px',
+                    'paddingBottom': '10px',
+                    'borderBottom': '1px solid #ffffff',
+                    'color': '#1f2937'
                 }),
 
-        dash_table.DataTable(
-            id='summary-table',
-            columns=[
-                {'name': 'Campaign', 'id': 'campaign'},
-                {'name': 'Total Amount (SGD)', 'id': 'amount', 'type': 'numeric', 'format': {'specifier': ',.2f'}},
-                {'name': 'Unique ID Count', 'id': 'unique_ids', 'type': 'numeric'},
-            ],
-            data=[],
-            page_size=10,
-            sort_action='native',
-            style_table={
-                'overflowX': 'auto',
-                'border': '1px solid #e5e7eb',
-                'borderRadius': '8px'
-            },
-            style_header={
-                'backgroundColor': "#c4b8fa",
-                'fontWeight': '600',
-                'fontSize': '14px',
-                'color': '#374151',
-                'border': '1px solid #e5e7eb',
-                'textAlign': 'left'
-            },
-            style_cell={
-                'textAlign': 'left',
-                'padding': '12px',
-                'fontSize': '14px',
-                'color': '#374151',
-                'border': '1px solid #e5e7eb'
-            },
-            style_data={
-                'backgroundColor': '#F1F1F1FF',
-                'border': '1px solid #e5e7eb'
-            },
-            style_data_conditional=[
-                {
-                    'if': {'filter_query': '{amount} > 1000', 'column_id': 'amount'},
-                    'backgroundColor': "#F1F1F1FF",
-                    'color': '#374151',
-                    'fontWeight': '600'
-                },
-                {
-                    'if': {'row_index': 'odd'},
-                    'backgroundColor': '#ddd6fe'
-                }
-            ],
-        )
-    ], style={
-        'padding': '0 20px',
-        'marginBottom': '40px'
-    }),
-
-
-        # Campaigns by Location section
-        html.Div([
-            html.H2("📌 Key: Campaigns by Location", style={
-                'textAlign': 'center',
-                'fontSize': '18px',
-                'fontWeight': '600',
-                'marginBottom': '10px',
-                'paddingBottom': '10px',
-                'borderBottom': '1px solid #ffffff',
-                'color': '#1f2937'
-            }),
-
-            html.Div([
                 html.Div([
-                    html.H4(f"{loc} ({len(camps)} campaign{'s' if len(camps) != 1 else ''})", style={
-                        'fontSize': '16px',
-                        'fontWeight': '600',
-                        'color': '#4b5563',
-                        'marginBottom': '4px'
-                    }),
-                    html.Ul([
-                        html.Li(c, style={
-                            'fontSize': '14px',
-                            'color': '#374151',
+                    html.Div([
+                        html.H4(f"{loc} ({len(camps)} campaign{'s' if len(camps) != 1 else ''})", style={
+                            'fontSize': '16px',
+                            'fontWeight': '600',
+                            'color': '#4b5563',
                             'marginBottom': '4px'
-                        }) for c in camps
+                        }),
+                        html.Ul([
+                            html.Li(c, style={
+                                'fontSize': '14px',
+                                'color': '#374151',
+                                'marginBottom': '4px'
+                            }) for c in camps
+                        ], style={
+                            'listStyleType': 'disc',
+                            'paddingLeft': '20px',
+                            'margin': '0 0 10px 0'
+                        })
                     ], style={
-                        'listStyleType': 'disc',
-                        'paddingLeft': '20px',
-                        'margin': '0 0 10px 0'
-                    })
+                        'marginBottom': '16px',
+                        'textAlign': 'left',
+                        'backgroundColor': '#f9fafb',
+                        'padding': '12px',
+                        'borderRadius': '8px',
+                        'boxShadow': '0 1px 2px rgba(0,0,0,0.05)'
+                    }) for loc, camps in sorted(legend_mapping.items())
                 ], style={
-                    'marginBottom': '16px',
-                    'textAlign': 'left',
-                    'backgroundColor': '#f9fafb',
-                    'padding': '12px',
-                    'borderRadius': '8px',
-                    'boxShadow': '0 1px 2px rgba(0,0,0,0.05)'
-                }) for loc, camps in sorted(legend_mapping.items())
+                    'maxWidth': '800px',
+                    'margin': '0 auto'
+                })
             ], style={
-                'maxWidth': '800px',
-                'margin': '0 auto'
+                'backgroundColor': '#E6E8EC',
+                'padding': '20px',
+                'borderRadius': '10px',
+                'textAlign': 'center',
+                'maxWidth': '1200px',
+                'margin': '40px auto 0 auto',
+                'boxSizing': 'border-box'
             })
-        ], style={
-            'backgroundColor': '#E6E8EC',
-            'padding': '20px',
-            'borderRadius': '10px',
-            'textAlign': 'center',
-            'maxWidth': '1200px',
-            'margin': '40px auto 0 auto',
-            'boxSizing': 'border-box'
-        })
 
-    ], style={'fontFamily': 'Arial, sans-serif', 'backgroundColor': '#f3f4f6', 'minHeight': '100vh'})
+        ], style={'fontFamily': 'Arial, sans-serif', 'backgroundColor': '#f3f4f6', 'minHeight': '100vh'})
+
+    app.layout = serve_layout
 
 
 
@@ -248,41 +297,50 @@ def create_dash_heatmap(server):
         Input('location-filter', 'value'),  # new input
     )
     def update_heatmap(start_date, end_date, selected_campaigns, selected_locations):
-        filtered = df.copy()
+        grid = derived('heatmap_grid', build_heatmap_grid, COMPLETED_PAYOUTS)
 
+        days = grid['days']
+        first, last = 0, len(days)
         if start_date and end_date:
-            start = pd.to_datetime(start_date)
-            end = pd.to_datetime(end_date)
-            filtered = filtered[(filtered['payout_date'] >= start) & (filtered['payout_date'] <= end)]
+            first = days.searchsorted(pd.to_datetime(start_date), 'left')
+            last = max(days.searchsorted(pd.to_datetime(end_date), 'right'), first)
 
+        rows = np.ones(len(grid['campaigns']), dtype=bool)
         if selected_campaigns:
-            filtered = filtered[filtered['registration_location_id'].isin(selected_campaigns)]
-
+            rows &= grid['campaigns'].isin(selected_campaigns)
         if selected_locations:
-            filtered = filtered[filtered['location'].isin(selected_locations)]
+            rows &= grid['locations'].isin(selected_locations)[grid['location_codes']]
 
-        if filtered.empty:
+        # Add the selected campaigns' rows into one row per location
+        location_codes = grid['location_codes'][rows]
+        counts = np.zeros((len(grid['locations']), last - first), dtype=np.int64)
+        amounts = np.zeros((len(grid['locations']), last - first))
+        np.add.at(counts, location_codes, grid['counts'][rows, first:last])
+        np.add.at(amounts, location_codes, grid['amounts'][rows, first:last])
+
+        if not counts.any():
             fig = px.density_heatmap(
                 title="No data available for the selected filters."
             )
             return fig
 
-        filtered['payout_date'] = filtered['payout_date'].dt.date
-        grouped = filtered.groupby(['location', 'payout_date'])['amount'].sum().reset_index()
-
-        fig = px.density_heatmap(
-            grouped,
-            x='payout_date',
-            y='location',
-            z='amount',
-            histfunc='sum',
-            color_continuous_scale='Viridis',
+        # Locations with payouts in range, over the days from the first payout to the last
+        has_location = counts.any(axis=1)
+        used_days = np.flatnonzero(counts.any(axis=0))
+        day_slice = slice(used_days[0], used_days[-1] + 1)
+
+        fig = go.Figure(go.Heatmap(
+            x=days[first:last][day_slice],
+            y=grid['locations'][has_location],
+            z=amounts[has_location, day_slice],
+            colorscale='Viridis',
+            colorbar={'title': {'text': 'Total Disbursed (SGD)'}},
+            hovertemplate='Date=%{x}<br>Location=%{y}<br>Total Disbursed (SGD)=%{z}<extra></extra>',
+        ))
+        fig.update_layout(
             title="Heatmap of Amount Disbursed by Location and Date",
-            labels={
-                'payout_date': 'Date',
-                'location': 'Location',
-                'amount': 'Total Disbursed (SGD)'
-            }
+            xaxis_title='Date',
+            yaxis_title='Location',
         )
         fig.update_layout(xaxis_nticks=20)
         return fig
@@ -299,7 +357,7 @@ def create_dash_heatmap(server):
         if not selected_location:
             return []
 
-        filtered = df.copy()
+        filtered = get_df().copy(deep=False)
 
         # Filter by date range
         if start_date and end_date:
@@ -322,7 +380,7 @@ def create_dash_heatmap(server):
             return []
 
         # Group by campaign name, sum amounts and count unique_ids
-        grouped = filtered.groupby('registration_location_id').agg(
+        grouped = filtered.groupby('registration_location_id', observed=True).agg(
             amount=('amount', 'sum'),
             unique_ids=('gms_id', 'nunique')
         ).reset_index()
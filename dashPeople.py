@@ -1,4 +1,5 @@
 from dash import Dash, dcc, html, Input, Output, dash_table, State
+import numpy as np
 import pandas as pd
 from dash.dash_table import FormatTemplate
 from dash.dash_table.Format import Format, Scheme
@@ -11,29 +12,53 @@ import dash_bootstrap_components as dbc
 from dash_iconify import DashIconify
 from graphs_people import DisbursementDashboardGraphs
 from navigation_menu import create_vertical_icon_sidebar
-from loadcsv import load_csv_data
+from loadcsv import load_csv_data, get_source, CsvSource, CombinedSource, concat_frames, CATEGORY_COLUMNS
+from table_paging import paging_props
+from typeahead import SubstringIndex
 
 
-import pandas as pd
-import requests
-import io
-
-# URL 1
+# Allowance export for the volunteer pages; the allowance history comes from loadcsv,
+# which downloads the same export for the other dashboards
 url1 = "https://wacsg2025-my.sharepoint.com/:x:/p/pek_yi_liang/ESy-RRjcOPdBgqfuuk_55YsBB4x3cX67daKiKwHq0A0xgA?e=CM9fub&download=1"
-response1 = requests.get(url1)
-response1.raise_for_status()
-csv_data1 = response1.content.decode('utf-8')
-df1 = pd.read_csv(io.StringIO(csv_data1))
 
-# URL 2 (fix the URL syntax)
-url3 = "https://wacsg2025-my.sharepoint.com/:x:/p/pek_yi_liang/EYByP1ybOBxKlPl6wpPGcg4BOSo4C13dvOvKIGZxX8rU1Q?e=jnocXy&download=1"
-response3 = requests.get(url3)
-response3.raise_for_status()
-csv_data3 = response3.content.decode('utf-8')
-df3 = pd.read_csv(io.StringIO(csv_data3))
 
-# Combine
-df1 = pd.concat([df1, df3], ignore_index=True)
+def combine_people_data(allowance, history):
+    df = concat_frames(allowance, history)
+    # The volunteer pages group and join on these as plain text
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(df[col].cat.categories.dtype)
+    # Profile links and lookups use the stripped, upper-cased name
+    df['name'] = df['name'].str.strip().str.upper()
+    return df
+
+
+# Downloaded on first use (main.py prefetches it at boot) so importing this module never waits on SharePoint
+_allowance_source = CsvSource(url1, snapshot='volunteer_allowance')
+_source = CombinedSource([_allowance_source, get_source()], combine_people_data, 'volunteer data')
+
+
+def load_volunteer_allowance():
+    return _allowance_source.load()
+
+
+def force_refresh():
+    print("Force refreshing volunteer allowance CSV...")
+    _allowance_source.refresh()
+
+
+def load_people_data():
+    """Combined allowance rows behind the volunteer pages. Treat as read-only."""
+    return _source.load()
+
+
+def get_version():
+    return _source.current()[0]
+
+
+def derived(key, builder):
+    """Per-version artifact built from the volunteer data, see VersionedSource.derived."""
+    return _source.derived(key, builder)
 
 
 #file2 = "/Users/pekkerz/Downloads/allowance_history 20250621-161750.csv"
@@ -43,7 +68,7 @@ df1 = pd.concat([df1, df3], ignore_index=True)
 #combined.to_csv(file1, index=False)
 
 def get_data_raw():
-    df = df1.copy()
+    df = load_people_data().copy()
     df['payout_date'] = pd.to_datetime(df['payout_date'], errors='coerce').dt.date
     # Only drop rows where essential data is missing, but keep rejected entries
     df = df.dropna(subset=['approval_final_status'])  # Keep entries with approval status
@@ -51,7 +76,7 @@ def get_data_raw():
     return df
 
 def get_data():
-    df = df1.copy()
+    df = load_people_data().copy()
     df['payout_date'] = pd.to_datetime(df['payout_date'], errors='coerce').dt.date
     df = df.dropna(subset=['name', 'payout_date'])
     #df = df[df['approval_stage'].str.lower() != 'pending']  # 👈 Filter out pending
@@ -60,62 +85,101 @@ def get_data():
 
 graphs_module = DisbursementDashboardGraphs(get_data, get_data_raw)
 
+# Define mutually exclusive substrings
+MUTUALLY_EXCLUSIVE_PAIRS = [
+    ('Attendance_Silent-Hours_AM', 'Attendance_AM'),
+    # Add more if needed
+]
+
+# Define substrings to check for duplicates
+SHIFT_KEYWORDS_TO_CHECK_DUPLICATES = [
+    'Silent_Hours_AM',
+    'Attendance_AM',
+    'Attendance_PM',
+    'Attendance_Silent_Hour_11PM_7AM',
+    'SEN_Attendance_BENTO',
+    'TSA_Attendance',
+    'test',
+]
+
+CONFLICT_COLUMNS = ['name', 'date', 'conflict_type', 'description', 'shifts_involved', 'severity']
+
+
+def keyword_hits(shifts, keywords):
+    """
+    Case-insensitive substring hits as a (rows, keywords) boolean matrix,
+    computed once per distinct shift rather than once per row.
+    """
+    codes, uniques = pd.factorize(shifts)
+    # Last slot stands in for missing shifts (code -1), matched as the string 'nan'
+    names = [str(s).lower() for s in uniques] + ['nan']
+    hits = np.array([[kw.lower() in s for kw in keywords] for s in names], dtype=bool).reshape(len(names), len(keywords))
+    return hits[codes]
+
+
 def detect_conflicts(df):
-    df = df.copy()
+    df = df.copy(deep=False)
     df['registration_date'] = pd.to_datetime(df['registration_date'], errors='coerce').dt.date
-    
-    conflicts = []
-    # Define mutually exclusive substrings
-    mutually_exclusive_pairs = [
-        ('Attendance_Silent-Hours_AM', 'Attendance_AM'),
-        # Add more if needed
-    ]
-
-    # Define substrings to check for duplicates
-    shift_keywords_to_check_duplicates = [
-        'Silent_Hours_AM',
-        'Attendance_AM',
-        'Attendance_PM',
-        'Attendance_Silent_Hour_11PM_7AM',
-        'SEN_Attendance_BENTO',
-        'TSA_Attendance',
-        'test',
-    ]
+    df = df[df['name'].notna() & df['registration_date'].notna()]
+    if df.empty:
+        return pd.DataFrame()
 
     # Group by person and date
-    for (name, date), group in df.groupby(['name', 'registration_date']):
-        if pd.isna(date):  # Skip if date is NaN
-            continue
-            
-        shift_types = group['registration_location_id'].tolist()
-        shift_types_lower = [str(s).lower() for s in shift_types if pd.notna(s)]
-
-        # CONFLICT TYPE 1: Mutually Exclusive Substring Shifts
-        for kw1, kw2 in mutually_exclusive_pairs:
-            if any(kw1.lower() in s for s in shift_types_lower) and any(kw2.lower() in s for s in shift_types_lower):
-                conflicts.append({
-                    'name': name,
-                    'date': date,
-                    'conflict_type': 'Mutually Exclusive Shifts',
-                    'description': f"Shifts contain both '{kw1}' and '{kw2}'",
-                    'shifts_involved': [s for s in shift_types if kw1.lower() in str(s).lower() or kw2.lower() in str(s).lower()],
-                    'severity': 'HIGH'
-                })
-
-        # CONFLICT TYPE 2: Duplicate Substring Shifts
-        for keyword in shift_keywords_to_check_duplicates:
-            matched_shifts = [s for s in shift_types if keyword.lower() in str(s).lower()]
-            if len(matched_shifts) > 1:
-                conflicts.append({
-                    'name': name,
-                    'date': date,
-                    'conflict_type': 'Duplicate Shift Entry',
-                    'description': f"Multiple shifts contain '{keyword}' ({len(matched_shifts)} times)",
-                    'shifts_involved': matched_shifts,
-                    'severity': 'MEDIUM'
-                })
+    group_ids = df.groupby(['name', 'registration_date'], sort=True).ngroup().to_numpy()
+    n_groups = group_ids.max() + 1
+    first_rows = df.groupby(group_ids, sort=True)[['name', 'registration_date']].first()
+
+    keywords = [kw for pair in MUTUALLY_EXCLUSIVE_PAIRS for kw in pair] + SHIFT_KEYWORDS_TO_CHECK_DUPLICATES
+    hits = keyword_hits(df['registration_location_id'], keywords)
+    counts = np.stack([np.bincount(group_ids, weights=hits[:, i], minlength=n_groups) for i in range(len(keywords))], axis=1)
+
+    def conflicts_for(order, flagged, rows, conflict_type, description, severity):
+        if not flagged.any():
+            return None
+        rows = rows & flagged[group_ids]
+        involved = df['registration_location_id'][rows].groupby(group_ids[rows], sort=True).agg(list)
+        groups = involved.index.to_numpy()
+        return pd.DataFrame({
+            'group': groups,
+            'order': order,
+            'name': first_rows['name'].to_numpy()[groups],
+            'date': first_rows['registration_date'].to_numpy()[groups],
+            'conflict_type': conflict_type,
+            'description': description(groups),
+            'shifts_involved': involved.to_numpy(),
+            'severity': severity,
+        })
 
-    return pd.DataFrame(conflicts)
+    found = []
+    # CONFLICT TYPE 1: Mutually Exclusive Substring Shifts
+    for i, (kw1, kw2) in enumerate(MUTUALLY_EXCLUSIVE_PAIRS):
+        a, b = 2 * i, 2 * i + 1
+        found.append(conflicts_for(
+            i, (counts[:, a] > 0) & (counts[:, b] > 0), hits[:, a] | hits[:, b],
+            'Mutually Exclusive Shifts',
+            lambda groups, kw1=kw1, kw2=kw2: f"Shifts contain both '{kw1}' and '{kw2}'",
+            'HIGH',
+        ))
+
+    # CONFLICT TYPE 2: Duplicate Substring Shifts
+    offset = 2 * len(MUTUALLY_EXCLUSIVE_PAIRS)
+    for i, keyword in enumerate(SHIFT_KEYWORDS_TO_CHECK_DUPLICATES):
+        col = offset + i
+        found.append(conflicts_for(
+            col, counts[:, col] > 1, hits[:, col],
+            'Duplicate Shift Entry',
+            lambda groups, keyword=keyword, col=col: [
+                f"Multiple shifts contain '{keyword}' ({int(n)} times)" for n in counts[groups, col]
+            ],
+            'MEDIUM',
+        ))
+
+    found = [f for f in found if f is not None]
+    if not found:
+        return pd.DataFrame()
+    # Same order as checking each (name, date) group in turn
+    conflicts = pd.concat(found, ignore_index=True).sort_values(['group', 'order'], kind='stable')
+    return conflicts[CONFLICT_COLUMNS].reset_index(drop=True)
 
 def get_data_with_conflicts():
     """
@@ -131,45 +195,51 @@ def get_data_with_conflicts():
     df['conflict_types'] = ''
     
     if not conflicts_df.empty:
-        # Mark rows with conflicts
-        for _, conflict in conflicts_df.iterrows():
-            # Use registration_date for conflict matching instead of payout_date
-            mask = (df['name'] == conflict['name'])
-            # Add date matching if both dates exist
-            if 'registration_date' in df.columns:
-                df['registration_date'] = pd.to_datetime(df['registration_date'], errors='coerce').dt.date
-                mask = mask & (df['registration_date'] == conflict['date'])
-            
-            if mask.any():
-                df.loc[mask, 'has_conflict'] = True
-                
-                # Accumulate conflict types for each row
-                for idx in df[mask].index:
-                    existing_conflicts = df.loc[idx, 'conflict_types']
-                    new_conflict = conflict['conflict_type']
-                    if existing_conflicts:
-                        df.loc[idx, 'conflict_types'] = f"{existing_conflicts}, {new_conflict}"
-                    else:
-                        df.loc[idx, 'conflict_types'] = new_conflict
+        # Use registration_date for conflict matching instead of payout_date
+        df['registration_date'] = pd.to_datetime(df['registration_date'], errors='coerce').dt.date
+        conflict_types = (
+            conflicts_df.groupby(['name', 'date'], sort=False)['conflict_type']
+            .agg(', '.join)
+            .rename('matched_conflict_types')
+        )
+        matched = df[['name', 'registration_date']].join(conflict_types, on=['name', 'registration_date'])['matched_conflict_types']
+        df['has_conflict'] = matched.notna()
+        df['conflict_types'] = matched.fillna('')
     
     return df, conflicts_df
 
-def layout_avg():
-    df = get_data()
-    df1['name'] = df1['name'].str.strip().str.upper()
+# Columns of the Volunteer Finder table, and the ones its filters search
+IDENTITY_COLUMNS = ['link', 'gms_id', 'badge_id', 'gms_role_name', 'shift_count']
+IDENTITY_SEARCH_COLUMNS = ['gms_id', 'badge_id', 'gms_role_name']
 
-    # Normalize names in df as well
-    df['name'] = df['name'].str.strip().str.upper()
 
-    # Get unique people and their identity info
-    people = df1.drop_duplicates(subset='name')[['name', 'gms_id', 'badge_id', 'gms_role_name']].copy()
-    
-    # Calculate shift counts for each person
-    shift_counts = df.groupby('name').size().reset_index(name='shift_count')
-    
-    # Merge shift counts with people data
-    people = people.merge(shift_counts, on='name', how='left')
-    people['shift_count'] = people['shift_count'].fillna(0).astype(int)
+def build_identity_index(df):
+    """
+    The Volunteer Finder table, one row per name with its profile link as
+    markdown and shift count, plus a substring index per searchable column.
+    """
+    people = df.drop_duplicates(subset='name')[['name', 'gms_id', 'badge_id', 'gms_role_name']]
+
+    # Shifts are the rows get_data keeps: a name and a payout date
+    paid = df['name'].notna() & pd.to_datetime(df['payout_date'], errors='coerce').notna()
+    shift_counts = df.loc[paid, 'name'].value_counts()
+
+    names = people['name'].fillna('Name Not Found').astype(str)
+    table = people.assign(
+        link='[' + names.str.title() + '](/app3/person/' + names.map(urllib.parse.quote) + ')',
+        shift_count=people['name'].map(shift_counts).fillna(0).astype(int),
+    ).reset_index(drop=True)
+
+    index = {column: SubstringIndex(table[column]) for column in IDENTITY_SEARCH_COLUMNS}
+    return {'table': table, 'index': index}
+
+
+def get_identity_index():
+    return derived('identity_index', build_identity_index)
+
+
+def layout_avg():
+    people = get_identity_index()['table']
 
     return html.Div([
         html.Div([
@@ -259,16 +329,7 @@ def layout_avg():
                         {"name": "Shift Count", "id": "shift_count", "type": "numeric"}
                     ],
                     markdown_options={"html": True},
-                    data = [
-                        {
-                            "link": f"[{(str(row['name']).title() if isinstance(row['name'], str) else 'Name Not Found')}](/app3/person/{urllib.parse.quote(str(row['name']) if pd.notna(row['name']) else 'Name Not Found')})",
-                            "gms_id": row['gms_id'] if pd.notna(row['gms_id']) else "—",
-                            "badge_id": row['badge_id'] if pd.notna(row['badge_id']) else "—",
-                            "gms_role_name": row['gms_role_name'] if pd.notna(row['gms_role_name']) else "—",
-                            "shift_count": row['shift_count']
-                        }
-                        for _, row in people.iterrows()
-                    ],
+                    data=[],
                     style_cell={
                         'textAlign': 'left',
                         'backgroundColor': 'rgba(255,255,255,1)',
@@ -304,12 +365,9 @@ def layout_avg():
                             'color': 'black'
                         }
                     ],
-                    page_size=15,
                     style_table={'overflowX': 'auto'},
-                    # Enable sorting
-                    sort_action="native",
-                    # Sort by shift count in descending order by default
-                    sort_by=[{"column_id": "shift_count", "direction": "desc"}]
+                    # Paged, sorted and filtered by update_identity_table; shift count descending by default
+                    **paging_props(15, sort_by=[{"column_id": "shift_count", "direction": "desc"}])
                 )
             ], style={
                 'borderRadius': '15px',
@@ -335,6 +393,7 @@ def layout_avg():
 
 def layout_person(name):
     name = unquote(name)
+    df1 = load_people_data()
     df2 = df1[df1['name'] == name].copy()
     
     if df2.empty:
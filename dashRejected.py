@@ -3,7 +3,25 @@ import plotly.express as px
 from dash import Dash, dcc, html, Input, Output, dash_table
 import requests
 from io import StringIO
-from loadcsv import load_csv_data
+from loadcsv import derived, fill_category
+
+CUBE_DIMENSIONS = ['payout_date', 'gms_role_name', 'registration_location_id', 'approval_final_status']
+
+def build_rejection_cube(df):
+    """
+    Submission counts per (payout day, role, campaign, final status). The pie
+    and summary table sum slices of this instead of going over every row.
+    Missing dates and statuses are kept so unfiltered totals still match.
+    """
+    df = df.assign(
+        payout_date=df['payout_date'].dt.normalize(),
+        gms_role_name=fill_category(df['gms_role_name'], 'Unknown Role'),
+        registration_location_id=fill_category(df['registration_location_id'], 'Unknown Campaign'),
+    )
+    return df.groupby(CUBE_DIMENSIONS, observed=True, dropna=False).size().reset_index(name='count')
+
+def _day(value):
+    return value.date() if pd.notna(value) else None
 
 def create_dash_rejection_rate(server):
     # url = "https://wacsg2025-my.sharepoint.com/:x:/p/trisha_teo/EfFwqNRlqjdKgUnvBWe53SEBKKJA9yK7RomjADmwfuT6iQ?download=1"
@@ -12,132 +30,135 @@ def create_dash_rejection_rate(server):
     # csv_data = response.content.decode('utf-8')
     # df = pd.read_csv(StringIO(csv_data))
 
-    df = load_csv_data()
-
-    df['payout_date'] = pd.to_datetime(df['payout_date']).dt.date
-    df['approval_stage'] = df['approval_stage'].str.lower()
-    df['gms_role_name'] = df['gms_role_name'].fillna('Unknown Role')
-    df['registration_location_id'] = df['registration_location_id'].fillna('Unknown Campaign')
+    def get_cube():
+        return derived('rejection_cube', build_rejection_cube)
 
+    # Build the cube now so the first request doesn't pay for it
+    get_cube()
 
     app = Dash(__name__, server=server, url_base_pathname='/appRejectionRate/')
 
-    app.layout = html.Div([ 
-        # Header
-        html.Div([
-            html.H1("Rejection Rate Dashboard", 
-                    style={
-                        'margin': '0',
-                        'fontSize': '24px',
-                        'fontWeight': '600',
-                        'color': '#1f2937'
-                    })
-        ], style={
-            'padding': '20px 40px',
-            'backgroundColor': '#ffffff',
-            'borderBottom': '1px solid #e5e7eb'
-        }),
+    def serve_layout():
+        df = get_cube()
+        first_day, last_day = _day(df['payout_date'].min()), _day(df['payout_date'].max())
+        return html.Div([
+            # Header
+            html.Div([
+                html.H1("Rejection Rate Dashboard", 
+                        style={
+                            'margin': '0',
+                            'fontSize': '24px',
+                            'fontWeight': '600',
+                            'color': '#1f2937'
+                        })
+            ], style={
+                'padding': '20px 40px',
+                'backgroundColor': '#ffffff',
+                'borderBottom': '1px solid #e5e7eb'
+            }),
         
-        # Main content container
-        html.Div([
-            # Filters section
+            # Main content container
             html.Div([
-                # Left-side filters: Role and Campaign
+                # Filters section
                 html.Div([
-                    dcc.Dropdown(
-                        id='role-filter',
-                        options=[{'label': r, 'value': r} for r in sorted(df['gms_role_name'].dropna().unique())],
-                        placeholder="Select Role(s)",
-                        multi=True,
-                        style={
-                            'width': '280px',
-                            'marginBottom': '10px',
-                            'fontSize': '14px'
-                        }
-                    ),
-                    dcc.Dropdown(
-                        id='campaign-filter',
-                        options=[{'label': c, 'value': c} for c in sorted(df['registration_location_id'].dropna().unique())],
-                        placeholder="Select Campaign(s)",
-                        multi=True,
-                        style={
-                            'width': '280px',
-                            'fontSize': '14px'
-                        }
-                    )
-                ], style={'flex': '1'}),
+                    # Left-side filters: Role and Campaign
+                    html.Div([
+                        dcc.Dropdown(
+                            id='role-filter',
+                            options=[{'label': r, 'value': r} for r in sorted(df['gms_role_name'].dropna().unique())],
+                            placeholder="Select Role(s)",
+                            multi=True,
+                            style={
+                                'width': '280px',
+                                'marginBottom': '10px',
+                                'fontSize': '14px'
+                            }
+                        ),
+                        dcc.Dropdown(
+                            id='campaign-filter',
+                            options=[{'label': c, 'value': c} for c in sorted(df['registration_location_id'].dropna().unique())],
+                            placeholder="Select Campaign(s)",
+                            multi=True,
+                            style={
+                                'width': '280px',
+                                'fontSize': '14px'
+                            }
+                        )
+                    ], style={'flex': '1'}),
                 
-                # Right-side: Date range
-                html.Div([
-                    dcc.DatePickerRange(
-                        id='date-filter',
-                        min_date_allowed=df['payout_date'].min(),
-                        max_date_allowed=df['payout_date'].max(),
-                        start_date=df['payout_date'].min(),
-                        end_date=df['payout_date'].max(),
-                        display_format='DD/MM/YYYY',
-                        with_portal=True,
-                        clearable=True
-                    )
+                    # Right-side: Date range
+                    html.Div([
+                        dcc.DatePickerRange(
+                            id='date-filter',
+                            min_date_allowed=first_day,
+                            max_date_allowed=last_day,
+                            start_date=first_day,
+                            end_date=last_day,
+                            display_format='DD/MM/YYYY',
+                            with_portal=True,
+                            clearable=True
+                        )
+                    ], style={
+                        'flex': '1',
+                        'display': 'flex',
+                        'justifyContent': 'flex-end'
+                    })
                 ], style={
-                    'flex': '1',
                     'display': 'flex',
-                    'justifyContent': 'flex-end'
-                })
-            ], style={
-                'display': 'flex',
-                'justifyContent': 'space-between',
-                'alignItems': 'flex-start',
-                'margin': '20px 40px'
-            }),
+                    'justifyContent': 'space-between',
+                    'alignItems': 'flex-start',
+                    'margin': '20px 40px'
+                }),
             
-            # Graph section
-            html.Div([
-                dcc.Graph(id='rejection-pie')
-            ], style={
-                'margin': '20px 40px',
-                'backgroundColor': '#E6E8EC',
-                'padding': '20px',
-                'borderRadius': '8px'
-            }),
-
-
-            dash_table.DataTable(
-                id='summary-table',
-                columns=[],
-                data=[],
-                page_size=20,
-                style_table={
-                    'overflowX': 'auto',
-                    'border': '1px solid #e5e7eb',
+                # Graph section
+                html.Div([
+                    dcc.Graph(id='rejection-pie')
+                ], style={
+                    'margin': '20px 40px',
+                    'backgroundColor': '#E6E8EC',
+                    'padding': '20px',
                     'borderRadius': '8px'
-                },
-                sort_action='native',
-                style_header={
-                    'backgroundColor': "#c4b8fa",
-                    'fontWeight': '600',
-                    'fontSize': '14px',
-                    'color': '#374151',
-                    'border': '1px solid #e5e7eb',
-                    'textAlign': 'center'
-                },
-                style_cell={
-                    'textAlign': 'center',
-                    'padding': '12px',
-                    'fontSize': '14px',
-                    'color': '#374151',
-                    'border': '1px solid #e5e7eb'
-                },
-                style_data={
-                    'backgroundColor': '#F1F1F1FF',
-                    'border': '1px solid #e5e7eb'
-                },
-                style_data_conditional=[]  # Filled in by callback
-            )
-
-        ], style={'padding': '0 20px 40px'})
+                }),
+
+
+                dash_table.DataTable(
+                    id='summary-table',
+                    columns=[],
+                    data=[],
+                    page_size=20,
+                    style_table={
+                        'overflowX': 'auto',
+                        'border': '1px solid #e5e7eb',
+                        'borderRadius': '8px'
+                    },
+                    sort_action='native',
+                    style_header={
+                        'backgroundColor': "#c4b8fa",
+                        'fontWeight': '600',
+                        'fontSize': '14px',
+                        'color': '#374151',
+                        'border': '1px solid #e5e7eb',
+                        'textAlign': 'center'
+                    },
+                    style_cell={
+                        'textAlign': 'center',
+                        'padding': '12px',
+                        'fontSize': '14px',
+                        'color': '#374151',
+                        'border': '1px solid #e5e7eb'
+                    },
+                    style_data={
+                        'backgroundColor': '#F1F1F1FF',
+                        'border': '1px solid #e5e7eb'
+                    },
+                    style_data_conditional=[]  # Filled in by callback
+                )
+
+            ], style={'padding': '0 20px 40px'})
         
-    ], style={'fontFamily': 'Arial, sans-serif', 'backgroundColor': '#f3f4f6', 'minHeight': '100vh'})
+        ], style={'fontFamily': 'Arial, sans-serif', 'backgroundColor': '#f3f4f6', 'minHeight': '100vh'})
+
+    app.layout = serve_layout
 
 
     @app.callback(
@@ -153,20 +174,25 @@ def create_dash_rejection_rate(server):
     )
     def update_dashboard(start_date, end_date, selected_roles, selected_campaigns):
 
-        filtered = df.copy()
+        cube = get_cube()
 
+        keep = pd.Series(True, index=cube.index)
         if start_date:
-            filtered = filtered[filtered['payout_date'] >= pd.to_datetime(start_date).date()]
+            keep &= cube['payout_date'] >= pd.to_datetime(start_date).normalize()
         if end_date:
-            filtered = filtered[filtered['payout_date'] <= pd.to_datetime(end_date).date()]
+            keep &= cube['payout_date'] <= pd.to_datetime(end_date).normalize()
         if selected_roles:
-            filtered = filtered[filtered['gms_role_name'].isin(selected_roles)]
+            keep &= cube['gms_role_name'].isin(selected_roles)
         if selected_campaigns:
-            filtered = filtered[filtered['registration_location_id'].isin(selected_campaigns)]
+            keep &= cube['registration_location_id'].isin(selected_campaigns)
+        filtered = cube[keep]
 
         # Pie chart
-        status_counts = filtered['approval_final_status'].value_counts().reset_index()
-        status_counts.columns = ['approval_final_status', 'count']
+        status_counts = (
+            filtered.groupby('approval_final_status')['count'].sum()
+            .sort_values(ascending=False, kind='stable')
+            .reset_index()
+        )
         print(status_counts)
 
         fig = px.pie(
@@ -189,16 +215,17 @@ def create_dash_rejection_rate(server):
 
         # Summary table
         summary = (
-            filtered.groupby(['gms_role_name', 'registration_location_id', 'approval_final_status'])
-            .size()
-            .reset_index(name='count')
+            filtered.groupby(['gms_role_name', 'registration_location_id', 'approval_final_status'], observed=True)
+            ['count'].sum()
+            .reset_index()
         )
 
         summary_pivot = (
             summary.pivot_table(index=['gms_role_name', 'registration_location_id'],
                                 columns='approval_final_status',
                                 values='count',
-                                fill_value=0)
+                                fill_value=0,
+                                observed=True)
             .reset_index()
         )
 
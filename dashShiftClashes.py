@@ -6,7 +6,9 @@ from io import StringIO
 import random
 from datetime import date, timedelta
 import colorsys
-from loadcsv import load_csv_data
+from loadcsv import derived, get_version
+from clash_engine import detect_clashes_by_keyword, ClashStore, score_high_risk, HIGH_RISK_MIN_CATEGORIES, HIGH_RISK_TOP_N
+from table_paging import paging_props, current_page, table_page
 from dash import State
 
 def generate_pastel_colors(n):
@@ -24,45 +26,6 @@ def generate_pastel_colors(n):
     return pastel_colors
 
 
-def detect_clashes_by_keyword(df, category_keywords):
-    # Normalize registration_location_id: lowercase and remove dashes/underscores
-    df['registration_location_id_norm'] = df['registration_location_id'].str.lower().str.replace(r'[-_]', '', regex=True)
-
-    clashes_by_category = {}
-    used_campaigns = set()
-
-    # Process more specific keywords first (order matters)
-    for label, keyword in category_keywords.items():
-        clashing = []
-
-        grouped = df.groupby(['gms_id', 'date_created'])
-
-        for (gms_id, date), group in grouped:
-            # Match campaigns for this category, excluding ones already matched to earlier categories
-            matched_campaigns = set(
-                group.loc[
-                    group['registration_location_id_norm'].str.contains(keyword) &
-                    ~group['registration_location_id_norm'].isin(used_campaigns),
-                    'registration_location_id_norm'
-                ]
-            )
-
-            if len(matched_campaigns) >= 2:
-                clash_rows = group[group['registration_location_id_norm'].isin(matched_campaigns)]
-                clashing.append(clash_rows)
-
-        if clashing:
-            result_df = pd.concat(clashing).drop_duplicates()
-            clashes_by_category[label] = result_df
-
-            # Track used campaigns to prevent overlaps
-            used_campaigns.update(result_df['registration_location_id_norm'].unique())
-        else:
-            clashes_by_category[label] = pd.DataFrame(columns=df.columns)
-
-    return clashes_by_category
-
-
 def create_dash_shift_clashes(server):
     # url = "https://wacsg2025-my.sharepoint.com/:x:/p/trisha_teo/EVrANWuO5ORCiBcETNa7kZ4BWbjnyqc5IPX7r_Q-VGAf5w?download=1"
     # response = requests.get(url)
@@ -71,9 +34,6 @@ def create_dash_shift_clashes(server):
 
     # df = pd.read_csv(StringIO(csv_data), parse_dates=['date_created'])
     
-    df = load_csv_data()
-    df['date_created'] = pd.to_datetime(df['date_created'], utc=True)
-    df['date_created'] = df['date_created'].dt.date
 
     category_keywords = {
         "Silent Hour 11pm - 7am": "silenthour11pm7am",
@@ -82,19 +42,16 @@ def create_dash_shift_clashes(server):
         "PM": "attendancepm",
     }
 
-    clash_dfs = detect_clashes_by_keyword(df, category_keywords)
+    def prepare_clashes(df):
+        df['date_created'] = df['date_created'].dt.date
+        return df, ClashStore(detect_clashes_by_keyword(df, category_keywords))
+
+    def get_clash_dfs():
+        return derived('shift_clashes', prepare_clashes)
 
     app = Dash(__name__, server=server, routes_pathname_prefix='/appShiftClashes/')
     app.title = "GovWallet Shift Timing Clashes"
 
-    min_date = min(df['date_created'])
-    max_date = max(df['date_created'])
-
-    # Get current week's Monday and Sunday
-    today = date.today()
-    this_monday = today - timedelta(days=today.weekday())  # Monday
-    this_sunday = this_monday + timedelta(days=6) 
-
     section_style = {
         'backgroundColor': '#E6E8EC',
         'padding': '20px',
@@ -103,150 +60,195 @@ def create_dash_shift_clashes(server):
         'boxShadow': '0 2px 6px rgba(0,0,0,0.05)'
     }
 
-    app.layout = html.Div([
-        # Header
-        html.Div([
-            html.H1("GovWallet Shift Timing Clashes (Finance Manager Version)",
-                    style={
-                        'margin': '0',
-                        'fontSize': '24px',
-                        'fontWeight': '600',
-                        'color': '#1f2937',
-                        'textAlign': 'center',
-                        'padding': '20px 40px',
-                        'backgroundColor': '#ffffff',
-                        'borderBottom': '1px solid #e5e7eb'
-                    })
-        ],  style={
-            'padding': '20px 40px',
-            'backgroundColor': '#ffffff',
-            'borderBottom': '1px solid #e5e7eb'
-        }),
+    def serve_layout():
+        df = get_clash_dfs()[0]
+        min_date = min(df['date_created'])
+        max_date = max(df['date_created'])
+        today = date.today()
+        this_monday = today - timedelta(days=today.weekday())  # Monday
+        this_sunday = this_monday + timedelta(days=6)
 
-        # Main content
-        html.Div([
-            # Date Picker on the left
+        return html.Div([
+            # Header
             html.Div([
-                dcc.DatePickerRange(
-                    id='date-range-clashes',
-                    min_date_allowed=min_date,
-                    max_date_allowed=max_date,
-                    start_date=this_monday,
-                    end_date=this_sunday,
-                    display_format='YYYY-MM-DD',
-                    clearable=True,
-                    with_portal=True,
-                    style={'fontSize': '14px'}
-                )
-            ]),
-            
-            # Filter Button and Dropdown on the right
+                html.H1("GovWallet Shift Timing Clashes (Finance Manager Version)",
+                        style={
+                            'margin': '0',
+                            'fontSize': '24px',
+                            'fontWeight': '600',
+                            'color': '#1f2937',
+                            'textAlign': 'center',
+                            'padding': '20px 40px',
+                            'backgroundColor': '#ffffff',
+                            'borderBottom': '1px solid #e5e7eb'
+                        })
+            ],  style={
+                'padding': '20px 40px',
+                'backgroundColor': '#ffffff',
+                'borderBottom': '1px solid #e5e7eb'
+            }),
+
+            # Main content
             html.Div([
-                html.Button([
-                    html.Img(
-                        src="https://static.thenounproject.com/png/247545-200.png",
-                        style={'width': '20px', 'height': '20px'}
+                # Date Picker on the left
+                html.Div([
+                    dcc.DatePickerRange(
+                        id='date-range-clashes',
+                        min_date_allowed=min_date,
+                        max_date_allowed=max_date,
+                        start_date=this_monday,
+                        end_date=this_sunday,
+                        display_format='YYYY-MM-DD',
+                        clearable=True,
+                        with_portal=True,
+                        style={'fontSize': '14px'}
                     )
-                ],
-                id='filter-toggle-btn',
-                style={
-                    'backgroundColor': "#C1C7D2",
-                    'border': 'none',
-                    'borderRadius': '50%',
-                    'width': '36px',
-                    'height': '36px',
-                    'cursor': 'pointer',
-                    'display': 'flex',
-                    'alignItems': 'center',
-                    'justifyContent': 'center',
-                    'transition': 'all 0.2s ease',
-                    'boxShadow': '0 2px 6px rgba(0,0,0,0.15)'
-                }),
-
+                ]),
+            
+                # Filter Button and Dropdown on the right
                 html.Div([
-                    html.Label("Filter by GMS ID:", style={'fontWeight': '600', 'marginTop': '10px'}),
-                    dcc.Dropdown(
-                        id='filter-gms-id',
-                        options=[],
-                        multi=True,
-                        placeholder='Select GMS ID(s)',
-                        style={'width': '300px', 'fontSize': '14px'}
-                    ),
+                    html.Button([
+                        html.Img(
+                            src="https://static.thenounproject.com/png/247545-200.png",
+                            style={'width': '20px', 'height': '20px'}
+                        )
+                    ],
+                    id='filter-toggle-btn',
+                    style={
+                        'backgroundColor': "#C1C7D2",
+                        'border': 'none',
+                        'borderRadius': '50%',
+                        'width': '36px',
+                        'height': '36px',
+                        'cursor': 'pointer',
+                        'display': 'flex',
+                        'alignItems': 'center',
+                        'justifyContent': 'center',
+                        'transition': 'all 0.2s ease',
+                        'boxShadow': '0 2px 6px rgba(0,0,0,0.15)'
+                    }),
 
-                    html.Label("Filter by Name:", style={'fontWeight': '600', 'marginTop': '15px'}),
-                    dcc.Dropdown(
-                        id='filter-name',
-                        options=[],
-                        multi=True,
-                        placeholder='Select Name(s)',
-                        style={'width': '300px', 'fontSize': '14px'}
-                    ),
+                    html.Div([
+                        html.Label("Filter by GMS ID:", style={'fontWeight': '600', 'marginTop': '10px'}),
+                        dcc.Dropdown(
+                            id='filter-gms-id',
+                            options=[],
+                            multi=True,
+                            placeholder='Type to search GMS ID(s)',
+                            style={'width': '300px', 'fontSize': '14px'}
+                        ),
+
+                        html.Label("Filter by Name:", style={'fontWeight': '600', 'marginTop': '15px'}),
+                        dcc.Dropdown(
+                            id='filter-name',
+                            options=[],
+                            multi=True,
+                            placeholder='Type to search Name(s)',
+                            style={'width': '300px', 'fontSize': '14px'}
+                        ),
+
+                        html.Label("Filter by Campaign:", style={'fontWeight': '600', 'marginTop': '15px'}),
+                        dcc.Dropdown(
+                            id='filter-location-id',
+                            options=[],
+                            multi=True,
+                            placeholder='Select Campaign(s)',
+                            style={'width': '300px', 'fontSize': '14px'}
+                        ),
+                    ],
+                    id='filter-dropdown-container',
+                    style={
+                        'display': 'none',
+                        'position': 'absolute',
+                        'top': 'calc(100% + 10px)',
+                        'right': '0',
+                        'zIndex': '1000',
+                        'backgroundColor': '#fff',
+                        'padding': '15px',
+                        'boxShadow': '0 4px 8px rgba(0,0,0,0.1)',
+                        'borderRadius': '8px',
+                        'width': '340px'
+                    })
+                ], style={'position': 'relative'}),
+
+            ], style={
+                'display': 'flex',
+                'justifyContent': 'space-between',
+                'alignItems': 'center',
+                'marginBottom': '20px'
+            }),
+
+            # Clash Summary Chart Section
+            html.Div(id='clash-summary-chart', style=section_style),
 
-                    html.Label("Filter by Campaign:", style={'fontWeight': '600', 'marginTop': '15px'}),
-                    dcc.Dropdown(
-                        id='filter-location-id',
-                        options=[],
-                        multi=True,
-                        placeholder='Select Campaign(s)',
-                        style={'width': '300px', 'fontSize': '14px'}
+            # Clash Detail Selection Section
+            html.Div([
+                html.Label("Select Clash Shift Timing to View Details:", style={'fontWeight': '600', 'marginBottom': '10px'}),
+                dcc.Dropdown(
+                    id='category-dropdown',
+                    placeholder='Select a clashing shift timing',
+                    style={'fontSize': '14px', 'marginBottom': '20px'}
+                ),
+                html.Div(id='category-table'),
+                html.Div(
+                    dash_table.DataTable(
+                        id='category-detail-table',
+                        columns=[
+                            {"name": "GMS ID", "id": "gms_id"},
+                            {"name": "Name", "id": "name"},
+                            {"name": "Date created", "id": "date_created"},
+                            {"name": "Campaign", "id": "registration_location_id"},
+                            {"name": "Final approval status", "id": "approval_final_status"},
+                            {"name": "Amount", "id": "amount"},
+                            {"name": "Final approval remarks", "id": "approval_final_remarks"},
+                            {"name": "Wallet status", "id": "approval_stage"},
+                        ],
+                        data=[],
+                        style_table={
+                            'overflowX': 'auto',
+                            'marginBottom': '30px',
+                            'fontSize': '12px',
+                            'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif'
+                        },
+                        style_cell={
+                            'textAlign': 'left',
+                            'fontSize': '12px',
+                            'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif'
+                        },
+                        style_header={
+                            'fontWeight': 'bold',
+                            'fontSize': '12px',
+                            'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif'
+                        },
+                        **paging_props(10),
                     ),
-                ],
-                id='filter-dropdown-container',
-                style={
-                    'display': 'none',
-                    'position': 'absolute',
-                    'top': 'calc(100% + 10px)',
-                    'right': '0',
-                    'zIndex': '1000',
-                    'backgroundColor': '#fff',
-                    'padding': '15px',
-                    'boxShadow': '0 4px 8px rgba(0,0,0,0.1)',
-                    'borderRadius': '8px',
-                    'width': '340px'
-                })
-            ], style={'position': 'relative'}),
+                    id='category-detail-container',
+                    style={'display': 'none'}
+                )
+            ], style=section_style),
+
+            # High-Risk GMS IDs Section
+            html.Div([
+                html.H2("High-Risk GMS IDs",
+                        style={
+                            'textAlign': 'center',
+                            'fontSize': '18px',
+                            'fontWeight': '600',
+                            'color': '#1f2937',
+                            'marginTop': '40px',
+                            'marginBottom': '20px'
+                        }),
+                html.Div(id='high-risk-gms-table')
+            ], style=section_style),
 
         ], style={
-            'display': 'flex',
-            'justifyContent': 'space-between',
-            'alignItems': 'center',
-            'marginBottom': '20px'
-        }),
-
-        # Clash Summary Chart Section
-        html.Div(id='clash-summary-chart', style=section_style),
-
-        # Clash Detail Selection Section
-        html.Div([
-            html.Label("Select Clash Shift Timing to View Details:", style={'fontWeight': '600', 'marginBottom': '10px'}),
-            dcc.Dropdown(
-                id='category-dropdown',
-                placeholder='Select a clashing shift timing',
-                style={'fontSize': '14px', 'marginBottom': '20px'}
-            ),
-            html.Div(id='category-table')
-        ], style=section_style),
-
-        # High-Risk GMS IDs Section
-        html.Div([
-            html.H2("High-Risk GMS IDs",
-                    style={
-                        'textAlign': 'center',
-                        'fontSize': '18px',
-                        'fontWeight': '600',
-                        'color': '#1f2937',
-                        'marginTop': '40px',
-                        'marginBottom': '20px'
-                    }),
-            html.Div(id='high-risk-gms-table')
-        ], style=section_style),
-
-    ], style={
-        'padding': '30px 40px',
-        'backgroundColor': '#ffffff',
-        'minHeight': 'calc(100vh - 80px)',
-        'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif',
-    })
+            'padding': '30px 40px',
+            'backgroundColor': '#ffffff',
+            'minHeight': 'calc(100vh - 80px)',
+            'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif',
+        })
+
+    app.layout = serve_layout
         
     @app.callback(
         Output('filter-dropdown-container', 'style'),
@@ -277,33 +279,48 @@ def create_dash_shift_clashes(server):
         return new_style
     
     @app.callback(
-        Output('filter-gms-id', 'options'),
-        Output('filter-name', 'options'),
         Output('filter-location-id', 'options'),
         Input('date-range-clashes', 'start_date'),
         Input('date-range-clashes', 'end_date'),
     )
     def update_filter_options(start_date, end_date):
         import pandas as pd
+        clashes = get_clash_dfs()[1]
         
         if not start_date or not end_date:
-            return [], [], []
+            return []
         
         start = pd.to_datetime(start_date).date()
         end = pd.to_datetime(end_date).date()
 
-        filtered_dfs = [
-            df[(df['date_created'] >= start) & (df['date_created'] <= end)]
-            for df in clash_dfs.values()
-        ]
+        filtered_dfs = list(clashes.select(start, end).values())
         
         all_data = pd.concat(filtered_dfs, ignore_index=True) if filtered_dfs else pd.DataFrame()
 
-        gms_options = [{'label': x, 'value': x} for x in sorted(all_data['gms_id'].dropna().unique())]
-        name_options = [{'label': x, 'value': x} for x in sorted(all_data['name'].dropna().unique())]
         loc_options = [{'label': x, 'value': x} for x in sorted(all_data['registration_location_id'].dropna().unique())]
 
-        return gms_options, name_options, loc_options
+        return loc_options
+
+    # GMS ids and names can run to thousands; matches are looked up as the user types
+    @app.callback(
+        Output('filter-gms-id', 'options'),
+        Input('filter-gms-id', 'search_value'),
+        State('filter-gms-id', 'value'),
+        State('date-range-clashes', 'start_date'),
+        State('date-range-clashes', 'end_date'),
+    )
+    def search_gms_ids(search_value, selected, start_date, end_date):
+        return get_clash_dfs()[1].search_people('gms_id', search_value, selected, start_date, end_date)
+
+    @app.callback(
+        Output('filter-name', 'options'),
+        Input('filter-name', 'search_value'),
+        State('filter-name', 'value'),
+        State('date-range-clashes', 'start_date'),
+        State('date-range-clashes', 'end_date'),
+    )
+    def search_names(search_value, selected, start_date, end_date):
+        return get_clash_dfs()[1].search_people('name', search_value, selected, start_date, end_date)
 
 
     @app.callback(
@@ -317,29 +334,17 @@ def create_dash_shift_clashes(server):
         Input('filter-location-id', 'value'),
     )
     def update_clashes(start_date, end_date, gms_id_filter, name_filter, loc_id_filter):
+        clashes = get_clash_dfs()[1]
         start = pd.to_datetime(start_date).date()
         end = pd.to_datetime(end_date).date()
 
-        filtered_clash_dfs = {}
+        filtered_clash_dfs = clashes.select(start, end, gms_id_filter, name_filter, loc_id_filter)
         summary_data = []
 
-        for label, df_clash in clash_dfs.items():
-            df_filtered = df_clash[(df_clash['date_created'] >= start) & (df_clash['date_created'] <= end)]
-
-            # Apply additional filters
-            if gms_id_filter:
-                df_filtered = df_filtered[df_filtered['gms_id'].isin(gms_id_filter)]
-            if name_filter:
-                df_filtered = df_filtered[df_filtered['name'].isin(name_filter)]
-            if loc_id_filter:
-                df_filtered = df_filtered[df_filtered['registration_location_id'].isin(loc_id_filter)]
-
-            filtered_clash_dfs[label] = df_filtered
+        for label, df_filtered in filtered_clash_dfs.items():
             unique_person_dates = df_filtered.groupby(['gms_id', 'date_created']).ngroups
             summary_data.append({'category': label, 'clash_count': unique_person_dates})
 
-        app.filtered_clash_dfs = filtered_clash_dfs
-
         summary_df = pd.DataFrame(summary_data)
         summary_df = summary_df.sort_values('clash_count', ascending=True)
 
@@ -365,13 +370,34 @@ def create_dash_shift_clashes(server):
 
     @app.callback(
         Output('category-table', 'children'),
-        Input('category-dropdown', 'value')
+        Output('category-detail-container', 'style'),
+        Output('category-detail-table', 'data'),
+        Output('category-detail-table', 'page_count'),
+        Output('category-detail-table', 'page_current'),
+        Output('category-detail-table', 'style_data_conditional'),
+        Input('category-dropdown', 'value'),
+        Input('category-detail-table', 'page_current'),
+        Input('category-detail-table', 'page_size'),
+        Input('category-detail-table', 'sort_by'),
+        Input('category-detail-table', 'filter_query'),
+        State('date-range-clashes', 'start_date'),
+        State('date-range-clashes', 'end_date'),
+        State('filter-gms-id', 'value'),
+        State('filter-name', 'value'),
+        State('filter-location-id', 'value'),
     )
-    def update_category_table(selected_category):
-        if not selected_category or selected_category not in app.filtered_clash_dfs:
-            return html.Div("No data available.")
-
-        df_filtered = app.filtered_clash_dfs[selected_category]
+    def update_category_table(selected_category, page_current, page_size, sort_by, filter_query,
+                              start_date, end_date, gms_id_filter, name_filter, loc_id_filter):
+        hidden = {'display': 'none'}
+        version = get_version()
+        clashes = get_clash_dfs()[1]
+        if not selected_category or selected_category not in clashes.frames or not (start_date and end_date):
+            return html.Div("No data available."), hidden, [], 1, 0, []
+
+        # The same selection update_clashes summarised, from this request's own filters
+        start = pd.to_datetime(start_date).date()
+        end = pd.to_datetime(end_date).date()
+        df_filtered = clashes.select(start, end, gms_id_filter, name_filter, loc_id_filter)[selected_category]
 
         if df_filtered.empty:
             return html.Div(
@@ -382,10 +408,15 @@ def create_dash_shift_clashes(server):
                     'paddingTop': '20px',
                     'paddingBottom': '20px'
                 }
-            )
+            ), hidden, [], 1, 0, []
 
+        # Only the visible page goes to the browser, coloured by its (gms_id, date) groups
+        page_current = current_page('category-detail-table', page_current)
+        view_key = (__name__, version, selected_category, start, end,
+                    tuple(gms_id_filter or ()), tuple(name_filter or ()), tuple(loc_id_filter or ()))
+        page, page_count = table_page(df_filtered, page_current, page_size, sort_by, filter_query, view_key)
 
-        unique_groups = df_filtered[['gms_id', 'date_created']].drop_duplicates().reset_index(drop=True)
+        unique_groups = page[['gms_id', 'date_created']].drop_duplicates().reset_index(drop=True)
         colors = generate_pastel_colors(len(unique_groups))
         color_map = {
             (row['gms_id'], row['date_created']): colors[i]
@@ -403,39 +434,7 @@ def create_dash_shift_clashes(server):
             for (gms_id, date_created), color in color_map.items()
         ]
 
-        return dash_table.DataTable(
-            columns=[
-                {"name": "GMS ID", "id": "gms_id"},
-                {"name": "Name", "id": "name"},
-                {"name": "Date created", "id": "date_created"},
-                {"name": "Campaign", "id": "registration_location_id"},
-                {"name": "Final approval status", "id": "approval_final_status"},
-                {"name": "Amount", "id": "amount"},
-                {"name": "Final approval remarks", "id": "approval_final_remarks"},
-                {"name": "Wallet status", "id": "approval_stage"},
-            ],
-            data=df_filtered.to_dict('records'),
-            style_table={
-                'overflowX': 'auto',
-                'marginBottom': '30px',
-                'fontSize': '12px',
-                'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif'
-            },
-            style_cell={
-                'textAlign': 'left',
-                'fontSize': '12px',
-                'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif'
-            },
-            style_header={
-                'fontWeight': 'bold',
-                'fontSize': '12px',
-                'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif'
-            },
-            style_data_conditional=style_data_conditional,
-            page_size=10,
-            sort_action='native',
-            
-        )
+        return None, {}, page.to_dict('records'), page_count, page_current, style_data_conditional
 
 
 
@@ -451,39 +450,13 @@ def create_dash_shift_clashes(server):
         start = pd.to_datetime(start_date).date()
         end = pd.to_datetime(end_date).date()
 
-        gms_risk = {}       # gms_id -> set of clash categories
-        gms_names = {}      # gms_id -> set of names
-
-        for label, df_clash in app.filtered_clash_dfs.items():
-            df_filtered = df_clash[(df_clash['date_created'] >= start) & (df_clash['date_created'] <= end)]
-
-            if gms_id_filter:
-                df_filtered = df_filtered[df_filtered['gms_id'].isin(gms_id_filter)]
-            if name_filter:
-                df_filtered = df_filtered[df_filtered['name'].isin(name_filter)]
-            if loc_id_filter:
-                df_filtered = df_filtered[df_filtered['registration_location_id'].isin(loc_id_filter)]
-
-            for _, row in df_filtered.iterrows():
-                gms_id = row['gms_id']
-                name = row['name']
-                gms_risk.setdefault(gms_id, set()).add(label)
-                gms_names.setdefault(gms_id, set()).add(name)
-
-        high_risk_data = [
-            {
-                "gms_id": gms_id,
-                "name": ", ".join(sorted(gms_names.get(gms_id, []))),
-                "clash_categories": ", ".join(sorted(categories)),
-                "num_categories": len(categories)
-            }
-            for gms_id, categories in gms_risk.items()
-        ]
+        clashes = get_clash_dfs()[1].select(start, end, gms_id_filter, name_filter, loc_id_filter)
+        shown, total = score_high_risk(clashes, min_categories=HIGH_RISK_MIN_CATEGORIES, top_n=HIGH_RISK_TOP_N)
 
-        if not high_risk_data:
+        if shown.empty:
             return html.Div("No high-risk GMS IDs found in the selected range.")
 
-        df_risk = pd.DataFrame(high_risk_data).sort_values(by="num_categories", ascending=False)
+        caption = f"Showing the {len(shown)} highest-risk of {total} GMS IDs." if len(shown) < total else ""
 
         return html.Div([
             dash_table.DataTable(
@@ -491,9 +464,13 @@ def create_dash_shift_clashes(server):
                     {"name": "GMS ID", "id": "gms_id"},
                     {"name": "Name(s)", "id": "name"},
                     {"name": "Categories of the clashes", "id": "clash_categories"},
-                    {"name": "Number of clashes", "id": "num_categories"},
+                    {"name": "Number of categories", "id": "num_categories"},
+                    {"name": "Number of clashes", "id": "clash_count"},
+                    {"name": "Days with clashes", "id": "clash_days"},
+                    {"name": "First clash", "id": "first_date"},
+                    {"name": "Last clash", "id": "last_date"},
                 ],
-                data=df_risk.to_dict('records'),
+                data=shown.to_dict('records'),
                         page_size=10,
                         sort_action='native',
 
@@ -531,7 +508,8 @@ def create_dash_shift_clashes(server):
                                 'backgroundColor': '#ddd6fe'
                             }
                         ],
-                    )
+                    ),
+                    html.Div(caption, style={'fontSize': '13px', 'color': '#6b7280', 'marginTop': '8px'}),
                 ], style={
                     'padding': '0 20px',
                     'marginBottom': '40px'
@@ -1,9 +1,42 @@
+import numpy as np
 import pandas as pd
 import plotly.express as px
 from dash import Dash, dcc, html, Input, Output
 import requests
 from io import StringIO
-from loadcsv import load_csv_data
+from loadcsv import derived, load_completed_payouts, COMPLETED_PAYOUTS
+from timings import timed_callback
+
+FILTER_COLUMNS = ('gms_role_name', 'registration_location_id')
+
+
+def build_payout_index(df):
+    """
+    Completed payouts as plain arrays sorted by payout_date, with roles and
+    campaigns as integer codes, so a chart update binary-searches the dates
+    and filters by code instead of masking a copy of the whole frame.
+    """
+    df = df[df['payout_date'].notna()].sort_values('payout_date', kind='stable')
+    index = {
+        'dates': df['payout_date'].to_numpy(),
+        'amount': df['amount'].fillna(0).to_numpy(dtype=float),
+    }
+    for col in FILTER_COLUMNS:
+        codes, labels = pd.factorize(df[col], sort=True)
+        index[col] = (codes, pd.Index(labels))
+    return index
+
+
+def _allowed_codes(labels, selected):
+    """Lookup table for codes[...] -> selected?, with a trailing False for missing (-1) codes."""
+    allowed = np.zeros(len(labels) + 1, dtype=bool)
+    found = labels.get_indexer(selected)
+    allowed[found[found >= 0]] = True
+    return allowed
+
+def warm_up():
+    """Build the index ahead of the first request."""
+    derived('total_amount_index', build_payout_index, COMPLETED_PAYOUTS)
 
 def create_dash_total_amount(server):
     # url = "https://wacsg2025-my.sharepoint.com/:x:/p/trisha_teo/EfFwqNRlqjdKgUnvBWe53SEBKKJA9yK7RomjADmwfuT6iQ?download=1"
@@ -12,187 +45,184 @@ def create_dash_total_amount(server):
     # csv_data = response.content.decode('utf-8')
     # df = pd.read_csv(StringIO(csv_data))
 
-    df = load_csv_data()
-
-    df = df[df['approval_stage'] == 'completed']
-
-    df['payout_date'] = pd.to_datetime(df['payout_date'])
-
     app = Dash(__name__, server=server, routes_pathname_prefix='/appTotalAmount/')
     app.title = "GovWallet Payout Amount Tracker"
 
-    min_date = df['payout_date'].min().date()
-    max_date = df['payout_date'].max().date()
-
-    app.layout = html.Div([
-
-        # Header (kept white for contrast)
-        html.Div([
-            html.H1("Total Disbursement Dashboard (by role/campaign)", 
-                    style={
-                        'margin': '0',
-                        'fontSize': '24px',
-                        'fontWeight': '600',
-                        'color': '#1f2937'
-                    })
-        ], style={
-            'padding': '20px 40px',
-            'backgroundColor': '#ffffff',
-            'borderBottom': '1px solid #e5e7eb'
-        }),
-
-        # Component 1: Select Date (background #E6E8EC)
-        html.Div([
-            html.Div([
-                html.Div([
-                    html.H2("Select Date Mode", style={'fontSize': '16px', 'color': '#374151'}),
-                    dcc.RadioItems(
-                        id='date-mode',
-                        options=[
-                            {'label': 'Single Date', 'value': 'single'},
-                            {'label': 'Date Range', 'value': 'range'}
-                        ],
-                        value='range',
-                        labelStyle={'display': 'inline-block', 'marginRight': '15px', 'fontSize': '14px', 'color': '#4b4b7d'},
-                        style={'marginBottom': '10px'}
-                    ),
-                    html.Div([
-                        dcc.DatePickerSingle(
-                            id='single-date-picker',
-                            min_date_allowed=min_date,
-                            max_date_allowed=max_date,
-                            placeholder='Select a date',
-                            display_format='YYYY-MM-DD',
-                            with_portal=True
-                        )
-                    ], id='single-date-container', style={'display': 'none'}),
-                    html.Div([
-                        dcc.DatePickerRange(
-                            id='range-date-picker',
-                            min_date_allowed=min_date,
-                            max_date_allowed=max_date,
-                            start_date=min_date,
-                            end_date=max_date,
-                            display_format='YYYY-MM-DD',
-                            with_portal=True
-                        )
-                    ], id='range-date-container', style={'display': 'block'})
-                ], style={'flex': '1'}),
-            ], style={'display': 'flex', 'padding': '30px 40px'})
-        ], style={
-            'display': 'flex',
-            'justifyContent': 'flex-start',
-            'alignItems': 'flex-start',
-            'marginBottom': '20px',
-            'padding': '0 20px'
-        }),
-
-        # Component 2: Overview + Sort + View Payout + Graph (background #E6E8EC)
-        html.Div([
+    def serve_layout():
+        df = load_completed_payouts()
+        min_date = df['payout_date'].min().date()
+        max_date = df['payout_date'].max().date()
+        return html.Div([
 
-            # Disbursement Overview heading
+            # Header (kept white for contrast)
             html.Div([
-                html.H2("Total Disbursement Overview", 
-                    style={
-                        'textAlign': 'center',
-                        'fontSize': '20px',
-                        'fontWeight': '600',
-                        'color': '#1f2937',
-                        'marginBottom': '10px',        # smaller margin below text
-                        'paddingBottom': '10px',       # space below text before line
-                        'borderBottom': '1px solid #ffffff',  # thicker white line
-                        'marginLeft': 'auto',
-                        'marginRight': 'auto'
-                    })
-            ]),
-
-            # Sorting, grouping, and filters
+                html.H1("Total Disbursement Dashboard (by role/campaign)", 
+                        style={
+                            'margin': '0',
+                            'fontSize': '24px',
+                            'fontWeight': '600',
+                            'color': '#1f2937'
+                        })
+            ], style={
+                'padding': '20px 40px',
+                'backgroundColor': '#ffffff',
+                'borderBottom': '1px solid #e5e7eb'
+            }),
+
+            # Component 1: Select Date (background #E6E8EC)
             html.Div([
                 html.Div([
-
-                    # Sort by amount
                     html.Div([
-                        html.H2("Sort by Amount", style={'fontSize': '16px', 'color': '#374151'}),
+                        html.H2("Select Date Mode", style={'fontSize': '16px', 'color': '#374151'}),
                         dcc.RadioItems(
-                            id='sort-order',
+                            id='date-mode',
                             options=[
-                                {'label': 'Ascending', 'value': 'asc'},
-                                {'label': 'Descending', 'value': 'desc'},
+                                {'label': 'Single Date', 'value': 'single'},
+                                {'label': 'Date Range', 'value': 'range'}
                             ],
-                            value='desc',
-                            labelStyle={'display': 'block', 'marginBottom': '8px', 'fontSize': '14px', 'color': '#4b4b7d'}
-                        )
-                    ], style={'minWidth': '180px', 'marginRight': '20px'}),
-
-                    # View payout by
-                    html.Div([
-                        html.H2("View Payouts By", style={'fontSize': '16px', 'color': '#374151'}),
-                        dcc.Dropdown(
-                            id='group-by-selector',
-                            options=[
-                                {'label': 'Role', 'value': 'gms_role_name'},
-                                {'label': 'Campaign', 'value': 'registration_location_id'}
-                            ],
-                            value='gms_role_name',
-                            clearable=False,
-                            style={'width': '200px', 'fontSize': '14px'}
+                            value='range',
+                            labelStyle={'display': 'inline-block', 'marginRight': '15px', 'fontSize': '14px', 'color': '#4b4b7d'},
+                            style={'marginBottom': '10px'}
                         ),
-                    ], style={'marginRight': '20px'}),
+                        html.Div([
+                            dcc.DatePickerSingle(
+                                id='single-date-picker',
+                                min_date_allowed=min_date,
+                                max_date_allowed=max_date,
+                                placeholder='Select a date',
+                                display_format='YYYY-MM-DD',
+                                with_portal=True
+                            )
+                        ], id='single-date-container', style={'display': 'none'}),
+                        html.Div([
+                            dcc.DatePickerRange(
+                                id='range-date-picker',
+                                min_date_allowed=min_date,
+                                max_date_allowed=max_date,
+                                start_date=min_date,
+                                end_date=max_date,
+                                display_format='YYYY-MM-DD',
+                                with_portal=True
+                            )
+                        ], id='range-date-container', style={'display': 'block'})
+                    ], style={'flex': '1'}),
+                ], style={'display': 'flex', 'padding': '30px 40px'})
+            ], style={
+                'display': 'flex',
+                'justifyContent': 'flex-start',
+                'alignItems': 'flex-start',
+                'marginBottom': '20px',
+                'padding': '0 20px'
+            }),
+
+            # Component 2: Overview + Sort + View Payout + Graph (background #E6E8EC)
+            html.Div([
 
-                    # Role filter
-                    html.Div([
-                        html.H2("Role Filter", style={'fontSize': '16px', 'color': '#374151'}),
-                        dcc.Dropdown(
-                            id='role-filter',
-                            options=[{'label': role, 'value': role} for role in sorted(df['gms_role_name'].dropna().unique())],
-                            multi=True,
-                            placeholder="Select roles...",
-                            style={'width': '220px', 'fontSize': '14px'}
-                        )
-                    ], style={'marginRight': '20px'}),
-
-                    # Campaign filter
+                # Disbursement Overview heading
+                html.Div([
+                    html.H2("Total Disbursement Overview", 
+                        style={
+                            'textAlign': 'center',
+                            'fontSize': '20px',
+                            'fontWeight': '600',
+                            'color': '#1f2937',
+                            'marginBottom': '10px',        # smaller margin below text
+                            'paddingBottom': '10px',       # space below text before line
+                            'borderBottom': '1px solid #ffffff',  # thicker white line
+                            'marginLeft': 'auto',
+                            'marginRight': 'auto'
+                        })
+                ]),
+
+                # Sorting, grouping, and filters
+                html.Div([
                     html.Div([
-                        html.H2("Campaign Filter", style={'fontSize': '16px', 'color': '#374151'}),
-                        dcc.Dropdown(
-                            id='campaign-filter',
-                            options=[{'label': camp, 'value': camp} for camp in sorted(df['registration_location_id'].dropna().unique())],
-                            multi=True,
-                            placeholder="Select campaigns...",
-                            style={'width': '220px', 'fontSize': '14px'}
-                        )
-                    ])
-
-                ], style={
-                    'display': 'flex',
-                    'flexWrap': 'wrap',
-                    'alignItems': 'flex-start',
-                    'gap': '20px',
-                    'justifyContent': 'center',
-                    'margin': '0 auto',
-                    'maxWidth': '1000px'
-                })
-            ], style={'paddingBottom': '30px'}),
-
-
-            # Graph
-            html.Div([
-                dcc.Graph(id='payout-bar-chart', config={'displayModeBar': False})
-            ], style={'backgroundColor': '#ffffff', 'padding': '10px', 'borderRadius': '8px'}),
+
+                        # Sort by amount
+                        html.Div([
+                            html.H2("Sort by Amount", style={'fontSize': '16px', 'color': '#374151'}),
+                            dcc.RadioItems(
+                                id='sort-order',
+                                options=[
+                                    {'label': 'Ascending', 'value': 'asc'},
+                                    {'label': 'Descending', 'value': 'desc'},
+                                ],
+                                value='desc',
+                                labelStyle={'display': 'block', 'marginBottom': '8px', 'fontSize': '14px', 'color': '#4b4b7d'}
+                            )
+                        ], style={'minWidth': '180px', 'marginRight': '20px'}),
+
+                        # View payout by
+                        html.Div([
+                            html.H2("View Payouts By", style={'fontSize': '16px', 'color': '#374151'}),
+                            dcc.Dropdown(
+                                id='group-by-selector',
+                                options=[
+                                    {'label': 'Role', 'value': 'gms_role_name'},
+                                    {'label': 'Campaign', 'value': 'registration_location_id'}
+                                ],
+                                value='gms_role_name',
+                                clearable=False,
+                                style={'width': '200px', 'fontSize': '14px'}
+                            ),
+                        ], style={'marginRight': '20px'}),
+
+                        # Role filter
+                        html.Div([
+                            html.H2("Role Filter", style={'fontSize': '16px', 'color': '#374151'}),
+                            dcc.Dropdown(
+                                id='role-filter',
+                                options=[{'label': role, 'value': role} for role in sorted(df['gms_role_name'].dropna().unique())],
+                                multi=True,
+                                placeholder="Select roles...",
+                                style={'width': '220px', 'fontSize': '14px'}
+                            )
+                        ], style={'marginRight': '20px'}),
+
+                        # Campaign filter
+                        html.Div([
+                            html.H2("Campaign Filter", style={'fontSize': '16px', 'color': '#374151'}),
+                            dcc.Dropdown(
+                                id='campaign-filter',
+                                options=[{'label': camp, 'value': camp} for camp in sorted(df['registration_location_id'].dropna().unique())],
+                                multi=True,
+                                placeholder="Select campaigns...",
+                                style={'width': '220px', 'fontSize': '14px'}
+                            )
+                        ])
+
+                    ], style={
+                        'display': 'flex',
+                        'flexWrap': 'wrap',
+                        'alignItems': 'flex-start',
+                        'gap': '20px',
+                        'justifyContent': 'center',
+                        'margin': '0 auto',
+                        'maxWidth': '1000px'
+                    })
+                ], style={'paddingBottom': '30px'}),
+
+
+                # Graph
+                html.Div([
+                    dcc.Graph(id='payout-bar-chart', config={'displayModeBar': False})
+                ], style={'backgroundColor': '#ffffff', 'padding': '10px', 'borderRadius': '8px'}),
+
+            ], style={
+                'backgroundColor': '#E6E8EC',
+                'margin': '20px',
+                'borderRadius': '12px',
+                'padding': '30px 40px 40px 40px'
+            }),
 
         ], style={
-            'backgroundColor': '#E6E8EC',
-            'margin': '20px',
-            'borderRadius': '12px',
-            'padding': '30px 40px 40px 40px'
-        }),
+            'backgroundColor': '#f9fafb',
+            'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif',
+            'minHeight': '100vh',
+            'paddingBottom': '40px'
+        })
 
-    ], style={
-        'backgroundColor': '#f9fafb',
-        'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif',
-        'minHeight': '100vh',
-        'paddingBottom': '40px'
-    })
+    app.layout = serve_layout
 
 
 
@@ -243,13 +273,16 @@ def create_dash_total_amount(server):
         Input('sort-order', 'value'),
 
     )
+    @timed_callback('appTotalAmount.update_chart')
     def update_chart(mode, single_date, start_date, end_date, group_by, selected_roles, selected_campaigns, sort_order):
-        filtered = df.copy()
+        index = derived('total_amount_index', build_payout_index, COMPLETED_PAYOUTS)
+        dates = index['dates']
 
-        # Handle filtering by date
+        # Handle filtering by date: a contiguous run of the sorted rows
         if mode == 'single' and single_date:
             selected = pd.to_datetime(single_date)
-            filtered = filtered[filtered['payout_date'] == selected]
+            rows = slice(dates.searchsorted(np.datetime64(selected), 'left'),
+                         dates.searchsorted(np.datetime64(selected), 'right'))
 
             if group_by == 'gms_role_name':
                 title = f"Total amount paid by each role on {selected.date()}"
@@ -261,7 +294,8 @@ def create_dash_total_amount(server):
         elif mode == 'range' and start_date and end_date:
             start = pd.to_datetime(start_date)
             end = pd.to_datetime(end_date)
-            filtered = filtered[(filtered['payout_date'] >= start) & (filtered['payout_date'] <= end)]
+            rows = slice(dates.searchsorted(np.datetime64(start), 'left'),
+                         dates.searchsorted(np.datetime64(end), 'right'))
 
             if group_by == 'gms_role_name':
                 title = f"Total amount paid by each role from {start.date()} to {end.date()}"
@@ -272,22 +306,33 @@ def create_dash_total_amount(server):
         else:
             return px.bar(title="Please select a valid date.")
 
-        # Apply Role filter
-        if selected_roles:
-            filtered = filtered[filtered['gms_role_name'].isin(selected_roles)]
-
-        # Apply Campaign filter
-        if selected_campaigns:
-            filtered = filtered[filtered['registration_location_id'].isin(selected_campaigns)]
-
-        if filtered.empty:
+        group_codes, labels = index[group_by]
+        group_codes = group_codes[rows]
+        amounts = index['amount'][rows]
+
+        # Apply Role and Campaign filters on the codes of the rows in range
+        keep = None
+        for col, selected in (('gms_role_name', selected_roles), ('registration_location_id', selected_campaigns)):
+            if selected:
+                codes, col_labels = index[col]
+                matches = _allowed_codes(col_labels, selected)[codes[rows]]
+                keep = matches if keep is None else keep & matches
+        if keep is not None:
+            group_codes = group_codes[keep]
+            amounts = amounts[keep]
+
+        if not len(group_codes):
             return px.bar(title="No data available for the selected filters.")
 
-        grouped = (
-            filtered.groupby(group_by)['amount']
-            .sum().reset_index()
-            .rename(columns={'amount': 'total_paid'})
-        )
+        # Sum per group; rows without a role/campaign are left out like groupby does
+        has_group = group_codes >= 0
+        counts = np.bincount(group_codes[has_group], minlength=len(labels))
+        totals = np.bincount(group_codes[has_group], weights=amounts[has_group], minlength=len(labels))
+        present = counts > 0
+        grouped = pd.DataFrame({
+            group_by: np.asarray(labels[present].astype(str)),
+            'total_paid': totals[present],
+        })
 
         # Sort grouped data by total_paid
         ascending = True if sort_order == 'asc' else False
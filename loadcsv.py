@@ -1,33 +1,381 @@
 import time
+import hashlib
+import threading
 import requests
 import pandas as pd
 from io import StringIO
+import snapshots
 
-_csv_cache = {'data': None, 'last_updated': 0}
+# How stale the data may get: main.py's auto-refresh thread fetches every
+# source this often, while requests keep serving what is already loaded
 TTL_SECONDS = 300  # 5 minutes
 
+# Seconds to wait for SharePoint to connect, then between bytes of the
+# download, so a stalled request fails instead of holding a worker
+REQUEST_TIMEOUT = (10, 60)
+
 DATA_URL = "https://wacsg2025-my.sharepoint.com/:x:/p/pek_yi_liang/EYByP1ybOBxKlPl6wpPGcg4BOSo4C13dvOvKIGZxX8rU1Q?e=jnocXy&download=1"
 
+# Columns typed once at load time so the dashboards don't each re-parse them
+DATE_COLUMNS = ('payout_date',)
+# Exported as UTC timestamps; kept in local time so .dt.date gives the Singapore calendar day
+UTC_DATE_COLUMNS = ('date_created',)
+LOCAL_TIMEZONE = 'Asia/Singapore'
+CATEGORY_COLUMNS = ('gms_role_name', 'registration_location_id', 'approval_stage')
+ID_COLUMNS = ('id', 'gms_id')
+
+# Allowance rows are unique on this column; re-exported rows replace older copies
+KEY_COLUMN = 'id'
+
+# Cache fields saved with a snapshot so a restored frame can be revalidated and appended to
+FINGERPRINT_FIELDS = ('etag', 'last_modified', 'content_hash', 'raw_length')
+
+
+def prepare_frame(df):
+    """Parse dates, categoricals and integer ids in one pass over a freshly read CSV."""
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    for col in UTC_DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], utc=True, errors='coerce').dt.tz_convert(LOCAL_TIMEZONE)
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    for col in ID_COLUMNS:
+        # Only ids that are whole numbers with no gaps; anything else keeps its dtype
+        if col in df.columns and pd.api.types.is_numeric_dtype(df[col]) \
+                and df[col].notna().all() and (df[col] % 1 == 0).all():
+            df[col] = pd.to_numeric(df[col].astype('int64'), downcast='integer')
+    return df
+
+
+def read_csv_text(csv_data):
+    return prepare_frame(pd.read_csv(StringIO(csv_data)))
+
+
+def fill_category(series, value):
+    """fillna() for a categorical column, adding the fill value as a category if needed."""
+    if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+        # Keep categories sorted so groupby output orders the same as plain strings
+        series = series.cat.set_categories(sorted([*series.cat.categories, value]))
+    return series.fillna(value)
+
+
+def concat_frames(base, tail):
+    """Append tail to base, keeping shared categorical columns categorical."""
+    base = base.copy(deep=False)
+    tail = tail.copy(deep=False)
+    for col in CATEGORY_COLUMNS:
+        if col in base.columns and col in tail.columns \
+                and isinstance(base[col].dtype, pd.CategoricalDtype) \
+                and isinstance(tail[col].dtype, pd.CategoricalDtype):
+            categories = base[col].cat.categories.union(tail[col].cat.categories)
+            base[col] = base[col].cat.set_categories(categories)
+            tail[col] = tail[col].cat.set_categories(categories)
+    return pd.concat([base, tail], ignore_index=True)
+
+
+class VersionedSource:
+    """
+    A downloaded source kept in memory as one DataFrame. Subclasses supply
+    refresh(), which fetches and parses the source and hands the frame to
+    _publish().
+
+    Every change bumps the version. Dashboards read their data through
+    derived(), which rebuilds each artifact at most once per version, so a
+    background refresh reaches callbacks without restarting the app.
+
+    With a snapshot name, each parsed frame is also saved to disk. A new
+    process starts from that snapshot and revalidates it in the background,
+    workers that don't refresh follow the snapshot the refresher writes,
+    and a failed refresh keeps serving the data already loaded.
+
+    Requests only fetch when nothing is loaded yet; later refreshes come
+    from the background thread that calls refresh().
+    """
+
+    # Cache fields saved with a snapshot so a restored frame can be revalidated
+    fingerprint_fields = ('etag', 'last_modified', 'content_hash')
+
+    def __init__(self, url, name, snapshot=None):
+        self.url = url
+        self.name = name
+        self.snapshot = snapshot
+        self._watcher = snapshots.SnapshotWatcher(snapshot) if snapshot else None
+        self.cache = {'data': None, 'last_updated': 0, 'version': 0}
+        self.cache.update(dict.fromkeys(self.fingerprint_fields))
+        # (version, frame) swapped as one object so readers never see a mix
+        self._current = (0, None)
+        self._derived = {}
+        self._lock = threading.RLock()
+        # One lock per derived key, so a slow build only holds up callers of that artifact
+        self._derived_locks = {}
+        self._derived_locks_lock = threading.Lock()
+
+    def load(self):
+        return self.current()[1]
+
+    def current(self):
+        """Return (version, frame), fetching first if nothing is loaded yet."""
+        if self.snapshot and not snapshots.is_refresher():
+            # Another worker downloads; attach to the snapshot it last wrote
+            self._follow_snapshot()
+            if self.cache['data'] is not None:
+                return self._current
+        if self.cache['data'] is None:
+            with self._lock:
+                if self.cache['data'] is None:
+                    if self.snapshot and self._restore_snapshot():
+                        snapshots.revalidate_in_background(self.snapshot, self.refresh)
+                    else:
+                        print(f"Fetching {self.name} from source...")
+                        self.refresh()
+        return self._current
+
+    def derived(self, key, builder, base=None):
+        """
+        Return builder(frame) for the current version, building it only when
+        the data has changed since the artifact was last built.
+
+        With base=(base_key, base_builder), builder gets that artifact of the
+        same version instead of the frame, so artifacts built on top of
+        another one never mix versions.
+        """
+        version, data = self.current()
+        if base is not None:
+            data = self._derived_at(version, data, *base)
+        return self._derived_at(version, data, key, builder)
+
+    def _derived_at(self, version, data, key, builder):
+        entry = self._derived.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        with self._derived_lock(key):
+            entry = self._derived.get(key)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+            print(f"Building {key} for {self.name} version {version}")
+            value = builder(data.copy(deep=False) if isinstance(data, pd.DataFrame) else data)
+            # A caller still on an older version never replaces a newer artifact
+            if entry is None or entry[0] < version:
+                self._derived[key] = (version, value)
+            return value
+
+    def _derived_lock(self, key):
+        with self._derived_locks_lock:
+            lock = self._derived_locks.get(key)
+            if lock is None:
+                lock = self._derived_locks[key] = threading.Lock()
+            return lock
+
+    def refresh(self):
+        """Fetch the source and publish it if it changed. Returns True if it did."""
+        raise NotImplementedError
+
+    def fingerprint(self):
+        fingerprint = {key: self.cache[key] for key in self.fingerprint_fields}
+        fingerprint['url'] = self.url
+        return fingerprint
+
+    def restore_frame(self, df):
+        """Undo anything the snapshot format changed about a frame; returns the frame to publish."""
+        return df
+
+    def _save_snapshot(self, df):
+        # Only the refresher writes; a follower that refreshed (say through /refresh-cache) keeps its copy to itself
+        if self.snapshot and snapshots.is_refresher():
+            snapshots.save(self.snapshot, df, self.fingerprint())
+
+    def _restore_snapshot(self):
+        """Load the saved snapshot into an empty cache. Returns True if it did."""
+        with self._lock:
+            if self.cache['data'] is not None:
+                return False
+            restored = self._watcher.load()
+            return restored is not None and self._apply_snapshot(*restored)
+
+    def _follow_snapshot(self):
+        """Pick up a snapshot the refresher process has written since we last looked."""
+        restored = self._watcher.poll()
+        if restored is None:
+            return
+        with self._lock:
+            df, fingerprint = restored
+            if self.cache['data'] is None or fingerprint.get('content_hash') != self.cache['content_hash']:
+                self._apply_snapshot(df, fingerprint)
+
+    def _apply_snapshot(self, df, fingerprint):
+        if fingerprint.get('url') != self.url:
+            return False
+        for key in self.fingerprint_fields:
+            self.cache[key] = fingerprint.get(key)
+        self._publish(self.restore_frame(df))
+        # Served as fresh until the background revalidation says otherwise
+        self.cache['last_updated'] = time.time()
+        return True
+
+    def _publish(self, df):
+        version = self.cache['version'] + 1
+        self._current = (version, df)
+        self.cache['data'] = df
+        self.cache['version'] = version
+
+
+class CsvSource(VersionedSource):
+    """
+    A SharePoint CSV export kept in memory as one typed DataFrame.
+
+    Refreshes are incremental: an unchanged export (by ETag, Last-Modified or
+    content hash) is not parsed at all, and an export that only grew has just
+    its new tail parsed and merged in on the key column.
+    """
+
+    fingerprint_fields = FINGERPRINT_FIELDS
+
+    def __init__(self, url, key_column=KEY_COLUMN, snapshot=None):
+        super().__init__(url, 'CSV data', snapshot=snapshot)
+        self.key_column = key_column
+        self.cache['raw_length'] = 0
+
+    def restore_frame(self, df):
+        # Snapshots written before the columns were kept in local time hold them as UTC
+        for col in UTC_DATE_COLUMNS:
+            if col in df.columns and isinstance(df[col].dtype, pd.DatetimeTZDtype):
+                df[col] = df[col].dt.tz_convert(LOCAL_TIMEZONE)
+        return df
+
+    def refresh(self):
+        """Fetch the export and update the cache. Returns True if the data changed."""
+        with self._lock:
+            cache = self.cache
+            headers = {}
+            if cache['data'] is not None:
+                if cache['etag']:
+                    headers['If-None-Match'] = cache['etag']
+                if cache['last_modified']:
+                    headers['If-Modified-Since'] = cache['last_modified']
+
+            response = requests.get(self.url, headers=headers, timeout=REQUEST_TIMEOUT)
+            if response.status_code == 304:
+                print("CSV not modified, skipping parse")
+                cache['last_updated'] = time.time()
+                return False
+            response.raise_for_status()
+
+            content = response.content
+            content_hash = hashlib.sha1(content).hexdigest()
+            cache['etag'] = response.headers.get('ETag')
+            cache['last_modified'] = response.headers.get('Last-Modified')
+
+            if content_hash == cache['content_hash']:
+                print("CSV content unchanged, skipping parse")
+                cache['last_updated'] = time.time()
+                return False
+
+            df = self._merge_appended(content)
+            if df is None:
+                df = read_csv_text(content.decode('utf-8'))
+
+            self._publish(df)
+            cache['content_hash'] = content_hash
+            cache['raw_length'] = len(content)
+            cache['last_updated'] = time.time()
+            self._save_snapshot(df)
+            return True
+
+    def _merge_appended(self, content):
+        """
+        Parse only the rows appended since the last load, or return None if the
+        export was rewritten and needs a full parse.
+        """
+        cache = self.cache
+        base = cache['data']
+        length = cache['raw_length']
+        if base is None or not length or len(content) <= length:
+            return None
+        # The previous export must be a byte-for-byte prefix ending on a line boundary
+        if content[length - 1:length] != b'\n':
+            return None
+        if hashlib.sha1(content[:length]).hexdigest() != cache['content_hash']:
+            return None
+
+        header = content[:content.index(b'\n') + 1]
+        tail = read_csv_text((header + content[length:]).decode('utf-8'))
+        if tail.empty:
+            return base
+
+        if self.key_column in base.columns:
+            base = base[~base[self.key_column].isin(tail[self.key_column])]
+        print(f"Merged {len(tail)} appended CSV rows")
+        return concat_frames(base, tail)
+
+
+class CombinedSource(VersionedSource):
+    """
+    A frame built by combine(*frames) from other sources, published again
+    whenever any of them has a new version. Fetching and snapshots are left
+    to those sources.
+    """
+
+    def __init__(self, sources, combine, name):
+        super().__init__(None, name)
+        self.sources = sources
+        self.combine = combine
+        self.cache['parts'] = None
+
+    def current(self):
+        parts = [source.current() for source in self.sources]
+        versions = tuple(version for version, _ in parts)
+        if versions != self.cache['parts']:
+            with self._lock:
+                if versions != self.cache['parts']:
+                    self._publish(self.combine(*[frame for _, frame in parts]))
+                    self.cache['parts'] = versions
+        return self._current
+
+    def refresh(self):
+        changed = [source.refresh() for source in self.sources]
+        return any(changed)
+
+
+_source = CsvSource(DATA_URL, snapshot='allowance_history')
+_csv_cache = _source.cache
+
+
 def load_csv_data():
-    now = time.time()
-    if _csv_cache['data'] is None or (now - _csv_cache['last_updated']) > TTL_SECONDS:
-        print("Fetching CSV data from source...")
-        response = requests.get(DATA_URL)
-        response.raise_for_status()
-        csv_data = response.content.decode('utf-8')
-        df = pd.read_csv(StringIO(csv_data))
-        _csv_cache['data'] = df
-        _csv_cache['last_updated'] = now
-    return _csv_cache['data'].copy()
+    """
+    Return a read-only view of the shared allowance history.
+
+    Every dashboard shares the same underlying columns; replacing a column on the
+    returned frame is fine, but never modify its values in place.
+    """
+    return _source.load().copy(deep=False)
+
+def get_version():
+    return _source.current()[0]
+
+def get_source():
+    """The allowance history source itself, for loaders that combine it with their own data."""
+    return _source
+
+def derived(key, builder, base=None):
+    """Per-version artifact built from the allowance history, see VersionedSource.derived."""
+    return _source.derived(key, builder, base)
+
+def _completed(df):
+    return df[df['approval_stage'] == 'completed']
+
+# derived() base for the amount dashboards' artifacts, which are built from completed payouts
+COMPLETED_PAYOUTS = ('completed_payouts', _completed)
+
+def load_completed_payouts():
+    """Completed payouts only, shared by the amount dashboards. Treat as read-only."""
+    return derived(*COMPLETED_PAYOUTS)
 
 def force_refresh():
     print("Force refreshing CSV cache...")
-    response = requests.get(DATA_URL)
-    response.raise_for_status()
-    csv_data = response.content.decode('utf-8')
-    df = pd.read_csv(StringIO(csv_data))
-    _csv_cache['data'] = df
-    _csv_cache['last_updated'] = time.time()
+    _source.refresh()
 
 
 
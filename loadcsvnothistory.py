@@ -1,33 +1,22 @@
-import time
-import requests
-import pandas as pd
-from io import StringIO
-
-_csv_cache = {'data': None, 'last_updated': 0}
-TTL_SECONDS = 300  # 5 minutes
+from loadcsv import CsvSource
 
 DATA_URL = "https://wacsg2025-my.sharepoint.com/:x:/p/trisha_teo/EftufRFuKvdLrefxkhhC6Q4B-5ECHpYZsHeynMGxb70CRQ?download=1"
 
+_source = CsvSource(DATA_URL, snapshot='allowance')
+_csv_cache = _source.cache
+
 def load_csv_data_not_history():
-    now = time.time()
-    if _csv_cache['data'] is None or (now - _csv_cache['last_updated']) > TTL_SECONDS:
-        print("Fetching CSV data from source...")
-        response = requests.get(DATA_URL)
-        response.raise_for_status()
-        csv_data = response.content.decode('utf-8')
-        df = pd.read_csv(StringIO(csv_data))
-        _csv_cache['data'] = df
-        _csv_cache['last_updated'] = now
-    return _csv_cache['data'].copy()
+    return _source.load().copy(deep=False)
+
+def get_version():
+    return _source.current()[0]
+
+def derived(key, builder):
+    return _source.derived(key, builder)
 
 def force_refresh():
     print("Force refreshing CSV cache...")
-    response = requests.get(DATA_URL)
-    response.raise_for_status()
-    csv_data = response.content.decode('utf-8')
-    df = pd.read_csv(StringIO(csv_data))
-    _csv_cache['data'] = df
-    _csv_cache['last_updated'] = time.time()
+    _source.refresh()
 
 
 
@@ -0,0 +1,172 @@
+import io
+import zipfile
+import hashlib
+import requests
+import msoffcrypto
+import numpy as np
+import pandas as pd
+import xlsx_reader
+from loadcsv import VersionedSource, REQUEST_TIMEOUT
+
+ENTRIES_URL = "https://wacsg2025-my.sharepoint.com/:x:/p/pek_yi_liang/EdM0Y1fy_6lNkJR7fAAdx5gBNxzzLUAt3eVIz3bqxqVrpg?e=hrReix&download=1"
+ENTRIES_PASSWORD = "wacsg2025"
+SNAPSHOT_NAME = 'entries'
+SHEET_NAME = "Sheet1"
+
+# The only workbook columns prepare_entries and the dashboard use
+ENTRIES_COLUMNS = ['When', 'Who', 'Where', 'Category', 'Given Name', 'Family Name']
+
+
+def decrypt_entries_workbook(content):
+    office_file = msoffcrypto.OfficeFile(io.BytesIO(content))
+    office_file.load_key(password=ENTRIES_PASSWORD)
+    decrypted = io.BytesIO()
+    office_file.decrypt(decrypted)
+    return decrypted
+
+
+def read_entries_workbook(content):
+    """
+    Decrypt the password-protected entries workbook and read ENTRIES_COLUMNS
+    from its first sheet, streaming the sheet XML instead of loading every
+    cell through openpyxl.
+    """
+    decrypted = decrypt_entries_workbook(content)
+    try:
+        return xlsx_reader.read_columns(decrypted, SHEET_NAME, ENTRIES_COLUMNS)
+    except (KeyError, ValueError, zipfile.BadZipFile) as e:
+        # Unusual workbook layout; let pandas have a go (and raise if it can't)
+        print("Streaming read of entries workbook failed, using read_excel:", e)
+        decrypted.seek(0)
+        return pd.read_excel(decrypted, sheet_name=SHEET_NAME, usecols=ENTRIES_COLUMNS)
+
+
+def prepare_entries(df):
+    # Convert When column to datetime with explicit format handling
+    df['When'] = pd.to_datetime(df['When'], format='mixed', errors='coerce')
+    df['date'] = df['When'].dt.date
+
+    # Extract first and last names from the Who column
+    # Assuming the Who column contains names that can be split
+    df['Who'] = df['Who'].astype(str).str.split()
+    df['first_name'] = df['Given Name']
+    df['last_name'] = df['Family Name']
+    df['full_name'] = df['first_name'] + ' ' + df['last_name']
+    df['full_name'] = df['full_name'].str.strip().str.upper()
+    df['Where'] = df['Where'].fillna("Unknown")
+    df['Category'] = df['Category'].fillna("Unknown")
+    # Venue is the part of the location before the first '_' (AQC_Gate1 -> AQC)
+    df['VenuePrefix'] = df['Where'].str.split('_').str[0]
+    return df
+
+
+def row_hashes(raw):
+    return pd.util.hash_pandas_object(raw, index=False).to_numpy()
+
+
+def prepare_changed_rows(raw, hashes, previous, previous_hashes):
+    """
+    prepare_entries(raw), reusing the prepared row of the previous version for
+    every raw row that is unchanged, so a refresh after a few more scans only
+    parses the new rows.
+    """
+    if previous is None or previous_hashes is None:
+        return prepare_entries(raw)
+
+    # Position of each raw row in the previous version, or -1 if it is new or edited
+    first = ~pd.Index(previous_hashes).duplicated()
+    matches = pd.Index(previous_hashes[first]).get_indexer(hashes)
+    reused = matches >= 0
+    if not reused.any():
+        return prepare_entries(raw)
+
+    kept = previous.iloc[np.flatnonzero(first)[matches[reused]]]
+    kept.index = np.flatnonzero(reused)
+    print(f"Preparing {len(raw) - reused.sum()} new or changed entries rows, reusing {reused.sum()}")
+    if reused.all():
+        return kept.reset_index(drop=True)
+    fresh = prepare_entries(raw[~reused].copy())
+    return pd.concat([kept, fresh]).sort_index().reset_index(drop=True)
+
+
+class EntriesSource(VersionedSource):
+    """
+    The attendance workbook as one prepared frame. Unchanged downloads (by
+    ETag or content hash) are not decrypted, and a changed workbook only
+    prepares the rows that are new or edited since the last version.
+    """
+
+    def __init__(self):
+        super().__init__(ENTRIES_URL, 'entries workbook', snapshot=SNAPSHOT_NAME)
+        # Hash of each raw workbook row behind data, to reuse its prepared rows on refresh
+        self.cache['row_hashes'] = None
+
+    def download(self):
+        """The download response, or None if the server says the workbook is unchanged since the last one."""
+        headers = {}
+        if self.cache['data'] is not None:
+            if self.cache['etag']:
+                headers['If-None-Match'] = self.cache['etag']
+            if self.cache['last_modified']:
+                headers['If-Modified-Since'] = self.cache['last_modified']
+        response = requests.get(self.url, headers=headers, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        return response
+
+    def refresh(self):
+        with self._lock:
+            cache = self.cache
+            response = self.download()
+            if response is None:
+                print("Entries workbook not modified, skipping parse")
+                return False
+            content = response.content
+            content_hash = hashlib.sha1(content).hexdigest()
+            # Validators are only remembered once the workbook has been read, so a failed parse is retried
+            validators = {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+            if content_hash == cache['content_hash']:
+                print("Entries workbook unchanged, skipping parse")
+                cache.update(validators)
+                return False
+
+            raw = read_entries_workbook(content)
+            hashes = row_hashes(raw)
+            df = prepare_changed_rows(raw, hashes, cache['data'], cache['row_hashes'])
+            self._publish(df)
+            cache.update(validators, content_hash=content_hash, row_hashes=hashes)
+            self._save_snapshot(df)
+            return True
+
+    def restore_frame(self, df):
+        # Arrow hands list columns back as arrays
+        df['Who'] = df['Who'].map(list)
+        if 'VenuePrefix' not in df.columns:
+            # Snapshot written before the column was added
+            df['VenuePrefix'] = df['Where'].str.split('_').str[0]
+        # Raw rows aren't in the snapshot, so the next change prepares the whole sheet
+        self.cache['row_hashes'] = None
+        return df
+
+
+_source = EntriesSource()
+
+
+def load_entries_data():
+    """Prepared entries frame, downloaded once and shared. Treat as read-only."""
+    return _source.load()
+
+
+def get_version():
+    return _source.current()[0]
+
+
+def derived(key, builder):
+    """Per-version artifact built from the entries frame, see VersionedSource.derived."""
+    return _source.derived(key, builder)
+
+
+def force_refresh():
+    print("Force refreshing entries workbook...")
+    _source.refresh()
@@ -1,22 +1,28 @@
+# Imported first so the startup report covers module imports as well
+import startup
 from flask import Flask, jsonify, request, session, redirect, render_template_string
 from dash import Dash, dcc, html, Input, Output, callback_context
 from importlib.machinery import SourceFileLoader
 from dashManpowerCount import create_dash_number_of_roles
-from dashIndivAmount import create_dash_individual_amount
-from dashTotalAmount import create_dash_total_amount
-from dashDisbursementTrend import create_dash_disbursement_trend
+from dashIndivAmount import create_dash_individual_amount, warm_up as warm_up_individual_amount
+from dashTotalAmount import create_dash_total_amount, warm_up as warm_up_total_amount
+from dashDisbursementTrend import create_dash_disbursement_trend, warm_up as warm_up_disbursement_trend
 from dashRejected import create_dash_rejection_rate
-from dashLocationHeatmap import create_dash_heatmap
+from dashLocationHeatmap import create_dash_heatmap, warm_up as warm_up_heatmap
 from dashCampaignClashes import create_dash_campaign_clashes
 from dashCampaignClashesVenue import create_dash_campaign_clashes_venue
 from dashShiftClashes import create_dash_shift_clashes
 from dashShiftClashesVenue import create_dash_shift_clashes_venue
-from dashPeople import layout_avg, layout_person
+from dashPeople import layout_avg, layout_person, load_volunteer_allowance, force_refresh as force_refresh_volunteer_allowance
 from dashEntries import create_dash_entries
 from callbacks_people import register_callbacks, register_person_callbacks
 import dash_bootstrap_components as dbc
 from urllib.parse import unquote
 import loadcsv
+import loadcsvnothistory
+import loadentries
+import snapshots
+import timings
 import threading
 import time
 from navigation_menu import create_vertical_icon_sidebar, get_nav_css, register_navigation_callbacks
@@ -24,6 +30,8 @@ from dash.dependencies import Input, Output, State
 from werkzeug.security import generate_password_hash, check_password_hash
 from functools import wraps
 
+startup.record("Module imports", time.time() - startup.BOOT_STARTED)
+
 server = Flask(__name__)
 server.secret_key = 'your_super_secret_key_change_this_in_production'  # Change this in production!
 
@@ -44,12 +52,23 @@ def login_required(f):
 
 def auto_refresh_cache():
     while True:
-        time.sleep(300)  # 5 minutes
+        # Requests keep serving the loaded data; this thread is what refreshes it
+        time.sleep(loadcsv.TTL_SECONDS)
+        if not snapshots.is_refresher():
+            # Another worker refreshes and writes the snapshots this one reads
+            continue
         try:
             loadcsv.force_refresh()
+            loadcsvnothistory.force_refresh()
+            force_refresh_volunteer_allowance()
             print("CSV cache auto-refreshed")
         except Exception as e:
             print("Failed to auto-refresh CSV cache:", e)
+        try:
+            # Attendance scans come in all day; re-parsed only if the workbook changed
+            loadentries.force_refresh()
+        except Exception as e:
+            print("Failed to auto-refresh entries workbook:", e)
 
 # Start background thread to refresh cache
 threading.Thread(target=auto_refresh_cache, daemon=True).start()
@@ -96,77 +115,71 @@ def integrate_navigation_into_app(app, app_name):
     original_layout = app.layout
     
     # Create new layout with navigation
-    app.layout = html.Div([
-        # Add the navigation sidebar
-        create_vertical_icon_sidebar(),
-        # Main content area with proper margin class
-        html.Div(
-            original_layout if callable(original_layout) else original_layout,
-            className='main-content',  # This class adds the left margin for the sidebar
-            style={'padding': '20px'}  # Add some padding for better spacing
-        )
-    ])
+    def serve_layout():
+        return html.Div([
+            # Add the navigation sidebar
+            create_vertical_icon_sidebar(),
+            # Main content area with proper margin class
+            html.Div(
+                original_layout() if callable(original_layout) else original_layout,
+                className='main-content',  # This class adds the left margin for the sidebar
+                style={'padding': '20px'}  # Add some padding for better spacing
+            )
+        ])
+
+    # Layout functions are re-run on every page load so refreshed data shows up
+    app.layout = serve_layout if callable(original_layout) else serve_layout()
     
     # Register navigation callbacks
     register_navigation_callbacks(app)
     
     return app
 
+def build_dashboard(factory, app_name):
+    """Create a dashboard on the server with navigation, timing it for the startup report"""
+    with startup.timed(app_name):
+        return integrate_navigation_into_app(factory(server), app_name)
+
+# Fetch the data behind the dashboards all at once, on a background thread so
+# import never waits on retries. Sources with a snapshot restore it from disk
+# and revalidate in the background. Without one, Dash building a dashboard's
+# layout waits for the download already under way, so cold start takes about
+# as long as the slowest source instead of the sum of them.
+startup.prefetch_in_background({
+    "allowance history CSV": loadcsv.load_csv_data,
+    "allowance CSV": loadcsvnothistory.load_csv_data_not_history,
+    # The volunteer pages combine this with the allowance history above
+    "volunteer allowance CSV": load_volunteer_allowance,
+    "entries workbook": loadentries.load_entries_data,
+}, warm_ups={
+    "Individual Amount": warm_up_individual_amount,
+    "Total Amount": warm_up_total_amount,
+    "Disbursement Trend": warm_up_disbursement_trend,
+    "Location Heatmap": warm_up_heatmap,
+})
+
 # Create individual dashboard apps with integrated navigation
-appNumberOfRoles = integrate_navigation_into_app(
-    create_dash_number_of_roles(server), 
-    "Manpower Count"
-)
-
-appMaxAmount = integrate_navigation_into_app(
-    create_dash_individual_amount(server), 
-    "Individual Amount"
-)
-
-appTotalAmount = integrate_navigation_into_app(
-    create_dash_total_amount(server), 
-    "Total Amount"
-)
-
-appDisbursementTrend = integrate_navigation_into_app(
-    create_dash_disbursement_trend(server), 
-    "Disbursement Trend"
-)
-
-appRejectionRate = integrate_navigation_into_app(
-    create_dash_rejection_rate(server), 
-    "Rejection Rate"
-)
-
-appLocationHeatmap = integrate_navigation_into_app(
-    create_dash_heatmap(server), 
-    "Location Heatmap"
-)
-
-appCampaignClashes = integrate_navigation_into_app(
-    create_dash_campaign_clashes(server), 
-    "Campaign Clashes"
-)
-
-appShiftClashes = integrate_navigation_into_app(
-    create_dash_shift_clashes(server), 
-    "Shift Clashes"
-)
-
-appShiftClashesVenue = integrate_navigation_into_app(
-    create_dash_shift_clashes_venue(server),
-    "Shift Clashes (VM)"
-)
-
-appCampaignClashesVenue = integrate_navigation_into_app(
-    create_dash_campaign_clashes_venue(server),
-    "Campaign Clashes (VM)"
-)
-
-appEntries = integrate_navigation_into_app(
-    create_dash_entries(server),
-    "Volunteer Entries"
-)
+appNumberOfRoles = build_dashboard(create_dash_number_of_roles, "Manpower Count")
+
+appMaxAmount = build_dashboard(create_dash_individual_amount, "Individual Amount")
+
+appTotalAmount = build_dashboard(create_dash_total_amount, "Total Amount")
+
+appDisbursementTrend = build_dashboard(create_dash_disbursement_trend, "Disbursement Trend")
+
+appRejectionRate = build_dashboard(create_dash_rejection_rate, "Rejection Rate")
+
+appLocationHeatmap = build_dashboard(create_dash_heatmap, "Location Heatmap")
+
+appCampaignClashes = build_dashboard(create_dash_campaign_clashes, "Campaign Clashes")
+
+appShiftClashes = build_dashboard(create_dash_shift_clashes, "Shift Clashes")
+
+appShiftClashesVenue = build_dashboard(create_dash_shift_clashes_venue, "Shift Clashes (VM)")
+
+appCampaignClashesVenue = build_dashboard(create_dash_campaign_clashes_venue, "Campaign Clashes (VM)")
+
+appEntries = build_dashboard(create_dash_entries, "Volunteer Entries")
 
 # Main app with navigation (app3)
 app3 = Dash(__name__, server=server, url_base_pathname='/app3/', external_stylesheets=[dbc.themes.BOOTSTRAP])
@@ -688,9 +701,25 @@ def require_login():
 def refresh_cache():
     try:
         loadcsv.force_refresh()
+        loadcsvnothistory.force_refresh()
+        force_refresh_volunteer_allowance()
+        loadentries.force_refresh()
         return jsonify({"status": "success", "message": "Cache refreshed"})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@server.route('/startup-report')
+@login_required
+def startup_report():
+    return jsonify(startup.report())
+
+@server.route('/callback-timings')
+@login_required
+def callback_timings():
+    return jsonify(timings.report())
+
+startup.record("Boot total", time.time() - startup.BOOT_STARTED)
+startup.print_report()
+
 if __name__ == '__main__':
     server.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,151 @@
+import os
+import json
+import time
+import fcntl
+import threading
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Last good copy of each downloaded dataset, so a worker can start (and keep
+# serving) without SharePoint. Relative to the working directory like the .db files.
+SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR', 'snapshots')
+
+# Schema metadata key holding the source fingerprint (ETag, content hash, ...)
+FINGERPRINT_KEY = b'govwallet.fingerprint'
+
+# With SHARED_CACHE=1 (gunicorn with several workers, started without --preload)
+# only one process downloads from SharePoint and writes snapshots; the others
+# load those files, so upstream load stays flat as workers are added. Each
+# worker still holds its own copy of the frames: to_pandas() copies the columns
+# out of the memory-mapped file, which only saves reading it into a buffer first.
+SHARED_CACHE = os.environ.get('SHARED_CACHE') == '1'
+
+# How often a follower looks for a newer snapshot, or retries for the refresher lock
+POLL_SECONDS = 15
+
+_refresher = {'file': None, 'checked': 0}
+_refresher_lock = threading.Lock()
+
+
+def snapshot_path(name):
+    return os.path.join(SNAPSHOT_DIR, f"{name}.arrow")
+
+
+def save(name, df, fingerprint):
+    """
+    Write df as an Arrow IPC file with its source fingerprint in the schema
+    metadata. The file is replaced atomically, so readers never see half of it.
+    Failures are logged and otherwise ignored; the snapshot is only a cache.
+    """
+    path = snapshot_path(name)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[FINGERPRINT_KEY] = json.dumps({**fingerprint, 'saved_at': time.time()}).encode('utf-8')
+        feather.write_feather(table.replace_schema_metadata(metadata), tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+        return True
+    except Exception as e:
+        print(f"Could not write {name} snapshot:", e)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+
+def load(name):
+    """Return (df, fingerprint) from the last snapshot, or None if there is no usable one."""
+    path = snapshot_path(name)
+    if not os.path.exists(path):
+        return None
+    try:
+        start = time.perf_counter()
+        table = feather.read_table(path, memory_map=True)
+        fingerprint = json.loads(table.schema.metadata[FINGERPRINT_KEY])
+        df = table.to_pandas()
+    except Exception as e:
+        print(f"Ignoring unreadable {name} snapshot:", e)
+        return None
+    print(f"Loaded {name} snapshot ({len(df)} rows) in {time.perf_counter() - start:.3f}s")
+    return df, fingerprint
+
+
+def is_refresher():
+    """
+    True if this process should download sources and write snapshots.
+
+    Always True unless SHARED_CACHE is on. Then the first process to lock
+    refresher.lock wins; the others retry every POLL_SECONDS, so another worker
+    takes over if the refresher exits.
+    """
+    if not SHARED_CACHE or _refresher['file'] is not None:
+        return True
+    with _refresher_lock:
+        if _refresher['file'] is not None:
+            return True
+        now = time.time()
+        if now - _refresher['checked'] < POLL_SECONDS:
+            return False
+        _refresher['checked'] = now
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        lock_file = open(os.path.join(SNAPSHOT_DIR, 'refresher.lock'), 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        # Held (and the lock kept) for the life of the process
+        _refresher['file'] = lock_file
+        print(f"Process {os.getpid()} is the shared cache refresher")
+        return True
+
+
+class SnapshotWatcher:
+    """Notices when another process has replaced a snapshot file."""
+
+    def __init__(self, name):
+        self.name = name
+        self._seen = None
+        self._checked = 0
+
+    def load(self):
+        """Load the snapshot now, remembering which file version was read."""
+        self._checked = time.time()
+        try:
+            stat = os.stat(snapshot_path(self.name))
+        except FileNotFoundError:
+            return None
+        restored = load(self.name)
+        if restored is not None:
+            self._seen = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        return restored
+
+    def poll(self):
+        """Return (df, fingerprint) if the file changed since it was last read, else None."""
+        if time.time() - self._checked < POLL_SECONDS:
+            return None
+        self._checked = time.time()
+        try:
+            stat = os.stat(snapshot_path(self.name))
+        except FileNotFoundError:
+            return None
+        if (stat.st_ino, stat.st_mtime_ns, stat.st_size) == self._seen:
+            return None
+        return self.load()
+
+
+def revalidate_in_background(name, refresh):
+    """Check the source behind a snapshot without holding up the caller."""
+    if not is_refresher():
+        # The refresher process revalidates and rewrites the snapshot for everyone
+        return
+
+    def run():
+        try:
+            changed = refresh()
+            print(f"Revalidated {name} snapshot: {'updated' if changed else 'unchanged'}")
+        except Exception as e:
+            print(f"Could not revalidate {name} snapshot, serving it as is:", e)
+
+    threading.Thread(target=run, daemon=True, name=f"revalidate-{name}").start()
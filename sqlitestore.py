@@ -0,0 +1,214 @@
+import os
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+from datetime import date
+import pandas as pd
+
+# Columns declared DATE hold ISO dates and come back as datetime.date
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_converter('DATE', lambda value: date.fromisoformat(value.decode()))
+
+# Where the dashboard databases live; relative to the working directory by default
+SQLITE_DIR = os.environ.get('SQLITE_DIR', '')
+
+# Added to every store's schema; replace_tables() records its content hash
+# here, and every write bumps the generation so other workers can tell
+META_SCHEMA = """
+CREATE TABLE store_meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# Seconds a write waits for another worker's write to finish
+WRITE_TIMEOUT = 30
+
+
+def _sql_rows(df, columns):
+    """Rows of df as plain Python values (numpy scalars can't be bound), with NaN as NULL."""
+    values = [df[col].astype(object).where(df[col].notna(), None).tolist() for col in columns]
+    return list(zip(*values))
+
+
+def diff_rows(previous, current, key_columns):
+    """
+    Compare two versions of a table keyed on key_columns.
+    Returns (rows of current that are new or changed, keys only in previous).
+    """
+    value_columns = [col for col in current.columns if col not in key_columns]
+    merged = previous.merge(current, on=key_columns, how='outer', suffixes=('_old', ''), indicator=True)
+    removed = merged.loc[merged['_merge'] == 'left_only', key_columns]
+
+    changed = merged['_merge'] == 'right_only'
+    both = merged['_merge'] == 'both'
+    for col in value_columns:
+        new, old = merged[col], merged[f"{col}_old"]
+        changed |= both & (new != old) & ~(new.isna() & old.isna())
+    return merged.loc[changed, list(current.columns)], removed
+
+
+class SqliteStore:
+    """
+    A SQLite file owned by one dashboard, written in place in WAL mode.
+
+    Writes go through write(), one transaction at a time across every
+    worker. WAL keeps readers off the writer's lock: a reader (in this or
+    another worker) sees the last committed transaction, never half of one,
+    and a sync that changes one row writes just that row. Callbacks read
+    through read_sql(), which keeps one read-only connection per thread.
+
+    The schema is versioned with PRAGMA user_version; a file with another
+    version is rebuilt from scratch before its first use.
+    """
+
+    def __init__(self, filename, schema, schema_version):
+        self.path = os.path.join(SQLITE_DIR, filename)
+        self.schema = schema
+        self.schema_version = schema_version
+        self._local = threading.local()
+        self._ready = False
+        self._ready_lock = threading.Lock()
+        # Last frame synced per table, and the store generation it was written
+        # at, so later syncs only diff in memory unless another worker wrote since
+        self._synced = {}
+        self._generation = None
+
+    def _connect(self, readonly=False):
+        if readonly:
+            return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True,
+                                   detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+        # isolation_level=None so write() can BEGIN IMMEDIATE itself; wait out other workers' writes
+        return sqlite3.connect(self.path, detect_types=sqlite3.PARSE_DECLTYPES,
+                               isolation_level=None, timeout=WRITE_TIMEOUT)
+
+    def _ensure_schema(self):
+        if self._ready:
+            return
+        with self._ready_lock:
+            if self._ready:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = self._connect()
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    # Checked under the write lock, so workers booting together rebuild it once
+                    if conn.execute("PRAGMA user_version").fetchone()[0] != self.schema_version:
+                        tables = [name for (name,) in conn.execute(
+                            "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")]
+                        for name in tables:
+                            conn.execute(f'DROP TABLE "{name}"')
+                        for statement in (self.schema + META_SCHEMA).split(';'):
+                            if statement.strip():
+                                conn.execute(statement)
+                        conn.execute(f"PRAGMA user_version = {int(self.schema_version)}")
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            finally:
+                conn.close()
+            self._ready = True
+
+    @contextmanager
+    def write(self):
+        """A read/write connection inside one transaction, holding the write lock from the start."""
+        self._ensure_schema()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    def reader(self):
+        """This thread's read-only connection, opened on first use."""
+        self._ensure_schema()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect(readonly=True)
+        return conn
+
+    def read_sql(self, query, params=()):
+        return pd.read_sql(query, self.reader(), params=list(params))
+
+    @staticmethod
+    def _meta(conn, key):
+        row = conn.execute('SELECT value FROM store_meta WHERE key = ?', [key]).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _set_meta(conn, key, value):
+        conn.execute("INSERT OR REPLACE INTO store_meta VALUES (?, ?)", [key, value])
+
+    def _bump_generation(self, conn):
+        generation = str(int(self._meta(conn, 'generation') or 0) + 1)
+        self._set_meta(conn, 'generation', generation)
+        self._generation = generation
+
+    def replace_tables(self, frames):
+        """
+        Make the tables ({table: df}) hold exactly the rows of each df, in one
+        transaction. Skipped when the file already has this content, so
+        workers booting together don't all rewrite it.
+        """
+        content_hash = hashlib.sha1()
+        for table, df in frames.items():
+            content_hash.update(table.encode('utf-8'))
+            content_hash.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        content_hash = content_hash.hexdigest()
+
+        with self.write() as conn:
+            if self._meta(conn, 'content_hash') == content_hash:
+                print(f"{self.path} is up to date")
+                return False
+            for table, df in frames.items():
+                columns = list(df.columns)
+                column_list = ', '.join(f'"{col}"' for col in columns)
+                conn.execute(f'DELETE FROM "{table}"')
+                conn.executemany(
+                    f'INSERT INTO "{table}" ({column_list}) VALUES ({", ".join("?" for _ in columns)})',
+                    _sql_rows(df, columns))
+            self._set_meta(conn, 'content_hash', content_hash)
+            self._bump_generation(conn)
+        return True
+
+    def sync_table(self, table, df, key_columns):
+        """
+        Make table hold exactly the rows of df, writing only the rows added,
+        changed or removed since the last sync (or since what is on disk, if
+        another worker has written to the file since).
+        """
+        columns = list(df.columns)
+        column_list = ', '.join(f'"{col}"' for col in columns)
+        updates = ', '.join(f'"{col}" = excluded."{col}"' for col in columns if col not in key_columns)
+        upsert = (
+            f'INSERT INTO "{table}" ({column_list}) VALUES ({", ".join("?" for _ in columns)}) '
+            f'ON CONFLICT ({", ".join(key_columns)}) DO UPDATE SET {updates}'
+        )
+        delete = f'DELETE FROM "{table}" WHERE ' + ' AND '.join(f'"{col}" = ?' for col in key_columns)
+
+        with self.write() as conn:
+            previous = self._synced.get(table)
+            generation = self._meta(conn, 'generation')
+            if previous is None or generation != self._generation:
+                previous = pd.read_sql(f'SELECT * FROM "{table}"', conn)
+                previous = previous.astype({col: df[col].dtype for col in key_columns}, errors='ignore')
+            changed, removed = diff_rows(previous, df, key_columns)
+
+            if len(changed) or len(removed):
+                conn.executemany(delete, _sql_rows(removed, key_columns))
+                conn.executemany(upsert, _sql_rows(changed, columns))
+                self._bump_generation(conn)
+            else:
+                self._generation = generation
+        print(f"Synced {table}: {len(changed)} rows upserted, {len(removed)} removed")
+        self._synced[table] = df
+        return len(changed), len(removed)
@@ -0,0 +1,100 @@
+import time
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+# Wall-clock time this module was first imported; main.py imports it first
+BOOT_STARTED = time.time()
+
+_timings = []
+_lock = threading.Lock()
+
+
+def record(stage, seconds):
+    with _lock:
+        _timings.append((stage, seconds))
+    print(f"[startup] {stage}: {seconds:.2f}s")
+
+
+@contextmanager
+def timed(stage):
+    """Record how long the with-block took under the given stage name."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
+
+
+def report():
+    """Stages recorded so far, slowest first, for the /startup-report route."""
+    with _lock:
+        timings = list(_timings)
+    return {
+        'uptime_seconds': round(time.time() - BOOT_STARTED, 3),
+        'stages': [
+            {'stage': stage, 'seconds': round(seconds, 3)}
+            for stage, seconds in sorted(timings, key=lambda t: t[1], reverse=True)
+        ],
+    }
+
+
+def print_report():
+    print("Startup time by stage:")
+    for row in report()['stages']:
+        print(f"  {row['seconds']:8.2f}s  {row['stage']}")
+
+
+def _load_with_retry(name, loader, attempts, backoff):
+    for attempt in range(1, attempts + 1):
+        start = time.perf_counter()
+        try:
+            loader()
+        except Exception as e:
+            record(f"Fetch {name} (attempt {attempt} failed)", time.perf_counter() - start)
+            print(f"Fetching {name} failed (attempt {attempt}/{attempts}):", e)
+            if attempt == attempts:
+                return e
+            time.sleep(backoff * attempt)
+        else:
+            record(f"Fetch {name}", time.perf_counter() - start)
+            return None
+
+
+def prefetch(sources, attempts=3, backoff=2):
+    """
+    Run every loader in sources ({name: loader}) at the same time, retrying
+    failures, so boot waits for the slowest source rather than the sum of all.
+
+    Loaders cache what they fetch, so dashboards built afterwards reuse it.
+    Returns {name: exception} for sources that still failed; those are
+    fetched again when their dashboard first asks for them.
+    """
+    with timed("Data prefetch (concurrent)"):
+        with ThreadPoolExecutor(max_workers=max(len(sources), 1), thread_name_prefix='prefetch') as pool:
+            futures = {
+                name: pool.submit(_load_with_retry, name, loader, attempts, backoff)
+                for name, loader in sources.items()
+            }
+            errors = {name: future.result() for name, future in futures.items()}
+    return {name: error for name, error in errors.items() if error is not None}
+
+
+def prefetch_in_background(sources, warm_ups=None, attempts=3, backoff=2):
+    """
+    prefetch() on a daemon thread, then each of warm_ups ({name: builder}),
+    so the server answers while the data loads. A request that needs a
+    source before then waits for the fetch already under way.
+    """
+    def run():
+        prefetch(sources, attempts, backoff)
+        for name, warm_up in (warm_ups or {}).items():
+            try:
+                with timed(f"Warm up {name}"):
+                    warm_up()
+            except Exception as e:
+                print(f"Warming up {name} failed, it builds on first request instead:", e)
+
+    thread = threading.Thread(target=run, daemon=True, name='prefetch')
+    thread.start()
+    return thread
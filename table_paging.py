@@ -0,0 +1,160 @@
+import math
+import re
+import threading
+from collections import OrderedDict
+import pandas as pd
+from dash import ctx
+
+# Server-side paging for DataTables with page_action, sort_action and
+# filter_action set to 'custom': the table's callback filters and sorts the
+# frame in memory and sends the browser only the visible page, instead of
+# every row as records.
+
+# Filtered and sorted views kept, newest last, so paging through a table
+# does not filter and sort the whole frame again for each page. Only views
+# of callers that pass a view_key are kept, and never the frames behind them.
+VIEW_CACHE_SIZE = 8
+
+_views = OrderedDict()
+_views_lock = threading.Lock()
+
+# One part of a filter_query: {column} operator value. Operators come as
+# symbols or words, with an i (case-insensitive) or s prefix on the words.
+_FILTER_PART = re.compile(r'^\s*\{(?P<column>[^}]+)\}\s+(?P<operator>[<>!=]=?|[a-z]+)\s+(?P<value>.+?)\s*$')
+
+_COMPARISONS = {
+    '=': 'eq', 'eq': 'eq', '!=': 'ne', 'ne': 'ne',
+    '<': 'lt', 'lt': 'lt', '<=': 'le', 'le': 'le',
+    '>': 'gt', 'gt': 'gt', '>=': 'ge', 'ge': 'ge',
+}
+
+
+def paging_props(page_size, sort_by=None):
+    """DataTable keyword arguments for a table paged, sorted and filtered by its callback."""
+    return dict(
+        page_action='custom', page_current=0, page_size=page_size,
+        sort_action='custom', sort_mode='single', sort_by=sort_by or [],
+        filter_action='custom', filter_query='', filter_options={'case': 'insensitive'},
+    )
+
+
+def current_page(table_id, page_current):
+    """page_current when the table's pager fired the callback; any other change starts again at the first page."""
+    if f'{table_id}.page_current' in ctx.triggered_prop_ids:
+        return page_current or 0
+    return 0
+
+
+def split_filter_query(filter_query):
+    """(column, operator, value, case_sensitive) for each part of a DataTable filter_query that can be applied."""
+    parts = []
+    for part in (filter_query or '').split(' && '):
+        match = _FILTER_PART.match(part)
+        if not match:
+            continue
+        column, operator, value = match.group('column', 'operator', 'value')
+        case_sensitive = True
+        if operator[0] in 'is' and operator[1:] in ('contains', 'datestartswith', *_COMPARISONS):
+            case_sensitive, operator = operator[0] == 's', operator[1:]
+        operator = _COMPARISONS.get(operator, operator)
+        if operator not in ('contains', 'datestartswith', *_COMPARISONS.values()):
+            continue
+
+        quote = value[0]
+        if quote in '"\'`' and len(value) > 1 and value[-1] == quote:
+            value = value[1:-1].replace('\\' + quote, quote)
+        else:
+            try:
+                value = float(value)
+            except ValueError:
+                pass
+        parts.append((column, operator, value, case_sensitive))
+    return parts
+
+
+def _as_text(series):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.strftime('%Y-%m-%d %H:%M:%S').fillna('')
+    return series.astype(object).where(series.notna(), '').astype(str)
+
+
+def filter_rows(df, filter_query):
+    """The rows of df matching every part of filter_query; parts naming unknown columns are ignored."""
+    mask = pd.Series(True, index=df.index)
+    for column, operator, value, case_sensitive in split_filter_query(filter_query):
+        if column not in df.columns:
+            continue
+        series = df[column]
+
+        if operator in ('contains', 'datestartswith'):
+            text = _as_text(series)
+            value = str(value)
+            if operator == 'datestartswith':
+                mask &= text.str.startswith(value)
+            else:
+                mask &= text.str.contains(value, case=case_sensitive, regex=False)
+            continue
+
+        compare = getattr(pd.Series, operator)
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            number = pd.to_numeric(value, errors='coerce')
+            mask &= compare(series, number) if pd.notna(number) else operator == 'ne'
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            when = pd.to_datetime(value, errors='coerce')
+            mask &= compare(series, when) if pd.notna(when) else operator == 'ne'
+        else:
+            text = _as_text(series)
+            value = value if isinstance(value, str) else f'{value:g}'
+            if not case_sensitive:
+                text, value = text.str.casefold(), value.casefold()
+            mask &= compare(text, value)
+    return df if mask.all() else df[mask]
+
+
+def sort_rows(df, sort_by):
+    """df ordered by a DataTable sort_by, blanks last; columns not in df are skipped."""
+    sort_by = [item for item in (sort_by or []) if item.get('column_id') in df.columns]
+    if not sort_by:
+        return df
+    columns = [item['column_id'] for item in sort_by]
+    ascending = [item.get('direction') != 'desc' for item in sort_by]
+    try:
+        return df.sort_values(columns, ascending=ascending, kind='stable', na_position='last')
+    except TypeError:
+        # Columns mixing types (numbers and text) sort by their text
+        return df.sort_values(columns, ascending=ascending, kind='stable', na_position='last',
+                              key=lambda series: _as_text(series) if series.dtype == object else series)
+
+
+def _view(df, filter_query, sort_by, view_key):
+    if not filter_query and not sort_by:
+        return df
+    if view_key is None:
+        return sort_rows(filter_rows(df, filter_query), sort_by)
+    key = (view_key, filter_query, repr(sort_by))
+    with _views_lock:
+        view = _views.get(key)
+        if view is not None:
+            _views.move_to_end(key)
+            return view
+
+    view = sort_rows(filter_rows(df, filter_query), sort_by)
+    with _views_lock:
+        _views[key] = view
+        while len(_views) > VIEW_CACHE_SIZE:
+            _views.popitem(last=False)
+    return view
+
+
+def table_page(df, page_current, page_size, sort_by=None, filter_query=None, view_key=None):
+    """
+    The rows of df on page page_current once filtered and sorted, and the
+    number of pages. view_key names the rows of df: the source version and
+    the caller's own filter inputs. With one, the filtered and sorted view is
+    kept for the next page; read the version before the data, so a view is
+    never kept under a newer version than its rows.
+    """
+    view = _view(df, filter_query or '', sort_by or [], view_key)
+    page_count = max(1, math.ceil(len(view) / page_size))
+    start = min(page_current or 0, page_count - 1) * page_size
+    return view.iloc[start:start + page_size], page_count
@@ -0,0 +1,46 @@
+import time
+import threading
+from functools import wraps
+
+# Per-callback latency since the process started, for the /callback-timings route
+_stats = {}
+_lock = threading.Lock()
+
+
+def record(name, seconds):
+    with _lock:
+        stats = _stats.setdefault(name, {'calls': 0, 'total': 0.0, 'max': 0.0, 'last': 0.0})
+        stats['calls'] += 1
+        stats['total'] += seconds
+        stats['max'] = max(stats['max'], seconds)
+        stats['last'] = seconds
+
+
+def timed_callback(name):
+    """Decorator recording how long each call of a Dash callback takes. Put it under @app.callback."""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def report():
+    """Callbacks by total time spent, slowest first."""
+    with _lock:
+        stats = {name: dict(values) for name, values in _stats.items()}
+    return [
+        {
+            'callback': name,
+            'calls': values['calls'],
+            'mean_ms': round(1000 * values['total'] / values['calls'], 3),
+            'max_ms': round(1000 * values['max'], 3),
+            'last_ms': round(1000 * values['last'], 3),
+        }
+        for name, values in sorted(stats.items(), key=lambda item: item[1]['total'], reverse=True)
+    ]
@@ -0,0 +1,119 @@
+from bisect import bisect_left
+import numpy as np
+import pandas as pd
+from dash.exceptions import PreventUpdate
+
+# Most matches one search sends back to a dropdown
+TYPEAHEAD_LIMIT = 50
+
+
+def normalize(text):
+    """Form labels are matched on: case-insensitive, with runs of whitespace collapsed."""
+    return ' '.join(str(text).split()).casefold()
+
+
+class PrefixIndex:
+    """
+    Sorted search keys over a column's distinct values, for dropdowns that
+    search on the server instead of shipping every value as an option.
+
+    A value is found by a prefix of its label, or with words=True by a prefix
+    of any word in it, so 'tan' finds 'Alice Tan'.
+    """
+
+    def __init__(self, values, words=False):
+        self.values = pd.Series(values).dropna().drop_duplicates().tolist()
+        entries = []
+        for position, value in enumerate(self.values):
+            label = normalize(value)
+            entries.append((label, position))
+            if words:
+                entries.extend((word_start, position) for word_start in _word_starts(label))
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.positions = [position for _, position in entries]
+
+    def __len__(self):
+        return len(self.values)
+
+    def search(self, text, limit=TYPEAHEAD_LIMIT, allowed=None):
+        """Up to limit values matching text, in label order; only those in allowed if given."""
+        prefix = normalize(text)
+        found = []
+        seen = set()
+        for i in range(bisect_left(self.keys, prefix), len(self.keys)):
+            if not self.keys[i].startswith(prefix) or len(found) >= limit:
+                break
+            position = self.positions[i]
+            if position in seen:
+                continue
+            seen.add(position)
+            value = self.values[position]
+            if allowed is None or value in allowed:
+                found.append(value)
+        return found
+
+
+def _word_starts(label):
+    """The label from the start of each word after the first."""
+    start = label.find(' ')
+    while start != -1:
+        yield label[start + 1:]
+        start = label.find(' ', start + 1)
+
+
+class SubstringIndex:
+    """
+    Trigram index over a column for case-insensitive "contains" filters.
+    A search only checks the distinct values holding every three-letter piece
+    of the text, instead of scanning the whole column. Values are matched on
+    their text as astype(str) gives it, and the text is matched literally.
+    """
+
+    def __init__(self, values):
+        self.codes, uniques = pd.factorize(pd.Series(values).astype(str).str.lower())
+        self.keys = list(uniques)
+        grams = {}
+        for code, key in enumerate(self.keys):
+            for gram in {key[i:i + 3] for i in range(len(key) - 2)}:
+                grams.setdefault(gram, []).append(code)
+        self.grams = {gram: np.array(codes) for gram, codes in grams.items()}
+
+    def matching_keys(self, text):
+        """Codes of the distinct values containing text."""
+        text = text.lower()
+        if len(text) < 3:
+            return [code for code, key in enumerate(self.keys) if text in key]
+        grams = {text[i:i + 3] for i in range(len(text) - 2)}
+        if not grams <= self.grams.keys():
+            return []
+        # Rarest pieces first, so the candidates shrink quickly
+        candidates = None
+        for gram in sorted(grams, key=lambda gram: len(self.grams[gram])):
+            codes = self.grams[gram]
+            candidates = codes if candidates is None else np.intersect1d(candidates, codes, assume_unique=True)
+            if not len(candidates):
+                return []
+        return [code for code in candidates if text in self.keys[code]]
+
+    def mask(self, text):
+        """Boolean array over the indexed rows: True where the value contains text."""
+        return np.isin(self.codes, self.matching_keys(text))
+
+
+def people_index(df):
+    """Typeahead indexes over the gms_id and name columns of df."""
+    return {'gms_id': PrefixIndex(df['gms_id']), 'name': PrefixIndex(df['name'], words=True)}
+
+
+def search_options(index, search_value, selected, allowed=None):
+    """
+    Options for a typeahead dropdown's search_value callback: the current
+    selection, so its chips keep their labels, then the best matches.
+    Leaves the options alone when nothing has been typed.
+    """
+    if not search_value:
+        raise PreventUpdate
+    selected = list(selected or [])
+    matches = [value for value in index.search(search_value, allowed=allowed) if value not in selected]
+    return [{'label': str(value), 'value': value} for value in selected + matches]
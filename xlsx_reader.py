@@ -0,0 +1,189 @@
+import io
+import zipfile
+import posixpath
+import numpy as np
+import pandas as pd
+from xml.etree.ElementTree import iterparse
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils import get_column_letter, column_index_from_string
+from openpyxl.utils.datetime import from_excel, from_ISO8601, CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900
+
+# A streaming reader for the few columns a dashboard needs out of a large
+# xlsx sheet. openpyxl (even read-only) builds a value for every cell; this
+# walks the sheet XML once and only converts cells in the wanted columns.
+# Values come out as pd.read_excel gives them: blank cells and errors are
+# NaN, whole numbers are ints and date-formatted numbers are datetimes.
+
+MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+ROW_TAG = MAIN_NS + 'row'
+CELL_TAG = MAIN_NS + 'c'
+VALUE_TAG = MAIN_NS + 'v'
+TEXT_TAG = MAIN_NS + 't'
+RUN_TAG = MAIN_NS + 'r'
+INLINE_TAG = MAIN_NS + 'is'
+SHARED_STRING_TAG = MAIN_NS + 'si'
+
+
+def _text(node):
+    """Plain text of a shared or inline string (rich text runs joined), like openpyxl's Text.content."""
+    text = node.findtext(TEXT_TAG)
+    runs = [run.findtext(TEXT_TAG, '') for run in node.iter(RUN_TAG)]
+    return ((text or '') + ''.join(runs)).replace('x005F_', '')
+
+
+def _sheet_part(archive, sheet_name):
+    workbook = archive.read('xl/workbook.xml')
+    rels = archive.read('xl/_rels/workbook.xml.rels')
+    targets = {}
+    for _, node in iterparse(io.BytesIO(rels)):
+        if node.tag == PKG_REL_NS + 'Relationship':
+            targets[node.get('Id')] = node.get('Target')
+
+    epoch, rel_id = CALENDAR_WINDOWS_1900, None
+    for _, node in iterparse(io.BytesIO(workbook)):
+        if node.tag == MAIN_NS + 'workbookPr' and node.get('date1904') in ('1', 'true'):
+            epoch = CALENDAR_MAC_1904
+        elif node.tag == MAIN_NS + 'sheet' and node.get('name') == sheet_name:
+            rel_id = node.get(REL_NS + 'id')
+    if rel_id not in targets:
+        raise ValueError(f"Worksheet named '{sheet_name}' not found")
+
+    target = targets[rel_id]
+    path = target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+    return path, epoch
+
+
+def _shared_strings(archive):
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return []
+    strings = []
+    with archive.open('xl/sharedStrings.xml') as source:
+        for _, node in iterparse(source):
+            if node.tag == SHARED_STRING_TAG:
+                strings.append(_text(node))
+                node.clear()
+    return strings
+
+
+def _date_styles(archive):
+    """Style ids whose number format is a date (value True) or a duration (value 'timedelta')."""
+    if 'xl/styles.xml' not in archive.namelist():
+        return {}
+    custom_formats = {}
+    styles = {}
+    in_cell_xfs = False
+    index = 0
+    for event, node in iterparse(io.BytesIO(archive.read('xl/styles.xml')), events=('start', 'end')):
+        if node.tag == MAIN_NS + 'numFmt' and event == 'end':
+            custom_formats[int(node.get('numFmtId'))] = node.get('formatCode')
+        elif node.tag == MAIN_NS + 'cellXfs':
+            in_cell_xfs = event == 'start'
+        elif node.tag == MAIN_NS + 'xf' and in_cell_xfs and event == 'end':
+            fmt_id = int(node.get('numFmtId', 0))
+            fmt = custom_formats.get(fmt_id, BUILTIN_FORMATS.get(fmt_id))
+            if fmt and is_date_format(fmt):
+                styles[str(index)] = 'timedelta' if is_timedelta_format(fmt) else True
+            index += 1
+    return styles
+
+
+def _column_letters(cell, previous):
+    """Column letters of a cell ('AB' for 'AB12'); cells without a reference follow the previous one."""
+    reference = cell.get('r')
+    if reference:
+        return reference.rstrip('0123456789')
+    return get_column_letter(column_index_from_string(previous) + 1 if previous else 1)
+
+
+def _cell_value(cell, strings, date_styles, epoch):
+    data_type = cell.get('t', 'n')
+    if data_type == 'inlineStr':
+        node = cell.find(INLINE_TAG)
+        return _text(node) if node is not None else None
+    value = cell.findtext(VALUE_TAG)
+    if not value:
+        return None
+    if data_type == 'n':
+        number = float(value)
+        date_style = date_styles.get(cell.get('s'))
+        if date_style:
+            try:
+                return from_excel(number, epoch, timedelta=date_style == 'timedelta')
+            except (OverflowError, ValueError):
+                return None
+        return int(number) if number.is_integer() else number
+    if data_type == 's':
+        return strings[int(value)]
+    if data_type == 'str':
+        return value
+    if data_type == 'b':
+        return bool(int(value))
+    if data_type == 'd':
+        return from_ISO8601(value)
+    # Error cells ('e') read as missing, as in pd.read_excel
+    return None
+
+
+def read_columns(source, sheet_name, columns):
+    """
+    Read the named columns of one sheet into a DataFrame, using the first row
+    as the header. source is a path or a binary file object holding the xlsx.
+    Raises KeyError if a column is missing from the header.
+    """
+    with zipfile.ZipFile(source) as archive:
+        sheet_path, epoch = _sheet_part(archive, sheet_name)
+        strings = _shared_strings(archive)
+        date_styles = _date_styles(archive)
+
+        wanted = None  # column letters -> position in columns
+        records = []
+        last_filled = 0
+        row_number = 0
+        with archive.open(sheet_path) as sheet:
+            for _, node in iterparse(sheet):
+                if node.tag != ROW_TAG:
+                    continue
+                number = int(node.get('r', row_number + 1))
+                letters = None
+
+                if wanted is None:
+                    header = {}
+                    for cell in node.iter(CELL_TAG):
+                        letters = _column_letters(cell, letters)
+                        header.setdefault(_cell_value(cell, strings, date_styles, epoch), letters)
+                    node.clear()
+                    missing = [name for name in columns if name not in header]
+                    if missing:
+                        raise KeyError(f"Columns not found in {sheet_name}: {missing}")
+                    wanted = {header[name]: position for position, name in enumerate(columns)}
+                    row_number = number
+                    continue
+
+                record = [np.nan] * len(columns)
+                filled = False
+                for cell in node.iter(CELL_TAG):
+                    letters = _column_letters(cell, letters)
+                    position = wanted.get(letters)
+                    if position is None:
+                        # Only matters for telling blank rows from filled ones
+                        filled = filled or len(cell) > 0
+                        continue
+                    value = _cell_value(cell, strings, date_styles, epoch)
+                    if value is not None and value != '':
+                        record[position] = value
+                        filled = True
+                node.clear()
+
+                # Rows missing from the XML are blank rows in the sheet
+                records.extend([np.nan] * len(columns) for _ in range(number - row_number - 1))
+                row_number = number
+                records.append(record)
+                if filled:
+                    last_filled = len(records)
+
+    # Blank rows after the last filled one are dropped, like pd.read_excel does
+    df = pd.DataFrame.from_records(records[:last_filled], columns=list(columns))
+    return df